@@ -0,0 +1,216 @@
+from argparse import ArgumentParser
+from hashlib import sha256
+from json import loads
+from threading import Lock
+from time import time
+from PageCache import COMMIT_EVERY
+import sqlite3
+import zlib
+
+# Compression level of the bodies. Archives are written once and read many times, so the smallest size is worth the time.
+COMPRESSION_LEVEL = 9
+
+class Archive:
+    def __init__(self, filename: str = './Archive.sqlite', replay: bool = False) -> None:
+        """Initialize an Archive object, a record of every response a Parser received, stored in a SQLite file.
+
+        Bodies are compressed and content-addressed (keyed by their hash), so identical pages are only stored once. Responses are
+        keyed like the requests of a PageCache (see PageCache.get_page_key), and never expire. When recording, every response is
+        stored. When replaying, the Parser sends no requests at all, and every response comes from the archive.
+
+        Args:
+            filename (str, optional): Path of the archive file. Defaults to './Archive.sqlite'.
+            replay (bool, optional): Whether or not to replay the archive, instead of recording to it. Defaults to False.
+        """
+        self.filename = filename
+        self.replay = replay
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.records = 0
+
+        self._lock = Lock()
+        self._pending = 0 # Changes that have not been committed.
+
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, size INTEGER, body BLOB)')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, method TEXT, path TEXT, status INTEGER, content_type TEXT, hash TEXT, recorded REAL)'
+        )
+
+    def get(self, key: str) -> tuple[int, bytes, str]:
+        """Get a recorded response.
+
+        Args:
+            key (str): Key of the request. See PageCache.get_page_key.
+
+        Returns:
+            tuple[int, bytes, str]: Status code, body and Content-Type of the response, or None if it was not recorded.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT responses.status, responses.content_type, blobs.body FROM responses JOIN blobs ON responses.hash = blobs.hash WHERE responses.key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return row[0], zlib.decompress(row[2]), row[1]
+
+    def put(self, key: str, method: str, path: str, status: int, body: bytes, content_type: str = 'text/html; charset=UTF-8') -> str:
+        """Record a response.
+
+        Args:
+            key (str): Key of the request. See PageCache.get_page_key.
+            method (str): HTTP method of the request.
+            path (str): Path of the request.
+            status (int): Status code of the response.
+            body (bytes): Body of the response.
+            content_type (str, optional): Content-Type of the response. Defaults to 'text/html; charset=UTF-8'.
+
+        Returns:
+            str: Hash of the body.
+        """
+        digest = sha256(body).hexdigest()
+        self._store(key, method, path, status, content_type, digest, len(body), lambda: zlib.compress(body, COMPRESSION_LEVEL))
+        return digest
+
+    def writer(self, key: str, method: str, path: str, status: int, content_type: str = 'text/html; charset=UTF-8'):
+        """Get an ArchiveWriter to record a response that arrives in chunks.
+
+        Args:
+            key (str): Key of the request.
+            method (str): HTTP method of the request.
+            path (str): Path of the request.
+            status (int): Status code of the response.
+            content_type (str, optional): Content-Type of the response. Defaults to 'text/html; charset=UTF-8'.
+
+        Returns:
+            ArchiveWriter: Writer of the response.
+        """
+        return ArchiveWriter(self, key, method, path, status, content_type)
+
+    def _store(self, key: str, method: str, path: str, status: int, content_type: str, digest: str, size: int, compress) -> None:
+        """An internal function that records a response, and its body unless an identical body is already stored.
+
+        Args:
+            compress: Function that returns the compressed body. Only called if the body is not already stored.
+        """
+        with self._lock:
+            if self._connection.execute('SELECT 1 FROM blobs WHERE hash = ?', (digest,)).fetchone() is None:
+                self._connection.execute('INSERT INTO blobs VALUES (?, ?, ?)', (digest, size, compress()))
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, method, path, status, content_type, digest, time())
+            )
+            self.records += 1
+
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._connection.commit()
+                self._pending = 0
+
+    def stats(self) -> dict:
+        """Get the counters and size of the archive.
+
+        Returns:
+            dict: Hits, misses and records of this session, and number of responses, unique bodies and compressed size of the archive.
+        """
+        with self._lock:
+            responses = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            blobs, size = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM blobs').fetchone()
+
+        return {'Hits': self.hits, 'Misses': self.misses, 'Records': self.records, 'Responses': responses, 'Bodies': blobs, 'Size': size}
+
+    def flush(self) -> None:
+        """Commit all changes to the archive file.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Commit all changes and close the archive file.
+        """
+        self.flush()
+        self._connection.close()
+
+class ArchiveWriter:
+    def __init__(self, archive: Archive, key: str, method: str, path: str, status: int, content_type: str) -> None:
+        """Initialize an ArchiveWriter object, which hashes and compresses a response chunk by chunk, and records it once closed.
+
+        Args:
+            archive (Archive): Archive to record the response in.
+            key (str): Key of the request.
+            method (str): HTTP method of the request.
+            path (str): Path of the request.
+            status (int): Status code of the response.
+            content_type (str): Content-Type of the response.
+        """
+        self.archive = archive
+        self.key = key
+        self.method = method
+        self.path = path
+        self.status = status
+        self.content_type = content_type
+
+        self._hash = sha256()
+        self._compressor = zlib.compressobj(COMPRESSION_LEVEL)
+        self._parts = []
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        """Add a chunk of the response.
+
+        Args:
+            data (bytes): Chunk of the response.
+        """
+        self._hash.update(data)
+        self._parts.append(self._compressor.compress(data))
+        self._size += len(data)
+
+    def close(self) -> str:
+        """Record the response.
+
+        Returns:
+            str: Hash of the body.
+        """
+        self._parts.append(self._compressor.flush())
+        digest = self._hash.hexdigest()
+        self.archive._store(self.key, self.method, self.path, self.status, self.content_type, digest, self._size, lambda: b''.join(self._parts))
+        self._parts = []
+        return digest
+
+def main() -> None:
+    """Record the Courses of a school to an archive, or replay an archive to parse them again without sending a single request.
+    """
+    from Parser import Parser
+    from Refresh import write_json
+
+    arg_parser = ArgumentParser(description='Record every response of a Parser to an archive, or replay an archive to parse the Courses offline.')
+    arg_parser.add_argument('mode', choices=['record', 'replay'], help='Whether to record to the archive, or replay it.')
+    arg_parser.add_argument('school', help='School of the profile to use, from profiles.json.')
+    arg_parser.add_argument('--archive', default='./Archive.sqlite', help='Path of the archive file. Defaults to ./Archive.sqlite.')
+    arg_parser.add_argument('--calendar', action='append', dest='calendars', help='Only parse the Calendars with this name (i.e., "Fall 2024"). Can be repeated. Defaults to the latest Calendar.')
+    arg_parser.add_argument('--output', default='./Output.json', help='Where to write the Courses. Defaults to ./Output.json.')
+    args = arg_parser.parse_args()
+
+    with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
+    profile = next(profile for profile in profiles if profile['School'] == args.school)
+
+    archive = Archive(args.archive, replay=args.mode == 'replay')
+    parser = Parser(profile, archive=archive)
+
+    calendars = parser.get_calendars(all_calendars=bool(args.calendars)) or []
+    if args.calendars: calendars = [calendar for calendar in calendars if calendar['Calendar Name'] in args.calendars]
+    calendars = parser.get_courses(calendars)
+
+    write_json(args.output, calendars)
+    print(f'{sum([len(calendar["Courses"]) for calendar in calendars])} Courses. Archive: {archive.stats()}')
+    archive.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from json import loads
+from os import makedirs
+from Parser import Parser
+from RequestScheduler import RequestScheduler, MAX_WINDOW
+from Refresh import write_json
+from LogConfig import configure_logging
+from Metrics import merge_reports, write_prometheus
+import asyncio
+import logging
+
+# Number of Calendars of the same host parsed at once. Their requests also share the RequestScheduler of the host.
+JOBS_PER_HOST = 2
+
+LOGGER = logging.getLogger(__name__)
+
+class Batch:
+    def __init__(self, profiles: list[dict], all_calendars: bool = False, calendar_names: list[str] = None, jobs_per_host: int = JOBS_PER_HOST, workers: int = None, **parser_kwargs) -> None:
+        """Initialize a Batch object, which parses the Calendars of many profiles at once on a single event loop.
+
+        Every (profile, Calendar) pair is a job with its own Parser. Jobs of different hosts run side by side, while jobs of the same
+        host are capped at jobs_per_host and share one RequestScheduler, so a host is never sent more than its window of requests.
+        Pages are parsed on a process pool, so parsing does not hold up the requests of other jobs.
+
+        Args:
+            profiles (list[dict]): Profiles of the schools.
+            all_calendars (bool, optional): Whether or not to parse every Calendar of a school, instead of the latest one. Defaults to False.
+            calendar_names (list[str], optional): Only parse the Calendars with these names (i.e., "Fall 2024"), if any. Defaults to None.
+            jobs_per_host (int, optional): Number of Calendars of the same host parsed at once. Defaults to JOBS_PER_HOST.
+            workers (int, optional): Number of processes that parse pages. Defaults to the number of CPUs.
+            **parser_kwargs: Passed to every Parser (i.e., get_course_desc, cache). The metrics of every job are merged into one
+            prometheus_file, instead of each Parser writing its own over the others.
+        """
+        self.profiles = profiles
+        self.all_calendars = all_calendars or bool(calendar_names)
+        self.calendar_names = calendar_names
+        self.jobs_per_host = jobs_per_host
+        self.workers = workers
+        self.prometheus_file = parser_kwargs.pop('prometheus_file', None)
+        self.parser_kwargs = parser_kwargs
+        self.reports = [] # Metrics report of each Calendar parsed, see Metrics.report
+
+        self._executor = None
+        self._schedulers = {} # Keyed by host
+        self._semaphores = {} # Keyed by host
+
+    def run(self) -> dict:
+        """Parse all Courses of the Calendars of every profile.
+
+        Returns:
+            dict: Calendars (see Parser.get_courses) keyed by school.
+        """
+        return asyncio.run(self._run())
+
+    async def _run(self) -> dict:
+        """An internal async function that runs every job on the running event loop.
+
+        Returns:
+            dict: Calendars keyed by school.
+        """
+        with ProcessPoolExecutor(self.workers) as self._executor:
+            results = await asyncio.gather(*[self._run_profile(profile) for profile in self.profiles])
+
+        return {profile['School']: calendars for profile, calendars in zip(self.profiles, results)}
+
+    def _get_parser(self, profile: dict) -> Parser:
+        """An internal function that creates a Parser for a job, sharing the RequestScheduler of its host and the process pool.
+
+        Args:
+            profile (dict): Profile of school.
+
+        Returns:
+            Parser: A new Parser.
+        """
+        host = profile['Base Host']
+        if host not in self._schedulers: self._schedulers[host] = RequestScheduler(profile.get('Max Concurrency', MAX_WINDOW))
+
+        return Parser(profile, scheduler=self._schedulers[host], executor=self._executor, **self.parser_kwargs)
+
+    async def _run_profile(self, profile: dict) -> list[dict]:
+        """An internal async function that gets the Calendars of a profile and runs a job for each of them.
+
+        Args:
+            profile (dict): Profile of school.
+
+        Returns:
+            list[dict]: A list contanining all the Calendars and their corresponding Courses.
+        """
+        parser = self._get_parser(profile)
+        try: calendars = await asyncio.to_thread(parser.get_calendars, self.all_calendars)
+        finally: parser.session.close()
+
+        if calendars is None:
+            LOGGER.error(f'[{profile["School"]}] | No Calendars Loaded.')
+            return []
+        if self.calendar_names: calendars = [calendar for calendar in calendars if calendar['Calendar Name'] in self.calendar_names]
+
+        await asyncio.gather(*[self._run_job(profile, calendar) for calendar in calendars])
+        return calendars
+
+    async def _run_job(self, profile: dict, calendar: dict) -> None:
+        """An internal async function that parses all Courses of a Calendar, once the host has room for another job.
+
+        Args:
+            profile (dict): Profile of school.
+            calendar (dict): A Calendar object. Updated in place.
+        """
+        semaphore = self._semaphores.setdefault(profile['Base Host'], asyncio.Semaphore(self.jobs_per_host))
+        async with semaphore:
+            parser = self._get_parser(profile)
+            try: await parser.get_courses_async([calendar])
+            finally: parser.session.close()
+
+        self.reports = merge_reports(self.reports, parser.reports)
+        try:
+            if self.prometheus_file: write_prometheus(self.prometheus_file, self.reports)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+
+def main() -> None:
+    """Parse the Calendars of several schools at once, and write the output of each school to its own file.
+    """
+    arg_parser = ArgumentParser(description='Parse the Calendars of several schools at once.')
+    arg_parser.add_argument('schools', nargs='*', help='Schools of the profiles to use, from profiles.json. Defaults to every profile.')
+    arg_parser.add_argument('--all-calendars', action='store_true', help='Parse every Calendar of a school, instead of the latest one.')
+    arg_parser.add_argument('--calendar', action='append', dest='calendars', help='Only parse the Calendars with this name (i.e., "Fall 2024"). Can be repeated.')
+    arg_parser.add_argument('--jobs-per-host', type=int, default=JOBS_PER_HOST, help=f'Number of Calendars of the same host parsed at once. Defaults to {JOBS_PER_HOST}.')
+    arg_parser.add_argument('--workers', type=int, default=None, help='Number of processes that parse pages. Defaults to the number of CPUs.')
+    arg_parser.add_argument('--output', default='./Output', help='Directory to write the output of each school to. Defaults to ./Output.')
+    arg_parser.add_argument('--prometheus-file', default=None, help='File to write the metrics of every Calendar to, in the Prometheus text format.')
+    arg_parser.add_argument('--background-logging', action='store_true', help='Write logs on a background thread.')
+    arg_parser.add_argument('--json-logs', action='store_true', help='Write each log record as a line of JSON.')
+    arg_parser.add_argument('--aggregate-errors', action='store_true', help='Deduplicate and rate limit errors of the same type and endpoint.')
+    args = arg_parser.parse_args()
+
+    configure_logging(background=args.background_logging, json_format=args.json_logs, aggregate=args.aggregate_errors, force=True)
+
+    with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
+    if args.schools: profiles = [profile for profile in profiles if profile['School'] in args.schools]
+
+    results = Batch(profiles, args.all_calendars, args.calendars, args.jobs_per_host, args.workers, prometheus_file=args.prometheus_file).run()
+
+    makedirs(args.output, exist_ok=True)
+    for school, calendars in results.items():
+        write_json(f'{args.output}/{school}.json', calendars)
+        print(f'{school}: {sum([len(calendar["Courses"]) for calendar in calendars])} Courses in {len(calendars)} Calendars.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Process, Queue
+from tempfile import TemporaryDirectory
+from glob import glob
+from os import path, getcwd, chdir
+from json import dumps, loads
+from time import perf_counter, process_time
+from sys import platform
+from bs4 import BeautifulSoup
+from CourseParser import CourseParser, SEATING_TABLE
+from PageCache import PageCache
+from FakeBanner import FakeBanner, SyntheticSite, get_profile, STATS_PATH
+from Parser import Parser
+import asyncio
+import httpx
+
+# Number of times each benchmark is repeated. The fastest run is kept, as the others only add noise.
+REPEAT = 5
+
+# Methods of a Parser that are timed by the run benchmark. Stages can nest (i.e., Parse Listing is part of Load Listing).
+STAGES = {
+    'get_calendars': 'Get Calendars',
+    '_select_calendar': 'Select Calendar',
+    '_load_all_courses': 'Load Listing',
+    '_chunk_load_all_courses': 'Load Listing',
+    '_stream_courses': 'Load Listing',
+    '_parse_listing': 'Parse Listing',
+    '_visit_paths': 'Visit Paths'
+}
+
+# Share of the Courses/s of the baseline a run may lose before it counts as a regression.
+TOLERANCE = 0.2
+
+def load_pages(directory: str = None, cache: str = None, page_type: str = 'bwckschd.p_disp_detail_sched') -> list[str]:
+    """Load a corpus of saved pages, from a directory of .html files and/or a PageCache file.
+
+    Args:
+        directory (str, optional): Directory of saved pages. Defaults to None.
+        cache (str, optional): Path of a PageCache file. Defaults to None.
+        page_type (str, optional): Page type to load from the PageCache. Defaults to Detailed Information Section pages.
+
+    Returns:
+        list[str]: HTML as text of each page.
+    """
+    pages = []
+    if directory:
+        for filename in sorted(glob(path.join(directory, '*.html'))):
+            with open(filename, 'r', encoding='UTF-8') as f: pages.append(f.read())
+    if cache:
+        page_cache = PageCache(cache)
+        pages += [page.decode('UTF-8') for page in page_cache.pages(page_type)]
+        page_cache.close()
+
+    return pages
+
+def reference_extra_course_info(course_parser: CourseParser, page: str) -> dict:
+    """Parse a Detailed Information Section page the way it was done before CourseParser.extract_extra_course_info, as a baseline.
+
+    Args:
+        course_parser (CourseParser): A CourseParser object.
+        page (str): HTML as text of the page.
+
+    Returns:
+        dict: Registration availability and Extra information of the Course.
+    """
+    soup = BeautifulSoup(page, features='html.parser')
+
+    table = soup.find('table', {'class': 'datadisplaytable', 'summary': SEATING_TABLE})
+    rows = table.find_all('tr')
+
+    seats = rows[1].find_all('td')
+    capacity, registered, remaining = int(seats[0].text), int(seats[1].text), int(seats[2].text)
+    waitlisted = int(rows[2].find_all('td')[1].text)
+
+    return {'Capacity': capacity, 'Registered': registered, 'Remaining': remaining, 'Waitlisted': waitlisted, 'Extra': course_parser.parse_extra_course_info(page)}
+
+def time_function(function, pages: list[str], repeat: int = REPEAT) -> float:
+    """Time a function over every page of a corpus.
+
+    Args:
+        function: Function that takes a page.
+        pages (list[str]): The corpus.
+        repeat (int, optional): Number of runs. Defaults to REPEAT.
+
+    Returns:
+        float: Time (in seconds) of the fastest run.
+    """
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        for page in pages: function(page)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def benchmark_detail(pages: list[str], repeat: int = REPEAT) -> dict:
+    """Compare CourseParser.extract_extra_course_info with the reference parser over a corpus of Detailed Information Section pages.
+
+    Args:
+        pages (list[str]): The corpus.
+        repeat (int, optional): Number of runs. Defaults to REPEAT.
+
+    Returns:
+        dict: Number of pages, time (in seconds) of each parser, speedup, and number of pages where the parsers disagree.
+    """
+    course_parser = CourseParser({})
+    reference = lambda page: reference_extra_course_info(course_parser, page)
+
+    # Only pages the reference parser can handle are compared.
+    mismatches = 0
+    for page in pages:
+        try: expected = reference(page)
+        except Exception: continue
+        if course_parser.extract_extra_course_info(page) != expected: mismatches += 1
+
+    reference_time = time_function(reference, pages, repeat)
+    extractor_time = time_function(course_parser.extract_extra_course_info, pages, repeat)
+
+    return {
+        'Pages': len(pages),
+        'Reference': reference_time,
+        'Extractor': extractor_time,
+        'Speedup': reference_time / extractor_time if extractor_time else None,
+        'Mismatches': mismatches
+    }
+
+def time_stages(parser: Parser, stages: dict) -> None:
+    """Wrap the methods of STAGES of a Parser, so each call adds to the time of its stage.
+
+    Args:
+        parser (Parser): A Parser object.
+        stages (dict): Calls and time (in seconds) of each stage. Updated in place.
+    """
+    def wrap(name: str, method):
+        stage = stages.setdefault(STAGES[name], {'Calls': 0, 'Time': 0})
+        
+        def add(start: float) -> None:
+            stage['Calls'] += 1
+            stage['Time'] += perf_counter() - start
+        
+        if asyncio.iscoroutinefunction(method):
+            async def timed(*args, **kwargs):
+                start = perf_counter()
+                try: return await method(*args, **kwargs)
+                finally: add(start)
+        else:
+            def timed(*args, **kwargs):
+                start = perf_counter()
+                try: return method(*args, **kwargs)
+                finally: add(start)
+        
+        return timed
+    
+    for name in STAGES: setattr(parser, name, wrap(name, getattr(parser, name)))
+
+def get_peak_rss() -> float:
+    """Peak resident set size of the current process.
+
+    Returns:
+        float: Peak RSS (in MB), or None if it cannot be measured on this platform.
+    """
+    try: import resource
+    except ImportError: return None
+    
+    # ru_maxrss is in bytes on macOS, and in kilobytes elsewhere.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if platform == 'darwin' else 1024)
+
+def serve(ready: Queue, courses: int, terms: int, latency: float, jitter: float, error_rate: float) -> None:
+    """Run a FakeBanner server with a SyntheticSite, meant to be the target of a Process. Its port is put on the queue once it is ready.
+    """
+    server = FakeBanner(SyntheticSite(courses, terms), 0, latency, jitter, error_rate)
+    ready.put(server.port)
+    server.serve_forever()
+
+def benchmark_parser(courses: int = 500, terms: int = 1, latency: float = 0, jitter: float = 0, error_rate: float = 0, stream_listing: bool = False, chunk_load: bool = False, workers: int = 0) -> dict:
+    """Run get_calendars and get_courses of a Parser against a FakeBanner server. The server runs in its own process, so the
+    measurements (i.e., peak RSS) only cover the Parser.
+
+    Args:
+        courses (int, optional): Number of Courses in each Calendar. Defaults to 500.
+        terms (int, optional): Number of Calendars. Defaults to 1.
+        latency (float, optional): Time (in seconds) each response is delayed by. Defaults to 0.
+        jitter (float, optional): Up to this much time (in seconds) is randomly added to the latency. Defaults to 0.
+        error_rate (float, optional): Share of requests (0 to 1) that fail with a 500 response. Defaults to 0.
+        stream_listing (bool, optional): stream_listing of the Parser. Defaults to False.
+        chunk_load (bool, optional): Chunk Load of the profile. Defaults to False.
+        workers (int, optional): Number of processes to parse pages on, if any. Defaults to 0.
+
+    Returns:
+        dict: Measurements of the run.
+    """
+    ready = Queue()
+    server = Process(target=serve, args=(ready, courses, terms, latency, jitter, error_rate), daemon=True)
+    server.start()
+    port = ready.get(timeout=60)
+    
+    executor = ProcessPoolExecutor(workers) if workers else None
+    cwd, directory = getcwd(), TemporaryDirectory()
+    try:
+        # The Parser reads and updates the mappings of ./mappings.sqlite and ./mappings.json, which must not be those of the real schools.
+        chdir(directory.name)
+        with open('./mappings.json', 'w', encoding='UTF-8') as f: f.write('{}')
+        
+        parser = Parser(get_profile(port, **{'Chunk Load': chunk_load}), stream_listing=stream_listing, executor=executor)
+        stages = {}
+        time_stages(parser, stages)
+        
+        start, cpu_start = perf_counter(), process_time()
+        calendars = parser.get_courses(parser.get_calendars(all_calendars=True))
+        elapsed, cpu = perf_counter() - start, process_time() - cpu_start
+        
+        stats = httpx.get(f'http://127.0.0.1:{port}{STATS_PATH}').json()
+    finally:
+        chdir(cwd)
+        directory.cleanup()
+        if executor: executor.shutdown()
+        server.terminate()
+    
+    total_courses, requests = sum([len(calendar['Courses']) for calendar in calendars]), sum(stats['Requests'].values())
+    return {
+        'Calendars': len(calendars),
+        'Courses': total_courses,
+        'Time': elapsed,
+        'CPU Time': cpu,
+        'Courses/s': total_courses / elapsed,
+        'Requests': requests,
+        'Requests/s': requests / elapsed,
+        'Errors': sum(stats['Errors'].values()),
+        'Bytes': stats['Bytes'],
+        'Peak RSS (MB)': get_peak_rss(),
+        'Stages': stages
+    }
+
+def main() -> None:
+    """Run a benchmark from the command line.
+    """
+    arg_parser = ArgumentParser(description='Benchmarks of the Parsing code.')
+    subparsers = arg_parser.add_subparsers(dest='benchmark', required=True)
+
+    detail = subparsers.add_parser('detail', help='Parsing of Detailed Information Section pages, over a corpus of saved pages.')
+    detail.add_argument('--pages', default=None, help='Directory of saved pages (*.html).')
+    detail.add_argument('--cache', default=None, help='PageCache file to take the cached Detailed Information Section pages from.')
+    detail.add_argument('--repeat', type=int, default=REPEAT, help=f'Number of runs, of which the fastest is kept. Defaults to {REPEAT}.')
+
+    run = subparsers.add_parser('run', help='get_calendars and get_courses of a Parser against a local FakeBanner server.')
+    run.add_argument('--courses', type=int, default=500, help='Number of Courses in each Calendar. Defaults to 500.')
+    run.add_argument('--terms', type=int, default=1, help='Number of Calendars. Defaults to 1.')
+    run.add_argument('--latency', type=float, default=0, help='Time (in seconds) each response is delayed by. Defaults to 0.')
+    run.add_argument('--jitter', type=float, default=0, help='Up to this much time (in seconds) is randomly added to the latency. Defaults to 0.')
+    run.add_argument('--error-rate', type=float, default=0, help='Share of requests (0 to 1) that fail with a 500 response. Defaults to 0.')
+    run.add_argument('--stream', action='store_true', help='Parse the Class Schedule Listing while it downloads.')
+    run.add_argument('--chunk-load', action='store_true', help='Load the Class Schedule Listing in chunks of subjects.')
+    run.add_argument('--workers', type=int, default=0, help='Number of processes to parse pages on. Defaults to 0 (parsed in place).')
+    run.add_argument('--output', default=None, help='Write the measurements to this file, as JSON.')
+    run.add_argument('--baseline', default=None, help='Measurements of a previous run. Exits with 1 if Courses/s dropped by more than --tolerance.')
+    run.add_argument('--tolerance', type=float, default=TOLERANCE, help=f'Share of the Courses/s of the baseline that may be lost. Defaults to {TOLERANCE}.')
+
+    args = arg_parser.parse_args()
+
+    if args.benchmark == 'run':
+        result = benchmark_parser(args.courses, args.terms, args.latency, args.jitter, args.error_rate, args.stream, args.chunk_load, args.workers)
+        for key, value in result.items():
+            if key != 'Stages': print(f'{key}: {round(value, 3) if isinstance(value, float) else value}')
+        for stage, stats in result['Stages'].items():
+            if stats['Calls']: print(f'  {stage}: {stats["Time"]:.3f}s ({stats["Calls"]} calls)')
+        
+        if args.output:
+            with open(args.output, 'w', encoding='UTF-8') as f: f.write(dumps(result, indent=4))
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='UTF-8') as f: baseline = loads(f.read())
+            change = result['Courses/s'] / baseline['Courses/s'] - 1
+            print(f'Courses/s vs baseline: {change:+.1%}')
+            if change < -args.tolerance: raise SystemExit(1)
+    
+    elif args.benchmark == 'detail':
+        pages = load_pages(args.pages, args.cache)
+        if not pages: arg_parser.error('No pages found. Use --pages and/or --cache.')
+
+        result = benchmark_detail(pages, args.repeat)
+        print(f'Pages: {result["Pages"]}')
+        print(f'Reference: {result["Reference"]:.3f}s ({result["Reference"] / result["Pages"] * 1e6:.0f}us per page)')
+        print(f'Extractor: {result["Extractor"]:.3f}s ({result["Extractor"] / result["Pages"] * 1e6:.0f}us per page)')
+        print(f'Speedup: {result["Speedup"]:.1f}x')
+        print(f'Mismatches: {result["Mismatches"]}')
+
+if __name__ == '__main__':
+    main()
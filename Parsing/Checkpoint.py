@@ -0,0 +1,264 @@
+from CourseRecord import encode_record
+from argparse import ArgumentParser
+from json import dumps, loads
+from time import time
+from threading import Lock
+from re import compile
+import sqlite3
+import zlib
+
+# Kinds of items checkpointed for each Course, after the Class Schedule Listing. Course descriptions are keyed by the path of their
+# Catalog Entry page (shared by every section of a Course), and registration availability by CRN.
+DESCRIPTION = 'Description'
+DETAIL = 'Detail'
+
+# Number of checkpointed items between commits.
+COMMIT_EVERY = 100
+
+# Age (in seconds) after which a checkpointed Class Schedule Listing, and the items fetched for it, are stale and not resumed. Same
+# as the TTL of the Class Schedule Listing in the page cache (see PageCache.py).
+LISTING_TTL = 6 * 3600
+
+CRN_PATTERN = compile(r'crn_in=([^&]+)')
+CATALOG_PATTERN = compile(r'one_subj=([^&]+)&(?:amp;)?sel_crse_strt=([^&]+)')
+
+def get_crn(path: str) -> str:
+    """Determine the CRN of the Detailed Information Section page of a Course.
+
+    Args:
+        path (str): Path of the page (i.e., "/bwckschd.p_disp_detail_sched?term_in=202310&crn_in=10001").
+
+    Returns:
+        str: The CRN, or the path itself if it has none.
+    """
+    match = CRN_PATTERN.search(path)
+    return match.group(1) if match else path
+
+def get_course_id(path: str) -> tuple[str, str]:
+    """Determine the Course of the Catalog Entry page of a Course, which is shared by every section of the Course.
+
+    Args:
+        path (str): Path of the page (i.e., "/bwckctlg.p_display_courses?term_in=202310&one_subj=MATH&sel_crse_strt=150&...").
+
+    Returns:
+        tuple[str, str]: The Abbreviation and Level of the Course, or None if the path has none.
+    """
+    match = CATALOG_PATTERN.search(path)
+    return match.groups() if match else None
+
+class Checkpoint:
+    def __init__(self, filename: str = './Checkpoint.sqlite', listing_ttl: float = LISTING_TTL) -> None:
+        """Initialize a Checkpoint object, which durably records the progress of a Parser object on each Calendar in a SQLite file:
+        the parsed Class Schedule Listing, and every Course description and registration availability fetched. A run that stops
+        halfway (i.e., the process is killed) resumes from there, and only requests what is missing.
+
+        Items that could not be fetched are recorded as failures, with their error and number of attempts, instead of being silently
+        left empty. Once a Calendar has its Courses, its listing and items are dropped and only its failures are kept, so a later
+        run retries only them (see Parser.retry_failures). A listing older than listing_ttl is never resumed, as its Courses and
+        registration availability are out of date.
+
+        Args:
+            filename (str, optional): Path of the checkpoint file. Defaults to './Checkpoint.sqlite'.
+            listing_ttl (float, optional): Age (in seconds) after which a listing is not resumed. Defaults to LISTING_TTL.
+        """
+        self.filename = filename
+        self.listing_ttl = listing_ttl
+
+        # Counters
+        self.resumed = 0
+        self.stored = 0
+        self.failed = 0
+
+        self._lock = Lock()
+        self._pending = 0 # Changes that have not been committed.
+
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS listings (school TEXT, calendar_id TEXT, courses BLOB, desc_paths TEXT, extra_paths TEXT, updated REAL, PRIMARY KEY (school, calendar_id));
+            CREATE TABLE IF NOT EXISTS items (school TEXT, calendar_id TEXT, kind TEXT, key TEXT, value TEXT, updated REAL, PRIMARY KEY (school, calendar_id, kind, key));
+            CREATE TABLE IF NOT EXISTS failures (school TEXT, calendar_id TEXT, kind TEXT, key TEXT, path TEXT, error TEXT, attempts INTEGER, updated REAL, PRIMARY KEY (school, calendar_id, kind, key));
+            '''
+        )
+
+    def get_listing(self, school: str, calendar_id: str) -> tuple[list[dict], list[str], list[str]]:
+        """Get the checkpointed Class Schedule Listing of a Calendar.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+
+        Returns:
+            tuple[list[dict], list[str], list[str]]: The Courses, and their Course description and registration availability paths
+            (see parse_listing), or None if the listing is not checkpointed or is older than listing_ttl.
+        """
+        with self._lock: row = self._connection.execute('SELECT courses, desc_paths, extra_paths, updated FROM listings WHERE school = ? AND calendar_id = ?', (school, calendar_id)).fetchone()
+        if row is None or time() - row[3] > self.listing_ttl: return None
+
+        return loads(zlib.decompress(row[0])), loads(row[1]), loads(row[2])
+
+    def put_listing(self, school: str, calendar_id: str, courses: list[dict], desc_paths: list[str], extra_paths: list[str]) -> None:
+        """Checkpoint the parsed Class Schedule Listing of a Calendar. It is committed at once.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+            courses (list[dict]): The Courses, as dicts or Course records (see CourseRecord.py).
+            desc_paths (list[str]): Course description path of each Course.
+            extra_paths (list[str]): Registration availability path of each Course.
+        """
+        courses = zlib.compress(dumps(courses, separators=(',', ':'), default=encode_record).encode('UTF-8'), 6)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?, ?)',
+                (school, calendar_id, courses, dumps(desc_paths), dumps(extra_paths), time())
+            )
+            self._connection.commit()
+            self._pending = 0
+
+    def get_items(self, school: str, calendar_id: str, kind: str) -> dict:
+        """Get every checkpointed item of a kind of a Calendar.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+            kind (str): DESCRIPTION or DETAIL.
+
+        Returns:
+            dict: Value of each item, keyed by its key (path or CRN).
+        """
+        with self._lock: rows = self._connection.execute('SELECT key, value FROM items WHERE school = ? AND calendar_id = ? AND kind = ?', (school, calendar_id, kind)).fetchall()
+        self.resumed += len(rows)
+
+        return {key: loads(value) for key, value in rows}
+
+    def put_item(self, school: str, calendar_id: str, kind: str, key: str, value) -> None:
+        """Checkpoint an item that was fetched, and forget its failures.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+            kind (str): DESCRIPTION or DETAIL.
+            key (str): Key of the item (path or CRN).
+            value: Value of the item (a Course description, or registration availability).
+        """
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)', (school, calendar_id, kind, key, dumps(value), time()))
+            self._connection.execute('DELETE FROM failures WHERE school = ? AND calendar_id = ? AND kind = ? AND key = ?', (school, calendar_id, kind, key))
+            self.stored += 1
+            self._pending += 1
+            self._commit_if_needed()
+
+    def fail_item(self, school: str, calendar_id: str, kind: str, key: str, path: str, error: str) -> None:
+        """Record that an item could not be fetched.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+            kind (str): DESCRIPTION or DETAIL.
+            key (str): Key of the item (path or CRN).
+            path (str): Path of the page of the item.
+            error (str): Why the item could not be fetched.
+        """
+        with self._lock:
+            self._connection.execute(
+                '''
+                INSERT INTO failures VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (school, calendar_id, kind, key) DO UPDATE SET error = excluded.error, attempts = attempts + 1, updated = excluded.updated
+                ''',
+                (school, calendar_id, kind, key, path, error, time())
+            )
+            self.failed += 1
+            self._pending += 1
+            self._commit_if_needed()
+
+    def failures(self, school: str, calendar_id: str = None) -> list[dict]:
+        """Get the items that could not be fetched, to retry them.
+
+        Args:
+            school (str): School of the Calendars.
+            calendar_id (str, optional): Calendar ID. Defaults to every Calendar of the school.
+
+        Returns:
+            list[dict]: Calendar ID, Kind, Key, Path, Error and Attempts of each item.
+        """
+        query = 'SELECT calendar_id, kind, key, path, error, attempts FROM failures WHERE school = ?'
+        params = [school]
+        if calendar_id is not None:
+            query += ' AND calendar_id = ?'
+            params.append(calendar_id)
+
+        with self._lock: rows = self._connection.execute(query + ' ORDER BY calendar_id, kind, key', params).fetchall()
+        return [dict(zip(['Calendar ID', 'Kind', 'Key', 'Path', 'Error', 'Attempts'], row)) for row in rows]
+
+    def finish(self, school: str, calendar_id: str) -> None:
+        """Delete the listing and items checkpointed for a Calendar once it has its Courses, keeping only its failures.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+        """
+        with self._lock:
+            for table in ['listings', 'items']: self._connection.execute(f'DELETE FROM {table} WHERE school = ? AND calendar_id = ?', (school, calendar_id))
+            self._connection.commit()
+            self._pending = 0
+
+    def clear(self, school: str, calendar_id: str) -> None:
+        """Delete everything checkpointed for a Calendar, failures included (i.e., before its listing is loaded again).
+
+        Args:
+            school (str): School of the Calendar.
+            calendar_id (str): Calendar ID.
+        """
+        with self._lock:
+            for table in ['listings', 'items', 'failures']: self._connection.execute(f'DELETE FROM {table} WHERE school = ? AND calendar_id = ?', (school, calendar_id))
+            self._connection.commit()
+            self._pending = 0
+
+    def _commit_if_needed(self) -> None:
+        """An internal function that commits every COMMIT_EVERY changes. Must hold the lock.
+        """
+        if self._pending >= COMMIT_EVERY:
+            self._connection.commit()
+            self._pending = 0
+
+    def stats(self) -> dict:
+        """Get the counters of the checkpoint.
+
+        Returns:
+            dict: Items resumed, stored and failed.
+        """
+        return {'Resumed': self.resumed, 'Stored': self.stored, 'Failed': self.failed}
+
+    def flush(self) -> None:
+        """Commit all changes to the checkpoint file.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Commit all changes and close the checkpoint file.
+        """
+        self.flush()
+        self._connection.close()
+
+def main() -> None:
+    """List the failures recorded in a checkpoint file.
+    """
+    arg_parser = ArgumentParser(description='List the items of a school that could not be fetched, as recorded in a checkpoint file.')
+    arg_parser.add_argument('school', help='School of the profile.')
+    arg_parser.add_argument('--checkpoint', default='./Checkpoint.sqlite', help='Path of the checkpoint file. Defaults to ./Checkpoint.sqlite.')
+    arg_parser.add_argument('--calendar', default=None, help='Calendar ID. Defaults to every Calendar.')
+    args = arg_parser.parse_args()
+
+    checkpoint = Checkpoint(args.checkpoint)
+    failures = checkpoint.failures(args.school, args.calendar)
+    for failure in failures: print(dumps(failure))
+    print(f'{len(failures)} failed items.')
+    checkpoint.close()
+
+if __name__ == '__main__':
+    main()
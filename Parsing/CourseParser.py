@@ -1,32 +1,118 @@
-from re import findall, sub
+from ListingParser import listing_rows
+from CourseRecord import Course
+from MeetingTimes import encode_meeting
+from LogConfig import configure_logging
+from re import findall, sub, compile, IGNORECASE, DOTALL
 import logging
 
+# Registration availability fields of a Course, in the order of the seating table of the Detailed Information Section page.
+SEAT_FIELDS = ['Capacity', 'Registered', 'Remaining', 'Waitlisted']
+SEATING_TABLE = 'This layout table is used to present the seating numbers.'
+CELL_PATTERN = compile(r'<td[^>]*>(.*?)</td>', IGNORECASE | DOTALL)
+TAG_PATTERN = compile(r'<[^>]*>')
+TABLE_END_PATTERN = compile(r'</table', IGNORECASE)
+
+# Patterns of the fields of the Detailed Information Section page. A field is the lines (separated by <br />) after its label.
+FIELD_LABEL_PATTERN = compile(r'class="fieldlabeltext">(.*?)</SPAN', DOTALL)
+FIELD_END_PATTERN = compile(r'<SPAN|</TD')
+ANCHOR_PATTERN = compile(r'<a href="([^"]*)">(.*?)</a>')
+LINE_PATTERN = compile(r'(?<=<br />)(.*?)(?=<br />)')
+
 REQUIRED_FIELDS = ['Prerequisites:', 'Corequisites:', 'Mutual Exclusions:', 'Mutual Exclusion:', 'Cross List Courses:', 'Restrictions:']
 UNNECESSARY_FIELDS = ['Search', 'Associated Term:', 'Capacity', 'Actual', 'Remaining', 'Seats', 'Waitlist Seats', 'Cross List Seats']
 
+# Key of the Extra information each field is stored under. Some schools label Mutual Exclusions in the singular.
+FIELD_KEYS = {field: field.strip(':') for field in REQUIRED_FIELDS} | {'Mutual Exclusion:': 'Mutual Exclusions'}
+
 LOGGER = logging.getLogger(__name__)
-logging.basicConfig(
-    filename = 'Logs.log',
-    encoding = 'UTF-8',
-    format = '=' * 150 + '\n[%(asctime)s | File: %(filename)s | Fn: %(funcName)s | Line: %(lineno)s]\nLevel: %(levelname)s\n%(message)s\n' + '=' * 150 + '\n\n',
-    datefmt = '%Y-%m-%dT%H:%M:%SZ',
-    level = logging.INFO
-)
-
-# Silence other loggers | https://stackoverflow.com/a/71193599
-for module in ['httpx']:
-    logging.getLogger(module).setLevel(logging.WARNING)
+configure_logging()
+
+def parse_listing(source: str | bytes, mappings: dict, backend: str, compact: bool = False) -> tuple[list[dict], list[str], list[str]]:
+    """Parse all Courses of a Class Schedule Listing page with a new CourseParser. Being at the top level of the module, it can be
+    run on a process pool.
+
+    Args:
+        source (str | bytes): The Class Schedule Listing page.
+        mappings (dict): Associated subject mappings of a particular school.
+        backend (str): Listing Parser to extract the rows with. See ListingParser.listing_rows.
+        compact (bool, optional): Whether or not to parse Courses as compact records. See CourseRecord.py. Defaults to False.
+
+    Returns:
+        tuple[list[dict], list[str], list[str]]: List of Course objects, and their Course description and registration availability paths.
+    """
+    course_parser = CourseParser(mappings, compact)
+    courses = course_parser.parse_courses(listing_rows(source, backend))
+    
+    return courses, course_parser.desc_paths, course_parser.extra_course_info_paths
+
+def parse_course_descs(pages: list[str]) -> list[str]:
+    """Parse the Course description of each Catalog Entry page of a batch. Being at the top level of the module, it can be run on a
+    process pool.
+
+    Args:
+        pages (list[str]): HTML as text of Catalog Entry pages.
+
+    Returns:
+        list[str]: Course description of each page, or an empty string if a page could not be parsed.
+    """
+    from bs4 import BeautifulSoup
+    
+    descs = []
+    for page in pages:
+        try:
+            soup = BeautifulSoup(page, features='html.parser')
+            selection = soup.find('td', {'class': 'ntdefault'})
+            
+            descs.append(findall(r'(?<=class="ntdefault"\>)(.*?)(?=\<)', str(selection).replace('\n', ''))[0].strip())
+        except Exception as e:
+            LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            descs.append('')
+    
+    return descs
+
+def parse_extra_course_infos(pages: list[str]) -> list[dict]:
+    """Parse the registration availability information of each Detailed Information Section page of a batch. Being at the top level
+    of the module, it can be run on a process pool.
+
+    Args:
+        pages (list[str]): HTML as text of Detailed Information Section pages.
+
+    Returns:
+        list[dict]: Registration availability information of each page, or empty_extra_course_info() if a page could not be parsed.
+    """
+    course_parser = CourseParser({})
+    infos = []
+    for page in pages:
+        try: info = course_parser.extract_extra_course_info(page)
+        except Exception as e:
+            LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            info = None
+        
+        infos.append(info or empty_extra_course_info())
+    
+    return infos
+
+def empty_extra_course_info() -> dict:
+    """Registration availability information of a Course whose page could not be loaded or parsed.
+
+    Returns:
+        dict: Unknown (None) seats and no extra information, so the Course cannot be mistaken for one without seats.
+    """
+    extra = {'Prerequisites': None, 'Corequisites': None, 'Mutual Exclusions': None, 'Cross List Courses': None, 'Restrictions': None}
+    return {'Capacity': None, 'Registered': None, 'Remaining': None, 'Waitlisted': None, 'Extra': extra}
 
 class CourseParser:
-    def __init__(self, mappings: dict) -> None:
+    def __init__(self, mappings: dict, compact: bool = False) -> None:
         """Initialize a CourseParser Object
 
         Args:
             mappings (dict): Associated subject mappings of a particular school.
+            compact (bool, optional): Whether or not to parse Courses as compact records (see CourseRecord.py) instead of dicts. Defaults to False.
         """
         self.extra_course_info_paths = []
         self.desc_paths = []
         self.mappings = mappings
+        self.compact = compact
     
     def reset_paths(self) -> None:
         """Reset all the saved paths of a CourseParser object, for the next Calendar iteration.
@@ -91,20 +177,30 @@ class CourseParser:
         """Extract all Courses from the rows of the HTML table as Course objects.
 
         Args:
-            rows (list): List of Soup tags corresponding to the rows of the HTML table.
+            rows (list): List of ListingRow (or SoupListingRow) objects corresponding to the rows of the HTML table. See ListingParser.py.
 
         Returns:
-            list[dict]: List of Course objects.
+            list[dict]: List of Course objects (Course records if compact is set).
+        """
+        return list(self.iter_courses(rows))
+    
+    def iter_courses(self, rows: list):
+        """Extract Courses from the rows of the HTML table, yielding each Course object as soon as its rows have been read.
+
+        Args:
+            rows (list): Iterable of ListingRow (or SoupListingRow) objects. Every title row must be followed by its detail row.
+
+        Yields:
+            dict: Course object.
         """
         rows = iter(rows)
         
-        courses = []
         course = {}
 
         while True:
             try:
                 row = next(rows)
-                if row.find('th') and row.find('th')['class'][0] in ['ddtitle', 'ddlabel']:
+                if row.header_class in ['ddtitle', 'ddlabel']:
                     item = row.text.strip().split(' - ')
                     while len(item) != 4: # Instance when Course Name has ' - '
                         item[0] = item[0] + ' - ' + item[1]
@@ -135,38 +231,37 @@ class CourseParser:
                     # Path is typically "/prod/bwckctlg.p_display_courses?..." and hence splitting
                     # by "prod" will get correct path, as "prod" is in the Base Path already
                     # Note: Also works for "bprod"
-                    extra_info_path = row.find('a')['href'].split('prod')[-1]
+                    extra_info_path = row.href.split('prod')[-1]
                     self.extra_course_info_paths.append(extra_info_path)
                     
                     # Get Course-specific information (description, attributes, meeting times)
                     row = next(rows)
                     
                     # See two comments above
-                    desc_path = row.find('a')['href'].split('prod')[-1]
+                    desc_path = row.href.split('prod')[-1]
                     self.desc_paths.append(desc_path)
                     
                     course['Credits'] = findall(r'\d\.\d\d\d.*(?= )', row.text)[0].replace(' TO        ', ' - ')                    
                     course['Attributes'] = findall(r'(?<=Attributes\: )(.*?)(?= \n)', row.text)[0].split(', ') if 'Attributes' in row.text else []
 
                     # All the "Scheduled Meeting Times"
-                    rendezvous = row.find_all('tr')
+                    rendezvous = row.rows
                     
                     if len(rendezvous) != 0: # Handle if no meeting times have been created yet.
-                        del rendezvous[0] # Contains column headers
-                        
-                        for rende in rendezvous:
-                            sub_rows = rende.find_all('td')
+                        for rende in rendezvous[1:]: # First row contains column headers
+                            sub_rows = rende.cells
                             if len(sub_rows) < 6: continue
                             
+                            t = self._format_time(sub_rows[1])
                             course['Properties'].append({ # Courses can have multiple meeting locations/times
-                                'Type': sub_rows[0].text,
-                                'Time': self._format_time(sub_rows[1].text),
-                                'Days': self._format_days(sub_rows[2].text),
-                                'Location': sub_rows[3].text,
-                                'Period': sub_rows[4].text,
-                                'Nature': sub_rows[5].text,
-                                'Instructors': self._format_instructors(sub_rows[6].text)
-                            })
+                                'Type': sub_rows[0],
+                                'Time': t,
+                                'Days': self._format_days(sub_rows[2]),
+                                'Location': sub_rows[3],
+                                'Period': sub_rows[4],
+                                'Nature': sub_rows[5],
+                                'Instructors': self._format_instructors(sub_rows[6])
+                            } | encode_meeting(t, sub_rows[2])) # Start and End (in minutes) and Day Mask, for time filters and conflict checks
                     else: # Handling required for DataTables orthogonal data                        
                         course['Properties'].append({
                             'Type': 'TBA',
@@ -175,13 +270,45 @@ class CourseParser:
                             'Location': 'TBA',
                             'Period': 'TBA',
                             'Nature': 'TBA',
-                            'Instructors': ['TBA']
+                            'Instructors': ['TBA'],
+                            'Start': None,
+                            'End': None,
+                            'Day Mask': 0
                         })
                             
-                    courses.append(course)
+                    yield Course.from_dict(course) if self.compact else course
             except StopIteration: break
-            except Exception as e: LOGGER.exception(f'{type(e)} | {e}\nRow: {row}\nCourse: {course}')
-        return courses
+            except Exception as e:
+                # The Row and Course are only rendered if the error is logged (see LogConfig.ErrorAggregator).
+                LOGGER.exception('%s | %s\nRow: %s\nCourse: %s', type(e), e, row, course)
+    
+    def _format_field(self, field: str, items: list[str]) -> list:
+        """An internal function to format the items of a field of the Detailed Information Section page of a Course.
+
+        Args:
+            field (str): The field, one of REQUIRED_FIELDS.
+            items (list[str]): The lines of the field.
+
+        Returns:
+            list: Formatted items of the field.
+        """
+        if field in ['Mutual Exclusions:', 'Mutual Exclusion:']: return items[1:] # First entry should just be description
+        elif field in ['Prerequisites:']:
+            return [
+                item.replace('  ', ' ').replace('( ', '(').replace('Undergraduate level', '').replace('  ', ' ').replace('( ', '(').strip()
+                for item in items
+            ]
+        elif field in ['Restrictions:']:
+            new_items, req = [], None
+            for item in items:
+                if 'following' in item:
+                    req = {'Description': item, 'Requirements': []}
+                    new_items.append(req)
+                elif req is not None: req['Requirements'].append(item)
+            
+            return new_items
+        
+        return items # Corequisites and Cross List Courses
     
     def parse_extra_course_info(self, source: str) -> dict:
         """Parse the registration availability information of a Course.
@@ -214,24 +341,62 @@ class CourseParser:
                   
                 #with open(f'temp/{field}.txt', 'a') as f: f.write(str(items) + '\n') 
                 
-                if field in ['Corequisites:',  'Cross List Courses:']: stuff[field.strip(':')] = items
-                elif field in ['Mutual Exclusions:', 'Mutual Exclusion:']:
-                    del item[0] # Firste entry should just be description
-                    stuff[field.strip(':')] = items
-                elif field in ['Prerequisites:']:
-                    items = [
-                        item.replace('  ', ' ').replace('( ', '(').replace('Undergraduate level', '').replace('  ', ' ').replace('( ', '(').strip()
-                        for item in items
-                    ]
-                    stuff['Prerequisites'] = items
-                elif field in ['Restrictions:']:
-                    new_items = []
-                    for item in items:
-                        if 'following' in item:
-                            if 'req' in locals(): new_items.append(req) # Initial
-                            req = {'Description': item, 'Requirements': []}
-                        else: req['Requirements'].append(item)
-                    
-                    new_items.append(req)
-                    stuff['Restrictions'] = new_items
-        return stuff    
\ No newline at end of file
+                stuff[FIELD_KEYS[field]] = self._format_field(field, items)
+        return stuff    
+    
+    def extract_extra_course_info(self, source: str) -> dict:
+        """Extract the registration availability and extra information of a Course in a single pass over the Detailed Information
+        Section page, without building a tree of the page. Gives the same results as parsing the seating table with BeautifulSoup and
+        the rest with parse_extra_course_info.
+
+        Args:
+            source (str): HTML as text from the Detailed Information Section page of a Course.
+
+        Returns:
+            dict: Capacity, Registered, Remaining and Waitlisted seats, and the Extra information of the Course, or None if the page
+            has no seating table.
+        """
+        seats = self.parse_seats(source)
+        if seats is None: return None
+        
+        extra = {'Prerequisites': None, 'Corequisites': None, 'Mutual Exclusions': None, 'Cross List Courses': None, 'Restrictions': None}
+        seen = set()
+        
+        for match in FIELD_LABEL_PATTERN.finditer(source):
+            field = match.group(1).strip()
+            if field in seen: continue
+            seen.add(field)
+            
+            if field not in REQUIRED_FIELDS:
+                if field not in UNNECESSARY_FIELDS: LOGGER.debug(f'New Field: {field}')
+                continue
+            
+            # The field runs from (the first occurrence of) its label up to the next label, or the end of the cell.
+            start = source.find(field) + len(field)
+            end = FIELD_END_PATTERN.search(source, start)
+            section = source[start:end.start() if end else len(source)]
+            section = ANCHOR_PATTERN.sub(r'\2', section).replace('\n', '').replace('&nbsp;', '')
+            
+            items = [stripped_item for item in LINE_PATTERN.findall(section) if (stripped_item := item.strip()) and stripped_item != '<br />']
+            extra[FIELD_KEYS[field]] = self._format_field(field, items)
+        
+        return seats | {'Extra': extra}
+    
+    def parse_seats(self, source: str) -> dict:
+        """Parse only the registration availability of a Course, without building a tree of the page or parsing any of its other fields.
+
+        Args:
+            source (str): HTML as text from the Detailed Information Section page of a Course.
+
+        Returns:
+            dict: Capacity, Registered, Remaining and Waitlisted seats of the Course, or None if the page has no seating table.
+        """
+        start = source.find(SEATING_TABLE)
+        if start == -1: return None
+        
+        end = TABLE_END_PATTERN.search(source, start)
+        table = source[start:end.start() if end else len(source)]
+        
+        # Cells are Seats (Capacity, Actual, Remaining) followed by Waitlist Seats (Capacity, Actual, Remaining).
+        cells = [int(TAG_PATTERN.sub('', cell)) for cell in CELL_PATTERN.findall(table)[:5]]
+        return {'Capacity': cells[0], 'Registered': cells[1], 'Remaining': cells[2], 'Waitlisted': cells[4]}
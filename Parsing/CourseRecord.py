@@ -0,0 +1,180 @@
+from MeetingTimes import complete_meeting
+from sys import intern
+
+# Keys of a Course object and of each of its Properties (meeting times), in order.
+COURSE_KEYS = [
+    'CRN', 'Section', 'Subject', 'Abbreviation', 'Level', 'Name', 'Description', 'Credits', 'Capacity', 'Registered', 'Remaining',
+    'Waitlisted', 'Prerequisites', 'Corequisites', 'Mutual Exclusions', 'Cross List Courses', 'Restrictions', 'Attributes', 'Properties'
+]
+MEETING_KEYS = ['Type', 'Time', 'Days', 'Location', 'Period', 'Nature', 'Instructors', 'Start', 'End', 'Day Mask']
+
+# Keys whose values are lists of strings. They are stored as shared tuples, and converted back to lists.
+LIST_KEYS = {'Attributes', 'Days', 'Instructors'}
+
+# Distinct tuples of strings, so identical lists (i.e., ['Monday', 'Wednesday']) are stored once. The table is cleared when it holds
+# MAX_TUPLES of them, so a long-running process does not keep every tuple it has seen. Records keep the tuples they reference.
+MAX_TUPLES = 65536
+_TUPLES = {}
+
+def _get_slot(key: str) -> str:
+    """An internal function that determines the attribute of a key (i.e., "Mutual Exclusions" --> "mutual_exclusions").
+    """
+    return key.lower().replace(' ', '_')
+
+def _compact(key: str, value):
+    """An internal function that interns a value of a record. Strings are interned, and lists of strings of LIST_KEYS become
+    shared tuples of interned strings.
+
+    Args:
+        key (str): Key of the value.
+        value: The value.
+
+    Returns:
+        The compact value.
+    """
+    if isinstance(value, str): return intern(value)
+    if key in LIST_KEYS and isinstance(value, (list, tuple)) and all([isinstance(item, str) for item in value]):
+        value = tuple([intern(item) for item in value])
+        if len(_TUPLES) >= MAX_TUPLES and value not in _TUPLES: _TUPLES.clear()
+        return _TUPLES.setdefault(value, value)
+
+    return value
+
+def _expand(key: str, value):
+    """An internal function that converts a compact value back to its value in a Course object.
+    """
+    if key in LIST_KEYS and isinstance(value, tuple): return list(value)
+    return value
+
+class Record:
+    """Base class of compact records, which store the keys of a dict in slots and can be used like the dict they replace.
+    """
+    __slots__ = ()
+    KEYS = []
+    SLOTS = {} # Attribute of each key
+
+    def __init__(self, *values) -> None:
+        """Initialize a record with the value of each key, in the order of KEYS.
+        """
+        for key, value in zip(self.KEYS, values): setattr(self, self.SLOTS[key], self._compact(key, value))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create a record from its dict.
+
+        Args:
+            data (dict): The dict, with every key of KEYS.
+
+        Returns:
+            Record: The record.
+        """
+        return cls(*[data[key] for key in cls.KEYS])
+
+    def _compact(self, key: str, value):
+        """An internal function that compacts a value of the record. See _compact.
+        """
+        return _compact(key, value)
+
+    def to_dict(self) -> dict:
+        """Convert the record back to its dict, with lists instead of tuples.
+
+        Returns:
+            dict: The dict.
+        """
+        return {key: _expand(key, getattr(self, slot)) for key, slot in self.SLOTS.items()}
+
+    def __getitem__(self, key: str):
+        return getattr(self, self.SLOTS[key])
+
+    def __setitem__(self, key: str, value) -> None:
+        setattr(self, self.SLOTS[key], self._compact(key, value))
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self.SLOTS else default
+
+    def update(self, data: dict) -> None:
+        for key, value in data.items(): self[key] = value
+
+    def keys(self) -> list[str]:
+        return list(self.KEYS)
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.KEYS]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.SLOTS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record): other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    def __reduce__(self):
+        # Strings are interned again when unpickled (i.e., when returned from a process pool).
+        return self.__class__, tuple([getattr(self, slot) for slot in self.SLOTS.values()])
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.to_dict()})'
+
+class Meeting(Record):
+    """Compact record of a meeting time (an item of the Properties of a Course object).
+    """
+    __slots__ = tuple([_get_slot(key) for key in MEETING_KEYS])
+    KEYS = MEETING_KEYS
+    SLOTS = {key: _get_slot(key) for key in MEETING_KEYS}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        # Meetings of outputs written before they were encoded have no Start, End or Day Mask. See MeetingTimes.complete_meeting.
+        return super().from_dict(complete_meeting(data))
+
+class Course(Record):
+    """Compact record of a Course object. Properties are stored as a tuple of Meeting records.
+    """
+    __slots__ = tuple([_get_slot(key) for key in COURSE_KEYS])
+    KEYS = COURSE_KEYS
+    SLOTS = {key: _get_slot(key) for key in COURSE_KEYS}
+
+    def _compact(self, key: str, value):
+        if key == 'Properties' and isinstance(value, (list, tuple)):
+            return tuple([meeting if isinstance(meeting, Meeting) else Meeting.from_dict(meeting) for meeting in value])
+
+        return _compact(key, value)
+
+    def to_dict(self) -> dict:
+        course = super().to_dict()
+        course['Properties'] = [meeting.to_dict() for meeting in self.properties]
+
+        return course
+
+def encode_record(obj) -> dict:
+    """Convert a record to its dict when serializing to JSON (i.e., json.dumps(calendars, default=encode_record)).
+
+    Args:
+        obj: Object that json cannot serialize.
+
+    Raises:
+        TypeError: When the object is not a record.
+
+    Returns:
+        dict: The dict of the record.
+    """
+    if isinstance(obj, Record): return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+def to_dicts(calendars: list[dict]) -> list[dict]:
+    """Convert the Courses of a list of Calendar objects back to dicts, in place.
+
+    Args:
+        calendars (list[dict]): A list of Calendar objects.
+
+    Returns:
+        list[dict]: The same list of Calendar objects.
+    """
+    for calendar in calendars: calendar['Courses'] = [course.to_dict() if isinstance(course, Record) else course for course in calendar['Courses']]
+    return calendars
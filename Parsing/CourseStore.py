@@ -0,0 +1,324 @@
+from CourseRecord import COURSE_KEYS, MEETING_KEYS, encode_record
+from MeetingTimes import complete_meeting
+from argparse import ArgumentParser
+from hashlib import sha256
+from json import dumps, loads
+from threading import Lock
+from time import time
+import sqlite3
+
+# Requisite fields of a Course object, stored one item per row. None (the page was not parsed) is kept apart from an empty list.
+REQUISITE_KEYS = ['Prerequisites', 'Corequisites', 'Mutual Exclusions', 'Cross List Courses', 'Restrictions']
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS calendars (school TEXT, calendar_id TEXT, name TEXT, processing_time INTEGER, updated REAL, PRIMARY KEY (school, calendar_id))',
+    '''CREATE TABLE IF NOT EXISTS courses (
+        id INTEGER PRIMARY KEY, school TEXT, calendar_id TEXT, position INTEGER, crn TEXT, section TEXT, subject TEXT, abbreviation TEXT,
+        level TEXT, name TEXT, description TEXT, credits TEXT, capacity INTEGER, registered INTEGER, remaining INTEGER, waitlisted INTEGER,
+        requisites TEXT, hash TEXT, updated REAL, UNIQUE (school, calendar_id, crn)
+    )''',
+    '''CREATE TABLE IF NOT EXISTS meetings (
+        course_id INTEGER, position INTEGER, type TEXT, time TEXT, start_minute INTEGER, end_minute INTEGER, day_mask INTEGER, location TEXT,
+        period TEXT, nature TEXT, PRIMARY KEY (course_id, position)
+    )''',
+    'CREATE TABLE IF NOT EXISTS meeting_days (course_id INTEGER, meeting INTEGER, position INTEGER, day TEXT)',
+    'CREATE TABLE IF NOT EXISTS instructors (course_id INTEGER, meeting INTEGER, position INTEGER, name TEXT)',
+    'CREATE TABLE IF NOT EXISTS attributes (course_id INTEGER, position INTEGER, attribute TEXT)',
+    'CREATE TABLE IF NOT EXISTS requisites (course_id INTEGER, kind TEXT, position INTEGER, value TEXT)',
+    'CREATE INDEX IF NOT EXISTS courses_crn ON courses (crn)',
+    'CREATE INDEX IF NOT EXISTS courses_abbreviation_level ON courses (abbreviation, level)',
+    'CREATE INDEX IF NOT EXISTS meetings_time ON meetings (start_minute, end_minute)',
+    'CREATE INDEX IF NOT EXISTS meeting_days_day ON meeting_days (day, course_id)',
+    'CREATE INDEX IF NOT EXISTS meeting_days_course ON meeting_days (course_id)',
+    'CREATE INDEX IF NOT EXISTS instructors_name ON instructors (name, course_id)',
+    'CREATE INDEX IF NOT EXISTS instructors_course ON instructors (course_id)',
+    'CREATE INDEX IF NOT EXISTS attributes_attribute ON attributes (attribute, course_id)',
+    'CREATE INDEX IF NOT EXISTS attributes_course ON attributes (course_id)',
+    'CREATE INDEX IF NOT EXISTS requisites_course ON requisites (course_id)'
+]
+
+# Tables that hold the items of a Course, by course_id.
+CHILD_TABLES = ['meetings', 'meeting_days', 'instructors', 'attributes', 'requisites']
+
+def _get_hash(course: dict) -> str:
+    """An internal function that hashes a Course object, to skip Courses that did not change.
+    """
+    return sha256(dumps(course, sort_keys=True, default=encode_record).encode('UTF-8')).hexdigest()
+
+class CourseStore:
+    def __init__(self, filename: str = './Courses.sqlite') -> None:
+        """Initialize a CourseStore object, which stores Calendars and their Courses in normalized tables of a SQLite file, so they
+        can be queried (i.e., by instructor, or by day and time) without loading every Course.
+
+        Courses are keyed by school, Calendar ID and CRN. Writing a Calendar again updates it in place: Courses that did not change
+        are skipped, changed Courses are updated, and Courses that are gone are deleted.
+
+        Args:
+            filename (str, optional): Path of the store file. Defaults to './Courses.sqlite'.
+        """
+        self.filename = filename
+
+        self._lock = Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA: self._connection.execute(statement)
+        self._connection.commit()
+
+    def writer(self, school: str):
+        """Get a StoreWriter, to pass as the output of a Parser object.
+
+        Args:
+            school (str): School of the Calendars.
+
+        Returns:
+            StoreWriter: Writer of the school.
+        """
+        return StoreWriter(self, school)
+
+    def write_calendar(self, school: str, calendar: dict) -> dict:
+        """Write (or update) a Calendar and its Courses.
+
+        Args:
+            school (str): School of the Calendar.
+            calendar (dict): A Calendar object, whose Courses are dicts or Course records (see CourseRecord.py).
+
+        Returns:
+            dict: Number of Courses inserted, updated, unchanged and deleted.
+        """
+        counts = {'Inserted': 0, 'Updated': 0, 'Unchanged': 0, 'Deleted': 0}
+        now = time()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT INTO calendars VALUES (?, ?, ?, ?, ?) ON CONFLICT (school, calendar_id) DO UPDATE SET name = excluded.name, processing_time = excluded.processing_time, updated = excluded.updated',
+                (school, calendar['Calendar ID'], calendar['Calendar Name'], calendar.get('Processing Time'), now)
+            )
+            existing = {crn: (course_id, digest) for course_id, crn, digest in self._connection.execute(
+                'SELECT id, crn, hash FROM courses WHERE school = ? AND calendar_id = ?', (school, calendar['Calendar ID'])
+            )}
+
+            crns = set()
+            for position, course in enumerate(calendar['Courses']):
+                crns.add(course['CRN'])
+                digest = _get_hash(course)
+                course_id, old_digest = existing.get(course['CRN'], (None, None))
+
+                if old_digest == digest:
+                    counts['Unchanged'] += 1
+                    self._connection.execute('UPDATE courses SET position = ? WHERE id = ?', (position, course_id))
+                    continue
+
+                present = ','.join([key for key in REQUISITE_KEYS if course[key] is not None])
+                values = (
+                    school, calendar['Calendar ID'], position, course['CRN'], course['Section'], course['Subject'], course['Abbreviation'],
+                    course['Level'], course['Name'], course['Description'], course['Credits'], course['Capacity'], course['Registered'],
+                    course['Remaining'], course['Waitlisted'], present, digest, now
+                )
+                if course_id is None:
+                    course_id = self._connection.execute(f'INSERT INTO courses VALUES (NULL, {", ".join(["?"] * len(values))})', values).lastrowid
+                    counts['Inserted'] += 1
+                else:
+                    self._connection.execute(
+                        '''UPDATE courses SET school = ?, calendar_id = ?, position = ?, crn = ?, section = ?, subject = ?, abbreviation = ?,
+                        level = ?, name = ?, description = ?, credits = ?, capacity = ?, registered = ?, remaining = ?, waitlisted = ?,
+                        requisites = ?, hash = ?, updated = ? WHERE id = ?''', values + (course_id,)
+                    )
+                    self._delete_children([course_id])
+                    counts['Updated'] += 1
+
+                self._insert_children(course_id, course)
+
+            removed = [course_id for crn, (course_id, _) in existing.items() if crn not in crns]
+            if removed:
+                self._delete_children(removed)
+                self._connection.executemany('DELETE FROM courses WHERE id = ?', [(course_id,) for course_id in removed])
+                counts['Deleted'] = len(removed)
+
+        return counts
+
+    def _insert_children(self, course_id: int, course: dict) -> None:
+        """An internal function that inserts the meetings, days, instructors, attributes and requisites of a Course. Must hold the lock.
+        """
+        for i, meeting in enumerate(map(complete_meeting, course['Properties'])):
+            self._connection.execute(
+                'INSERT INTO meetings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (course_id, i, meeting['Type'], meeting['Time'], meeting['Start'], meeting['End'], meeting['Day Mask'], meeting['Location'], meeting['Period'], meeting['Nature'])
+            )
+            self._connection.executemany('INSERT INTO meeting_days VALUES (?, ?, ?, ?)', [(course_id, i, j, day) for j, day in enumerate(meeting['Days'])])
+            self._connection.executemany('INSERT INTO instructors VALUES (?, ?, ?, ?)', [(course_id, i, j, name) for j, name in enumerate(meeting['Instructors'])])
+
+        self._connection.executemany('INSERT INTO attributes VALUES (?, ?, ?)', [(course_id, i, attribute) for i, attribute in enumerate(course['Attributes'])])
+        for key in REQUISITE_KEYS:
+            # Items are strings, except for Restrictions (dicts), so every item is stored as JSON.
+            self._connection.executemany('INSERT INTO requisites VALUES (?, ?, ?, ?)', [(course_id, key, i, dumps(item)) for i, item in enumerate(course[key] or [])])
+
+    def _delete_children(self, course_ids: list[int]) -> None:
+        """An internal function that deletes the items of Courses. Must hold the lock.
+        """
+        for table in CHILD_TABLES: self._connection.executemany(f'DELETE FROM {table} WHERE course_id = ?', [(course_id,) for course_id in course_ids])
+
+    def _load_courses(self, where: str, parameters: tuple) -> list[dict]:
+        """An internal function that loads the Course objects matching a condition on the courses table (aliased c).
+
+        Args:
+            where (str): SQL condition.
+            parameters (tuple): Parameters of the condition.
+
+        Returns:
+            list[dict]: List of Course objects, by school, Calendar and position.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                f'''SELECT id, crn, section, subject, abbreviation, level, name, description, credits, capacity, registered, remaining, waitlisted,
+                requisites FROM courses c WHERE {where} ORDER BY school, calendar_id, position''', parameters
+            ).fetchall()
+
+            # Items of the selected Courses, grouped by course_id.
+            selected = f'SELECT id FROM courses c WHERE {where}'
+            children = {}
+            for table, order in [('meetings', 'position'), ('meeting_days', 'meeting, position'), ('instructors', 'meeting, position'), ('attributes', 'position'), ('requisites', 'kind, position')]:
+                children[table] = {}
+                for row in self._connection.execute(f'SELECT * FROM {table} WHERE course_id IN ({selected}) ORDER BY course_id, {order}', parameters):
+                    children[table].setdefault(row[0], []).append(row)
+
+        courses = []
+        for row in rows:
+            course_id = row[0]
+            days, instructors = {}, {}
+            for _, meeting, _, day in children['meeting_days'].get(course_id, []): days.setdefault(meeting, []).append(day)
+            for _, meeting, _, name in children['instructors'].get(course_id, []): instructors.setdefault(meeting, []).append(name)
+
+            requisites = {key: None for key in REQUISITE_KEYS} | {key: [] for key in row[13].split(',') if key}
+            for _, kind, _, value in children['requisites'].get(course_id, []): requisites[kind].append(loads(value))
+
+            course = dict(zip(COURSE_KEYS[:6], row[1:7])) | {'Description': row[7], 'Credits': row[8]}
+            course |= dict(zip(['Capacity', 'Registered', 'Remaining', 'Waitlisted'], row[9:13])) | requisites
+            course['Attributes'] = [attribute for _, _, attribute in children['attributes'].get(course_id, [])]
+            course['Properties'] = [
+                dict(zip(MEETING_KEYS, [meeting_type, t, days.get(i, []), location, period, nature, instructors.get(i, []), start, end, day_mask]))
+                for _, i, meeting_type, t, start, end, day_mask, location, period, nature in children['meetings'].get(course_id, [])
+            ]
+
+            courses.append({key: course[key] for key in COURSE_KEYS})
+
+        return courses
+
+    def get_calendars(self, school: str) -> list[dict]:
+        """Get every Calendar of a school, with its Courses, as returned by Parser.get_courses.
+
+        Args:
+            school (str): School of the Calendars.
+
+        Returns:
+            list[dict]: A list of Calendar objects.
+        """
+        with self._lock:
+            calendars = self._connection.execute('SELECT calendar_id, name, processing_time FROM calendars WHERE school = ? ORDER BY calendar_id DESC', (school,)).fetchall()
+
+        return [
+            {'Calendar ID': calendar_id, 'Calendar Name': name, 'Processing Time': processing_time, 'Courses': self._load_courses('c.school = ? AND c.calendar_id = ?', (school, calendar_id))}
+            for calendar_id, name, processing_time in calendars
+        ]
+
+    def find_courses(self, school: str = None, calendar_id: str = None, crn: str = None, abbreviation: str = None, level: str = None, instructor: str = None, attribute: str = None, day: str = None, start_after: int = None, end_before: int = None, open_seats: bool = False) -> list[dict]:
+        """Find the Courses that match every given condition.
+
+        Args:
+            school (str, optional): School. Defaults to None.
+            calendar_id (str, optional): Calendar ID. Defaults to None.
+            crn (str, optional): CRN. Defaults to None.
+            abbreviation (str, optional): Subject abbreviation (i.e., "MATH"). Defaults to None.
+            level (str, optional): Course level (i.e., "101"). Defaults to None.
+            instructor (str, optional): Name of an instructor of any meeting. Defaults to None.
+            attribute (str, optional): An attribute of the Course. Defaults to None.
+            day (str, optional): Full name of a day (i.e., "Tuesday") the Course meets on. Defaults to None.
+            start_after (int, optional): Minutes since midnight (i.e., 17 * 60) at or after which a meeting starts. Defaults to None.
+            end_before (int, optional): Minutes since midnight at or before which a meeting ends. Defaults to None.
+            open_seats (bool, optional): Whether or not to only find Courses with seats remaining. Defaults to False.
+
+        Returns:
+            list[dict]: List of Course objects.
+        """
+        conditions, parameters = [], []
+        for column, value in [('school', school), ('calendar_id', calendar_id), ('crn', crn), ('abbreviation', abbreviation), ('level', level)]:
+            if value is not None:
+                conditions.append(f'c.{column} = ?')
+                parameters.append(value)
+        if instructor is not None:
+            conditions.append('c.id IN (SELECT course_id FROM instructors WHERE name = ?)')
+            parameters.append(instructor)
+        if attribute is not None:
+            conditions.append('c.id IN (SELECT course_id FROM attributes WHERE attribute = ?)')
+            parameters.append(attribute)
+        if open_seats: conditions.append('c.remaining > 0')
+
+        if day is not None or start_after is not None or end_before is not None:
+            # Day and time must match the same meeting.
+            meeting = ['m.course_id = c.id']
+            if day is not None:
+                meeting.append('EXISTS (SELECT 1 FROM meeting_days d WHERE d.course_id = m.course_id AND d.meeting = m.position AND d.day = ?)')
+                parameters.append(day)
+            if start_after is not None:
+                meeting.append('m.start_minute >= ?')
+                parameters.append(start_after)
+            if end_before is not None:
+                meeting.append('m.end_minute <= ?')
+                parameters.append(end_before)
+            conditions.append(f'EXISTS (SELECT 1 FROM meetings m WHERE {" AND ".join(meeting)})')
+
+        return self._load_courses(' AND '.join(conditions) or '1', tuple(parameters))
+
+    def close(self) -> None:
+        """Close the store file.
+        """
+        self._connection.close()
+
+class StoreWriter:
+    def __init__(self, store: CourseStore, school: str) -> None:
+        """Initialize a StoreWriter object, which writes the Calendars of a school to a CourseStore, as the output of a Parser object.
+
+        Args:
+            store (CourseStore): The store.
+            school (str): School of the Calendars.
+        """
+        self.store = store
+        self.school = school
+
+    def write_calendar(self, calendar: dict) -> dict:
+        """Write (or update) a Calendar and its Courses. See CourseStore.write_calendar.
+        """
+        return self.store.write_calendar(self.school, calendar)
+
+def main() -> None:
+    """Import an output of Parser.get_courses into a store, or find Courses in a store.
+    """
+    arg_parser = ArgumentParser(description='Import Calendars into a SQLite course store, or find Courses in it.')
+    arg_parser.add_argument('--store', default='./Courses.sqlite', help='Path of the store file. Defaults to ./Courses.sqlite.')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Import an output of Parser.get_courses.')
+    import_parser.add_argument('school', help='School of the Calendars.')
+    import_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses. Defaults to ./Output.json.')
+
+    find_parser = subparsers.add_parser('find', help='Find Courses, printed as JSON.')
+    for argument in ['school', 'calendar-id', 'crn', 'abbreviation', 'level', 'instructor', 'attribute', 'day']: find_parser.add_argument(f'--{argument}')
+    find_parser.add_argument('--start-after', type=int, help='Minutes since midnight at or after which a meeting starts.')
+    find_parser.add_argument('--end-before', type=int, help='Minutes since midnight at or before which a meeting ends.')
+    find_parser.add_argument('--open-seats', action='store_true', help='Only find Courses with seats remaining.')
+    args = arg_parser.parse_args()
+
+    store = CourseStore(args.store)
+    if args.command == 'import':
+        with open(args.input, 'r', encoding='UTF-8') as f: calendars = loads(f.read())
+        for calendar in calendars: print(f'{calendar["Calendar Name"]}: {store.write_calendar(args.school, calendar)}')
+    else:
+        courses = store.find_courses(
+            args.school, args.calendar_id, args.crn, args.abbreviation, args.level, args.instructor, args.attribute, args.day,
+            args.start_after, args.end_before, args.open_seats
+        )
+        print(dumps(courses, indent=4))
+    store.close()
+
+if __name__ == '__main__':
+    main()
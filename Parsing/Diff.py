@@ -0,0 +1,179 @@
+from CourseRecord import COURSE_KEYS, Course, Record, encode_record
+from Output import iter_calendars
+from argparse import ArgumentParser
+from json import dumps, loads
+
+# Kinds of changes of a Course between two snapshots.
+ADDED = 'Added'
+REMOVED = 'Removed'
+CHANGED = 'Changed'
+
+def _get_key(calendar: dict, course: dict) -> tuple[str, str]:
+    """An internal function that returns the key of a Course in a snapshot: its Calendar ID and CRN.
+    """
+    return calendar['Calendar ID'], course['CRN']
+
+def diff_course(old: dict, new: dict, fields: list[str] = None) -> dict:
+    """Compare two versions of a Course. When both have the same number of Properties (meeting times), each meeting field is compared
+    on its own (i.e., "Properties.0.Location"), so a room change does not repeat every meeting time.
+
+    Args:
+        old (dict): Old Course object.
+        new (dict): New Course object.
+        fields (list[str], optional): Fields to compare. Defaults to every field of a Course.
+
+    Returns:
+        dict: [old, new] values of each changed field, keyed by field.
+    """
+    changes = {}
+    for field in fields or COURSE_KEYS:
+        old_value, new_value = old[field], new[field]
+        if old_value == new_value: continue
+
+        if field == 'Properties' and len(old_value) == len(new_value):
+            for i, (old_meeting, new_meeting) in enumerate(zip(old_value, new_value)):
+                # Meetings of outputs written before they were encoded have no Start, End or Day Mask.
+                for key in [key for key in new_meeting if key in old_meeting]:
+                    if old_meeting[key] != new_meeting[key]: changes[f'Properties.{i}.{key}'] = [old_meeting[key], new_meeting[key]]
+        else: changes[field] = [old_value, new_value]
+
+    return changes
+
+def diff_snapshots(old_calendars, new_calendars, fields: list[str] = None):
+    """Compare two snapshots of the same school, keyed by Calendar ID and CRN, in linear time. The Calendars of the old snapshot are
+    read first and kept as compact records (see CourseRecord.py), while the new snapshot is only read one Calendar at a time, so
+    both can be streamed (i.e., from read_ndjson or read_columnar).
+
+    Args:
+        old_calendars: Calendar objects of the old snapshot (a list, or an iterator).
+        new_calendars: Calendar objects of the new snapshot (a list, or an iterator).
+        fields (list[str], optional): Fields to compare (i.e., SEAT_FIELDS for seat movement only). Defaults to every field.
+
+    Yields:
+        dict: A change, as {'Calendar ID', 'CRN', 'Change'}, along with the Calendar Name and Course of an added Course, or the
+        Changes (see diff_course) of a changed Course.
+    """
+    old = {}
+    for calendar in old_calendars:
+        for course in calendar['Courses']: old[_get_key(calendar, course)] = course if isinstance(course, Record) else Course.from_dict(course)
+
+    for calendar in new_calendars:
+        for course in calendar['Courses']:
+            key = _get_key(calendar, course)
+            old_course = old.pop(key, None)
+            if old_course is None:
+                yield {'Calendar ID': key[0], 'CRN': key[1], 'Change': ADDED, 'Calendar Name': calendar['Calendar Name'], 'Course': course}
+                continue
+
+            changes = diff_course(old_course.to_dict(), course.to_dict() if isinstance(course, Record) else course, fields)
+            if changes: yield {'Calendar ID': key[0], 'CRN': key[1], 'Change': CHANGED, 'Changes': changes}
+
+    # Courses that are not in the new snapshot (i.e., cancelled sections).
+    for calendar_id, crn in old: yield {'Calendar ID': calendar_id, 'CRN': crn, 'Change': REMOVED}
+
+def _count(summary: dict, change: dict) -> None:
+    """An internal function that adds a change to a summary. See summarize.
+    """
+    summary[change['Change']] += 1
+
+    # Meeting fields are counted once per Course, whichever meeting changed.
+    fields = {field.split('.')[0] + '.' + field.split('.')[-1] if field.startswith('Properties.') else field for field in change.get('Changes', {})}
+    for field in fields: summary['Fields'][field] = summary['Fields'].get(field, 0) + 1
+
+def summarize(changes) -> dict:
+    """Count the changes of a change log.
+
+    Args:
+        changes: Changes, as yielded by diff_snapshots.
+
+    Returns:
+        dict: Number of Courses added, removed and changed, and the number of Courses where each field changed (meeting fields are
+        counted as "Properties.<key>").
+    """
+    summary = {ADDED: 0, REMOVED: 0, CHANGED: 0, 'Fields': {}}
+    for change in changes: _count(summary, change)
+
+    return summary
+
+def apply_changes(calendars: list[dict], changes) -> list[dict]:
+    """Apply a change log to the old snapshot, in place, so it matches the new snapshot. Added Courses are appended to their Calendar.
+
+    Args:
+        calendars (list[dict]): Calendar objects of the old snapshot.
+        changes: Changes, as yielded by diff_snapshots.
+
+    Returns:
+        list[dict]: The same list of Calendar objects.
+    """
+    by_id = {calendar['Calendar ID']: calendar for calendar in calendars}
+    courses = {_get_key(calendar, course): course for calendar in calendars for course in calendar['Courses']}
+    removed = set()
+
+    for change in changes:
+        key = (change['Calendar ID'], change['CRN'])
+        if change['Change'] == ADDED:
+            if key[0] not in by_id:
+                by_id[key[0]] = {'Calendar ID': key[0], 'Calendar Name': change['Calendar Name'], 'Processing Time': 0, 'Courses': []}
+                calendars.append(by_id[key[0]])
+            by_id[key[0]]['Courses'].append(change['Course'])
+        elif change['Change'] == REMOVED: removed.add(key)
+        else:
+            course = courses[key]
+            for field, (_, value) in change['Changes'].items():
+                if field.startswith('Properties.'):
+                    _, i, meeting_key = field.split('.')
+                    course['Properties'][int(i)][meeting_key] = value
+                else: course[field] = value
+
+    if removed:
+        for calendar in calendars: calendar['Courses'] = [course for course in calendar['Courses'] if _get_key(calendar, course) not in removed]
+
+    return calendars
+
+def write_changes(filename: str, changes) -> dict:
+    """Write a change log as newline-delimited JSON, one change per line, as it is produced.
+
+    Args:
+        filename (str): Path of the file.
+        changes: Changes, as yielded by diff_snapshots.
+
+    Returns:
+        dict: Summary of the changes. See summarize.
+    """
+    summary = summarize([])
+    with open(filename, 'w', encoding='UTF-8') as f:
+        for change in changes:
+            f.write(dumps(change, separators=(',', ':'), default=encode_record) + '\n')
+            _count(summary, change)
+
+    return summary
+
+def read_changes(filename: str):
+    """Read a change log written by write_changes, one change at a time.
+
+    Args:
+        filename (str): Path of the file.
+
+    Yields:
+        dict: A change.
+    """
+    with open(filename, 'r', encoding='UTF-8') as f:
+        for line in f:
+            if line.strip(): yield loads(line)
+
+def main() -> None:
+    """Compare two outputs of Parser.get_courses, and write the change log.
+    """
+    arg_parser = ArgumentParser(description='Compare two snapshots (outputs of Parser.get_courses) of the same school, and write what changed for each Course.')
+    arg_parser.add_argument('old', help='Old snapshot (.json, .ndjson, .cols or .sqlite).')
+    arg_parser.add_argument('new', help='New snapshot (.json, .ndjson, .cols or .sqlite).')
+    arg_parser.add_argument('--output', default='./Changes.ndjson', help='Where to write the change log. Defaults to ./Changes.ndjson.')
+    arg_parser.add_argument('--school', default=None, help='School of the Calendars. Required for a CourseStore file.')
+    arg_parser.add_argument('--fields', nargs='+', default=None, help='Fields to compare. Defaults to every field.')
+    args = arg_parser.parse_args()
+
+    summary = write_changes(args.output, diff_snapshots(iter_calendars(args.old, args.school), iter_calendars(args.new, args.school), args.fields))
+    print(dumps(summary, indent=4))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+from CourseRecord import encode_record
+from argparse import ArgumentParser
+from bisect import bisect_left
+from json import dumps, loads
+from re import compile
+
+# Search Panes of the viewer (see Displaying/js/index.js). Like the viewer, meeting panes only use the first Properties of a Course.
+PANES = ['Calendar', 'Subject', 'Level', 'Capacity', 'Attribute', 'Type', 'Time', 'Day', 'Location', 'Nature', 'Instructor']
+
+# Options of the Level pane, as (label, lowest level, highest level).
+LEVEL_OPTIONS = [('000-199', None, 199), ('200-299', 200, 299), ('300-499', 300, 499), ('500-999', 500, 999), ('1000+', 1000, None)]
+
+# Fields of a Course whose text is searched.
+TEXT_FIELDS = ['Name', 'Description', 'Prerequisites', 'Corequisites', 'Mutual Exclusions', 'Cross List Courses', 'Restrictions']
+
+TOKEN_PATTERN = compile(r'[a-z0-9]+')
+LEADING_DIGITS_PATTERN = compile(r'\s*([+-]?\d+)')
+
+def _get_level_options(level: str) -> list[str]:
+    """An internal function that determines the options of the Level pane a level belongs to, like parseInt in the viewer.
+    """
+    match = LEADING_DIGITS_PATTERN.match(level or '')
+    if match is None: return []
+
+    level = int(match.group(1))
+    return [label for label, low, high in LEVEL_OPTIONS if (low is None or level >= low) and (high is None or level <= high)]
+
+def _get_capacity_options(course: dict) -> list[str]:
+    """An internal function that determines the options of the Capacity pane of a Course.
+    """
+    remaining, waitlisted = course['Remaining'] or 0, course['Waitlisted'] or 0
+    options = []
+    if remaining > 0: options.append('Available')
+    if remaining <= 0 and waitlisted <= 0: options.append('Full')
+    if waitlisted > 0: options.append('Waitlisted')
+
+    return options
+
+def get_pane_values(course: dict, calendar_name: str) -> dict:
+    """Determine the values of a Course in each pane.
+
+    Args:
+        course (dict): A Course object.
+        calendar_name (str): Name of the Calendar of the Course.
+
+    Returns:
+        dict: List of values, keyed by pane.
+    """
+    meeting = course['Properties'][0] if course['Properties'] else {}
+    return {
+        'Calendar': [calendar_name],
+        'Subject': [course['Subject']],
+        'Level': _get_level_options(course['Level']),
+        'Capacity': _get_capacity_options(course),
+        'Attribute': list(course['Attributes'] or []),
+        'Type': [meeting['Type']] if meeting else [],
+        'Time': [meeting['Time']] if meeting else [],
+        'Day': list(meeting['Days']) if meeting else [],
+        'Location': [meeting['Location']] if meeting else [],
+        'Nature': [meeting['Nature']] if meeting else [],
+        'Instructor': list(meeting['Instructors']) if meeting else []
+    }
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase tokens of letters and digits.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list[str]: The tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def _get_text(course: dict) -> str:
+    """An internal function that joins the searched fields of a Course into one text.
+    """
+    return ' '.join([dumps(course[field], default=encode_record) if not isinstance(course[field], str) else course[field] for field in TEXT_FIELDS if course[field]])
+
+def _to_bitmap(ids: list[int]) -> int:
+    """An internal function that converts a posting list to a bitmap, where bit i is set for course id i.
+    """
+    data = bytearray(max(ids) // 8 + 1 if ids else 0)
+    for i in ids: data[i >> 3] |= 1 << (i & 7)
+
+    return int.from_bytes(data, 'little')
+
+def _to_ids(bitmap: int) -> list[int]:
+    """An internal function that converts a bitmap to a sorted posting list.
+    """
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    return [i * 8 + bit for i, byte in enumerate(data) if byte for bit in range(8) if byte >> bit & 1]
+
+class FacetIndex:
+    def __init__(self) -> None:
+        """Initialize an empty FacetIndex object. See build and load.
+
+        Courses are numbered by their position in the rows of the viewer: every Course of the first Calendar, then of the second,
+        and so on. For each value of each pane, the index holds the sorted ids of the Courses that have it (its posting list), and
+        for each token of the searched fields, the ids of the Courses whose text contains it. Posting lists are kept as bitmaps (an
+        int, where bit i is set for course id i), so filters and counts are intersections instead of scans.
+        """
+        self.count = 0
+        self.panes = {pane: {} for pane in PANES} # Bitmap of each value, keyed by value
+        self.tokens = {} # Bitmap of each token, keyed by token
+        self._vocabulary = [] # Sorted tokens, for prefix search
+
+    @classmethod
+    def build(cls, calendars: list[dict]):
+        """Build the index of a list of Calendars.
+
+        Args:
+            calendars (list[dict]): A list of Calendar objects, as returned by Parser.get_courses.
+
+        Returns:
+            FacetIndex: The index.
+        """
+        index = cls()
+        postings = {pane: {} for pane in PANES}
+        tokens = {}
+
+        for calendar in calendars:
+            for course in calendar['Courses']:
+                course_id = index.count
+                index.count += 1
+
+                for pane, values in get_pane_values(course, calendar['Calendar Name']).items():
+                    for value in dict.fromkeys(values): postings[pane].setdefault(value, []).append(course_id)
+                for token in set(tokenize(_get_text(course))): tokens.setdefault(token, []).append(course_id)
+
+        index.panes = {pane: {value: _to_bitmap(ids) for value, ids in values.items()} for pane, values in postings.items()}
+        index.tokens = {token: _to_bitmap(ids) for token, ids in tokens.items()}
+        index._vocabulary = sorted(index.tokens)
+
+        return index
+
+    def all(self) -> int:
+        """Get the bitmap of every Course.
+
+        Returns:
+            int: The bitmap.
+        """
+        return (1 << self.count) - 1
+
+    def filter(self, selections: dict, combiner: str = 'or') -> int:
+        """Filter Courses by the options selected in each pane, like the Search Panes of the viewer: within a pane, options are
+        combined by the combiner, and panes are combined with AND.
+
+        Args:
+            selections (dict): List of selected values, keyed by pane. Panes without a selection do not filter.
+            combiner (str, optional): 'or' or 'and', the logic between options of a pane. Defaults to 'or'.
+
+        Returns:
+            int: Bitmap of the Courses.
+        """
+        result = self.all()
+        for pane, values in selections.items():
+            if not values: continue
+
+            bitmaps = [self.panes[pane].get(value, 0) for value in values]
+            selected = bitmaps[0]
+            for bitmap in bitmaps[1:]: selected = selected & bitmap if combiner == 'and' else selected | bitmap
+            result &= selected
+
+        return result
+
+    def search(self, text: str) -> int:
+        """Search Courses by text. Every word of the text must be the start of a token of the Course, so "calc" matches "Calculus".
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: Bitmap of the Courses.
+        """
+        result = self.all()
+        for word in tokenize(text):
+            matches = 0
+            for i in range(bisect_left(self._vocabulary, word), len(self._vocabulary)):
+                if not self._vocabulary[i].startswith(word): break
+                matches |= self.tokens[self._vocabulary[i]]
+            result &= matches
+
+        return result
+
+    def counts(self, bitmap: int = None) -> dict:
+        """Count the Courses of each value of each pane, among a set of Courses (i.e., for cascading panes).
+
+        Args:
+            bitmap (int, optional): Bitmap of the Courses. Defaults to every Course.
+
+        Returns:
+            dict: Count of each value (only values with Courses), keyed by pane.
+        """
+        if bitmap is None: bitmap = self.all()
+
+        counts = {}
+        for pane, values in self.panes.items():
+            counts[pane] = {}
+            for value, value_bitmap in values.items():
+                count = (value_bitmap & bitmap).bit_count()
+                if count: counts[pane][value] = count
+
+        return counts
+
+    def ids(self, bitmap: int) -> list[int]:
+        """Get the sorted ids of the Courses of a bitmap.
+
+        Args:
+            bitmap (int): The bitmap.
+
+        Returns:
+            list[int]: Sorted course ids.
+        """
+        return _to_ids(bitmap)
+
+    def to_dict(self) -> dict:
+        """Convert the index to a JSON-serializable dict, for the viewer.
+
+        Returns:
+            dict: Number of Courses, the values of each pane with their count and sorted posting list, and the posting list of each
+            token.
+        """
+        return {
+            'Count': self.count,
+            'Panes': {
+                pane: {
+                    'Values': list(values),
+                    'Counts': [bitmap.bit_count() for bitmap in values.values()],
+                    'Postings': [_to_ids(bitmap) for bitmap in values.values()]
+                }
+                for pane, values in self.panes.items()
+            },
+            'Tokens': {token: _to_ids(self.tokens[token]) for token in self._vocabulary}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create an index from its dict. See to_dict.
+
+        Args:
+            data (dict): The dict.
+
+        Returns:
+            FacetIndex: The index.
+        """
+        index = cls()
+        index.count = data['Count']
+        index.panes = {pane: {value: _to_bitmap(ids) for value, ids in zip(values['Values'], values['Postings'])} for pane, values in data['Panes'].items()}
+        index.tokens = {token: _to_bitmap(ids) for token, ids in data['Tokens'].items()}
+        index._vocabulary = sorted(index.tokens)
+
+        return index
+
+    def write(self, filename: str) -> None:
+        """Write the index as JSON.
+
+        Args:
+            filename (str): Path of the file.
+        """
+        with open(filename, 'w', encoding='UTF-8') as f: f.write(dumps(self.to_dict(), separators=(',', ':')))
+
+    @classmethod
+    def load(cls, filename: str):
+        """Load an index written by write.
+
+        Args:
+            filename (str): Path of the file.
+
+        Returns:
+            FacetIndex: The index.
+        """
+        with open(filename, 'r', encoding='UTF-8') as f: return cls.from_dict(loads(f.read()))
+
+def main() -> None:
+    """Build the facet index of an output of Parser.get_courses.
+    """
+    arg_parser = ArgumentParser(description='Build the facet and search index of an output of Parser.get_courses, for the viewer.')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses. Defaults to ./Output.json.')
+    arg_parser.add_argument('--output', default='./Facets.json', help='Where to write the index. Defaults to ./Facets.json.')
+    args = arg_parser.parse_args()
+
+    with open(args.input, 'r', encoding='UTF-8') as f: calendars = loads(f.read())
+    index = FacetIndex.build(calendars)
+    index.write(args.output)
+    print(f'{index.count} Courses, {sum([len(values) for values in index.panes.values()])} pane values, {len(index.tokens)} tokens.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+from argparse import ArgumentParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+from threading import Thread, Lock
+from json import dumps
+from time import sleep
+from PageCache import PageCache, PAGE_TYPES, get_page_key, get_page_type
+import random
+
+# Subjects (and their full names) offered by the synthetic school.
+SUBJECTS = {
+    'BIO': 'Biology', 'CHEM': 'Chemistry', 'CSC': 'Computer Science', 'EAP': 'Academic English', 'ECON': 'Economics',
+    'HIST': 'History', 'MATH': 'Mathematics', 'PHYS': 'Physics', 'PSYC': 'Psychology', 'WRTG': 'Writing'
+}
+TITLES = ['Writing &amp; Grammar 1', 'Calculus - Part II', 'Intro to Computing', 'Principles I', 'Research Methods', 'Special Topics']
+LEVELS = ['101', '102', '201', '210', '301', '450']
+DAYS = 'MTWRFS'
+TIMES = ['8:00 am - 9:15 am', '10:00 am - 11:15 am', '1:30 pm - 3:45 pm', '6:00 pm - 8:50 pm', '<ABBR title = "To Be Announced">TBA</ABBR>']
+INSTRUCTORS = [
+    'Stefanie Rose   Shapiro (<ABBR title= "Primary">P</ABBR>)<a href="mailto:shapiro@fake.edu"  target="Stefanie Shapiro" ><img src="/wtlgifs/web_email.gif" align="middle" alt="E-mail" class="headerImg" title="E-mail"  NAME="web_email" HSPACE=0 VSPACE=0 BORDER=0 HEIGHT=28 WIDTH=28 /></a>, Bob   Smith',
+    'Ada Lovelace (<ABBR title= "Primary">P</ABBR>)',
+    '<ABBR title = "To Be Announced">TBA</ABBR>'
+]
+
+# Path of the endpoint that reports the counters of the server as JSON.
+STATS_PATH = '/__stats'
+
+def get_profile(port: int, base_path: str = '/prod', school: str = 'Fake University', **keys) -> dict:
+    """A profile of a FakeBanner server, to initialize a Parser object with.
+
+    Args:
+        port (int): Port of the server.
+        base_path (str, optional): Base Path of the site. Defaults to '/prod'.
+        school (str, optional): School of the profile. Defaults to 'Fake University'.
+        **keys: Other keys of the profile (i.e., Chunk Load).
+
+    Returns:
+        dict: Profile of the server.
+    """
+    return {'School': school, 'Chunk Load': False, 'Scheme': 'http', 'Base Host': f'127.0.0.1:{port}', 'Base Path': base_path, 'Listing Parser': 'stream'} | keys
+
+class SyntheticSite:
+    def __init__(self, courses: int = 500, terms: int = 2, seed: int = 0) -> None:
+        """Initialize a SyntheticSite object, which generates the pages of a Banner school with made-up Courses.
+
+        Args:
+            courses (int, optional): Number of Courses (sections) in each Calendar. Defaults to 500.
+            terms (int, optional): Number of Calendars. Defaults to 2.
+            seed (int, optional): Seed of the random generator, so the same arguments always give the same pages. Defaults to 0.
+        """
+        self.base_path = '/prod'
+        
+        rng = random.Random(seed)
+        seasons = [('10', 'Fall'), ('40', 'Spring'), ('30', 'Summer')]
+
+        self.terms = []
+        for i in range(terms):
+            year = 2025 - i // len(seasons)
+            code, season = seasons[i % len(seasons)]
+            self.terms.append((f'{year}{code}', f'{season} {year}' + (' (View only)' if i else '')))
+
+        # Sections of each term, keyed by CRN.
+        self.sections = {}
+        for term, _ in self.terms:
+            self.sections[term] = {}
+            for i in range(courses):
+                subject, level = rng.choice(list(SUBJECTS)), rng.choice(LEVELS)
+                capacity = rng.randint(10, 40)
+                self.sections[term][str(10000 + i)] = {
+                    'Subject': subject, 'Level': level, 'Section': f'{i % 3 + 1:03d}',
+                    'Title': TITLES[sum(map(ord, subject + level)) % len(TITLES)],
+                    'Capacity': capacity, 'Registered': rng.randint(0, capacity), 'Waitlisted': rng.randint(0, 3),
+                    'Seed': rng.random()
+                }
+
+    def route(self, method: str, path: str, body: bytes) -> str:
+        """Get the page of a request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path of the request, with its query.
+            body (bytes): Body of the request.
+
+        Returns:
+            str: The page, or None if there is no such page.
+        """
+        parts = urlsplit(path)
+        query, form = parse_qs(parts.query), parse_qs(body.decode('UTF-8'))
+
+        page_type = get_page_type(parts.path)
+        try:
+            if page_type == 'bwckschd.p_disp_dyn_sched': return self.calendar_page()
+            elif page_type == 'bwckgens.p_proc_term_date': return self.search_page(form['p_term'][0])
+            elif page_type == 'bwckschd.p_get_crse_unsec':
+                subjects = [subject for subject in form.get('sel_subj', []) if subject in SUBJECTS]
+                return self.listing_page(form['term_in'][0], subjects or None)
+            elif page_type == 'bwckschd.p_disp_detail_sched': return self.detail_page(query['term_in'][0], query['crn_in'][0])
+            elif page_type == 'bwckctlg.p_display_courses': return self.catalog_page(query['one_subj'][0], query['sel_crse_strt'][0])
+        except (KeyError, IndexError): return None
+
+    def calendar_page(self) -> str:
+        """The Dynamic Schedule page, to select a Calendar.
+        """
+        options = ''.join([f'<OPTION VALUE="{term}">{name}</OPTION>\n' for term, name in self.terms])
+        return (
+            '<HTML><HEAD><TITLE>Dynamic Schedule</TITLE></HEAD><BODY><div class="pagetitlediv"><h2>Select Term or Date Range</h2></div>'
+            '<FORM ACTION="/prod/bwckgens.p_proc_term_date" METHOD="post"><INPUT TYPE="hidden" NAME="p_calling_proc" VALUE="bwckschd.p_disp_dyn_sched">'
+            f'<SELECT NAME="p_term" SIZE="1" ID="term_input_id"><OPTION VALUE="">None</OPTION>\n{options}</SELECT>'
+            '<INPUT TYPE="submit" VALUE="Submit"></FORM></BODY></HTML>'
+        )
+
+    def search_page(self, term: str) -> str:
+        """The Class Schedule Search page of a Calendar.
+        """
+        hidden = ''.join([f'<INPUT TYPE="hidden" NAME="{name}" VALUE="dummy">' for name in ['sel_subj', 'sel_day', 'sel_schd', 'sel_insm', 'sel_camp', 'sel_levl', 'sel_sess', 'sel_instr', 'sel_ptrm', 'sel_attr']])
+        subjects = ''.join([f'<OPTION VALUE="{key}">{value}</OPTION>' for key, value in SUBJECTS.items()])
+        return (
+            '<HTML><HEAD><TITLE>Class Schedule Search</TITLE></HEAD><BODY><h2>Class Schedule Search</h2><FORM ACTION="/prod/bwckschd.p_get_crse_unsec" METHOD="post">'
+            f'<INPUT TYPE="hidden" NAME="term_in" VALUE="{term}">{hidden}<SELECT NAME="sel_subj" SIZE="10" MULTIPLE>{subjects}</SELECT>'
+            '<INPUT TYPE="text" NAME="sel_crse" SIZE="5"><INPUT TYPE="text" NAME="sel_title"><SELECT NAME="sel_levl"><OPTION VALUE="%">All</OPTION></SELECT>'
+            '<SELECT NAME="begin_hh"><OPTION VALUE="0">00</OPTION></SELECT></FORM></BODY></HTML>'
+        )
+
+    def listing_page(self, term: str, subjects: list[str] = None) -> str:
+        """The Class Schedule Listing page of a Calendar, with the Courses of some (or all) subjects.
+        """
+        page = [
+            '<HTML><HEAD><TITLE>Class Schedule Listing</TITLE></HEAD><BODY><div class="pagetitlediv"><h2>Class Schedule Listing</h2></div>\n<div class="pagebodydiv">\n'
+            '<TABLE  CLASS="datadisplaytable" SUMMARY="This layout table is used to present the sections found" WIDTH="100%"><CAPTION class="captiontext">Sections Found</CAPTION>\n'
+        ]
+        for crn, section in self.sections[term].items():
+            if subjects is not None and section['Subject'] not in subjects: continue
+            rng = random.Random(section['Seed'])
+
+            page.append(f'<TR>\n<TH CLASS="ddtitle" scope="colgroup" ><A HREF="/prod/bwckschd.p_disp_detail_sched?term_in={term}&amp;crn_in={crn}">{section["Title"]} - {crn} - {section["Subject"]} {section["Level"]} - {section["Section"]}</A></TH>\n</TR>\n')
+            page.append('<TR>\n<TD CLASS="dddefault">\n<SPAN class="fieldlabeltext">Associated Term: </SPAN>Term \n<BR>\n<SPAN class="fieldlabeltext">Levels: </SPAN>Undergraduate \n<BR>\n')
+            if rng.random() < 0.5: page.append('<SPAN class="fieldlabeltext">Attributes: </SPAN>Honors, Writing Intensive \n<BR>\n')
+            page.append(
+                '<BR>\nClassroom, In Person Instructional Method\n<BR>\n       4.000 Credits\n<BR>\n'
+                f'<A HREF="/prod/bwckctlg.p_display_courses?term_in={term}&amp;one_subj={section["Subject"]}&amp;sel_crse_strt={section["Level"]}&amp;sel_crse_end={section["Level"]}&amp;sel_subj=&amp;sel_levl=">View Catalog Entry</A>\n<BR>\n<BR>\n'
+            )
+
+            meetings = rng.randint(0, 2)
+            if meetings:
+                headers = ''.join([f'<TH CLASS="ddheader" scope="col" >{header}</TH>\n' for header in ['Type', 'Time', 'Days', 'Where', 'Date Range', 'Schedule Type', 'Instructors']])
+                page.append(f'<TABLE  CLASS="datadisplaytable" SUMMARY="This table lists the scheduled meeting times and assigned instructors for this class.."><CAPTION class="captiontext">Scheduled Meeting Times</CAPTION>\n<TR>\n{headers}</TR>\n')
+                for _ in range(meetings):
+                    days = ''.join(sorted(rng.sample(DAYS, rng.randint(0, 3)), key=DAYS.index)) or '&nbsp;'
+                    page.append(
+                        f'<TR>\n<TD CLASS="dddefault">Class</TD>\n<TD CLASS="dddefault">{rng.choice(TIMES)}</TD>\n<TD CLASS="dddefault">{days}</TD>\n'
+                        f'<TD CLASS="dddefault">Hall {rng.randint(1, 30)}</TD>\n<TD CLASS="dddefault">Aug 26, 2024 - Dec 13, 2024</TD>\n'
+                        f'<TD CLASS="dddefault">Lecture</TD>\n<TD CLASS="dddefault">{rng.choice(INSTRUCTORS)}</TD>\n</TR>\n'
+                    )
+                page.append('</TABLE>\n')
+            page.append('<BR>\n<BR>\n</TD>\n</TR>\n')
+
+        page.append('</TABLE>\n<br />\n</div></BODY></HTML>')
+        return ''.join(page)
+
+    def detail_page(self, term: str, crn: str) -> str:
+        """The Detailed Information Section page of a Course.
+        """
+        section = self.sections[term][crn]
+        rng = random.Random(section['Seed'])
+
+        fields = ''
+        if rng.random() < 0.6: fields += '<SPAN class="fieldlabeltext">Restrictions:</SPAN>\n<br />\nMust be enrolled in one of the following Levels:     \n<br />\n&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;Undergraduate\n<br />\n<br />\n'
+        if rng.random() < 0.5: fields += f'<SPAN class="fieldlabeltext">Prerequisites:</SPAN>\n<br />\n<br />\nUndergraduate level <a href="/prod/bwckctlg.p_display_courses?term_in={term}&amp;one_subj=MATH&amp;sel_subj=&amp;sel_crse_strt=101&amp;sel_crse_end=101&amp;sel_levl=&amp;sel_schd=&amp;sel_coll=&amp;sel_divs=&amp;sel_dept=&amp;sel_attr=">MATH 101</a> Minimum Grade of D\n<br />\n'
+        if rng.random() < 0.3: fields += '<SPAN class="fieldlabeltext">Corequisites:</SPAN>\n<br />\n<br />\nPHYS 102\n<br />\n<br />\n'
+        if rng.random() < 0.3: fields += '<SPAN class="fieldlabeltext">Cross List Courses:</SPAN>\n<br />\n<br />\nEAP 020\n<br />\n<br />\n'
+
+        capacity, registered, waitlisted = section['Capacity'], section['Registered'], section['Waitlisted']
+        return (
+            '<HTML><HEAD><TITLE>Detailed Class Information</TITLE></HEAD><BODY><TABLE  CLASS="datadisplaytable" SUMMARY="This table is used to present the detailed class information." width="100%"><CAPTION class="captiontext">Detailed Class Information</CAPTION>\n'
+            f'<TR>\n<TH CLASS="ddlabel" scope="row" >{section["Title"]} - {crn} - {section["Subject"]} {section["Level"]} - {section["Section"]}<br /><br /></TH>\n</TR>\n<TR>\n<TD CLASS="dddefault">\n'
+            '<SPAN class="fieldlabeltext">Associated Term: </SPAN>Term \n<br />\n<BR>\n'
+            '<TABLE  CLASS="datadisplaytable" SUMMARY="This layout table is used to present the seating numbers." width="100%"><CAPTION class="captiontext">Registration Availability</CAPTION>\n'
+            '<TR>\n<TH CLASS="ddheader" scope="col" ><SPAN class="fieldlabeltext"></SPAN></TH>\n<TH CLASS="ddheader" scope="col" ><SPAN class="fieldlabeltext">Capacity</SPAN></TH>\n<TH CLASS="ddheader" scope="col" ><SPAN class="fieldlabeltext">Actual</SPAN></TH>\n<TH CLASS="ddheader" scope="col" ><SPAN class="fieldlabeltext">Remaining</SPAN></TH>\n</TR>\n'
+            f'<TR>\n<TH CLASS="ddlabel" scope="row" ><SPAN class="fieldlabeltext">Seats</SPAN></TH>\n<TD CLASS="dddefault">{capacity}</TD>\n<TD CLASS="dddefault">{registered}</TD>\n<TD CLASS="dddefault">{capacity - registered}</TD>\n</TR>\n'
+            f'<TR>\n<TH CLASS="ddlabel" scope="row" ><SPAN class="fieldlabeltext">Waitlist Seats</SPAN></TH>\n<TD CLASS="dddefault">10</TD>\n<TD CLASS="dddefault">{waitlisted}</TD>\n<TD CLASS="dddefault">{10 - waitlisted}</TD>\n</TR>\n</TABLE>\n<br />\n'
+            f'{fields}</TD>\n</TR>\n</TABLE></BODY></HTML>'
+        )
+
+    def catalog_page(self, subject: str, level: str) -> str:
+        """The Catalog Entry page of a Course.
+        """
+        return (
+            '<HTML><HEAD><TITLE>Catalog Entries</TITLE></HEAD><BODY><TABLE  CLASS="datadisplaytable" SUMMARY="This table lists the course detail for the selected term." WIDTH="100%"><CAPTION class="captiontext">Catalog Entries</CAPTION>\n'
+            f'<TR>\n<TD CLASS="nttitle" scope="colgroup" ><A HREF="/prod/bwckctlg.p_disp_course_detail">{subject} {level} - {SUBJECTS[subject]}</A></TD>\n</TR>\n'
+            f'<TR>\n<TD CLASS="ntdefault">An introduction to {SUBJECTS[subject]} at the {level} level. It covers theory &amp; practice.\n<br />\n    4.000 Credit hours\n<br />\n</TD>\n</TR>\n</TABLE></BODY></HTML>'
+        )
+
+class RecordedSite:
+    def __init__(self, filename: str, host: str) -> None:
+        """Initialize a RecordedSite object, which serves the pages of a school recorded in a PageCache file, whether expired or not.
+
+        Args:
+            filename (str): Path of the PageCache file.
+            host (str): Base Host and Base Path of the profile the pages were recorded with (i.e., "selfservice.drew.edu/prod").
+        """
+        self.host = host
+        self.base_path = '/' + host.split('/', 1)[1] if '/' in host else ''
+        self.cache = PageCache(filename, ttls={page_type: float('inf') for page_type in PAGE_TYPES})
+
+    def route(self, method: str, path: str, body: bytes) -> str:
+        """Get the recorded page of a request. See SyntheticSite.route.
+        """
+        if path.startswith(self.base_path): path = path[len(self.base_path):]
+
+        cached = self.cache.get(get_page_key(self.host, path, body), get_page_type(path.split('?')[0]))
+        return cached[0].decode('UTF-8') if cached else None
+
+class FakeBanner:
+    def __init__(self, site, port: int = 0, latency: float = 0, jitter: float = 0, error_rate: float = 0, seed: int = 0, charset: str = 'UTF-8') -> None:
+        """Initialize a FakeBanner object, a local HTTP server that serves the pages of a site like a Banner school would, to measure
+        and test a Parser without sending a single request to a school.
+
+        Args:
+            site: SyntheticSite or RecordedSite object.
+            port (int, optional): Port to listen on. Defaults to 0 (any free port).
+            latency (float, optional): Time (in seconds) each response is delayed by. Defaults to 0.
+            jitter (float, optional): Up to this much time (in seconds) is randomly added to the latency. Defaults to 0.
+            error_rate (float, optional): Share of requests (0 to 1) that fail with a 500 response. Defaults to 0.
+            seed (int, optional): Seed of the random generator of jitter and errors. Defaults to 0.
+            charset (str, optional): Charset pages are encoded in and declared with. Defaults to 'UTF-8'.
+        """
+        self.site = site
+        self.charset = charset
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+        # Counters, keyed by page type.
+        self.requests = {}
+        self.errors = {}
+        self.bytes = 0
+
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._thread = None
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._get_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def profile(self, **keys) -> dict:
+        """A profile of the server, to initialize a Parser object with. See get_profile.
+        """
+        return get_profile(self.port, self.site.base_path, **keys)
+
+    def stats(self) -> dict:
+        """Get the counters of the server.
+
+        Returns:
+            dict: Requests and errors by page type, and bytes sent.
+        """
+        with self._lock: return {'Requests': dict(self.requests), 'Errors': dict(self.errors), 'Bytes': self.bytes}
+
+    def _respond(self, method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        """An internal function that gets the response to a request, with the configured latency and errors.
+
+        Returns:
+            tuple[int, bytes]: Status code and body of the response.
+        """
+        if path == STATS_PATH: return 200, dumps(self.stats()).encode('UTF-8')
+
+        page_type = get_page_type(path.split('?')[0]) or 'Other'
+        with self._lock:
+            self.requests[page_type] = self.requests.get(page_type, 0) + 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed: self.errors[page_type] = self.errors.get(page_type, 0) + 1
+
+        if delay: sleep(delay)
+        if failed: return 500, b'Internal Server Error'
+
+        page = self.site.route(method, path, body)
+        if page is None: return 404, b'Not Found'
+
+        page = page.encode(self.charset)
+        with self._lock: self.bytes += len(page)
+        return 200, page
+
+    def _get_handler(self):
+        """An internal function that creates the request handler class of the server.
+        """
+        fake_banner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # Keep connections alive, like a real server.
+            disable_nagle_algorithm = True # Headers and body are written separately, which would otherwise wait on a delayed ACK.
+
+            def _handle(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, page = fake_banner._respond(self.command, self.path, body)
+
+                self.send_response(status)
+                self.send_header('Content-Type', f'text/html; charset={fake_banner.charset}' if self.path != STATS_PATH else 'application/json')
+                self.send_header('Content-Length', str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            do_GET = do_POST = _handle
+
+            def log_message(self, format, *args) -> None: pass
+
+        return Handler
+
+    def start(self) -> None:
+        """Serve requests on a background thread.
+        """
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serve requests on the current thread, until interrupted.
+        """
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """Stop serving requests.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+def main() -> None:
+    """Run a FakeBanner server from the command line.
+    """
+    arg_parser = ArgumentParser(description='A local fake Banner server, serving synthetic or recorded pages.')
+    arg_parser.add_argument('--port', type=int, default=8000, help='Port to listen on. Defaults to 8000.')
+    arg_parser.add_argument('--courses', type=int, default=500, help='Number of Courses in each synthetic Calendar. Defaults to 500.')
+    arg_parser.add_argument('--terms', type=int, default=2, help='Number of synthetic Calendars. Defaults to 2.')
+    arg_parser.add_argument('--cache', default=None, help='Serve the pages recorded in this PageCache file instead of synthetic pages.')
+    arg_parser.add_argument('--host', default=None, help='Base Host and Base Path the pages of --cache were recorded with (i.e., "selfservice.drew.edu/prod").')
+    arg_parser.add_argument('--latency', type=float, default=0, help='Time (in seconds) each response is delayed by. Defaults to 0.')
+    arg_parser.add_argument('--jitter', type=float, default=0, help='Up to this much time (in seconds) is randomly added to the latency. Defaults to 0.')
+    arg_parser.add_argument('--error-rate', type=float, default=0, help='Share of requests (0 to 1) that fail with a 500 response. Defaults to 0.')
+    args = arg_parser.parse_args()
+
+    if args.cache and not args.host: arg_parser.error('--host is required with --cache.')
+    site = RecordedSite(args.cache, args.host) if args.cache else SyntheticSite(args.courses, args.terms)
+
+    server = FakeBanner(site, args.port, args.latency, args.jitter, args.error_rate)
+    print(f'Serving on port {server.port}. Profile:\n{dumps(server.profile(), indent=4)}')
+    try: server.serve_forever()
+    except KeyboardInterrupt: server.stop()
+
+if __name__ == '__main__':
+    main()
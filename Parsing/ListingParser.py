@@ -0,0 +1,211 @@
+from html.parser import HTMLParser
+
+# Tags that never hold children, so they are never pushed onto the open tag stack (mirrors BeautifulSoup's html.parser builder).
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+}
+
+# Header classes of the row that starts a Course. The detail row of the Course follows it.
+TITLE_CLASSES = ['ddtitle', 'ddlabel']
+
+# Listing Parser value that selects the ListingTokenizer. Any other value is handed to BeautifulSoup as its tree builder.
+STREAM_BACKEND = 'stream'
+DEFAULT_BACKEND = 'html.parser'
+
+class ListingRow:
+    """A lightweight record of a single row (tr) of the Class Schedule Listing table.
+
+    Only the pieces of a row that CourseParser.parse_courses reads are kept: the class of the first header cell, the href of the
+    first link, the text of the row, the text of every cell (td) and every nested row.
+    """
+    __slots__ = ('header_class', 'href', 'text', 'cells', 'rows', '_text', '_cells', '_done')
+
+    def __init__(self) -> None:
+        self.header_class = None
+        self.href = None
+        self.text = ''
+        self.cells = []
+        self.rows = []
+
+        self._text = [] # Text fragments, joined when the row closes.
+        self._cells = [] # List of text fragment lists (one per td), joined when the row closes.
+        self._done = False
+
+    def _close(self) -> None:
+        self.text = ''.join(self._text)
+        self.cells = [''.join(cell) for cell in self._cells]
+        self._text, self._cells, self._done = None, None, True
+
+    def __str__(self) -> str:
+        return self.text
+
+class SoupListingRow:
+    """Wraps a BeautifulSoup tr Tag so it exposes the same fields as a ListingRow. Fields are computed lazily.
+    """
+    __slots__ = ('tag',)
+
+    def __init__(self, tag) -> None:
+        self.tag = tag
+
+    @property
+    def header_class(self) -> str:
+        th = self.tag.find('th')
+        return th['class'][0] if th and th.get('class') else None
+
+    @property
+    def href(self) -> str:
+        a = self.tag.find('a')
+        return a.get('href') if a else None
+
+    @property
+    def text(self) -> str:
+        return self.tag.text
+
+    @property
+    def cells(self) -> list[str]:
+        return [td.text for td in self.tag.find_all('td')]
+
+    @property
+    def rows(self) -> list:
+        return [SoupListingRow(tr) for tr in self.tag.find_all('tr')]
+
+    def __str__(self) -> str:
+        return str(self.tag)
+
+class ListingTokenizer(HTMLParser):
+    """An incremental tokenizer for the Class Schedule Listing page.
+
+    HTML can be fed in any number of chunks. Every row of the first datadisplaytable is turned into a ListingRow and is made
+    available (in the same order as soup.find('table', {'class': 'datadisplaytable'}).find_all('tr')) as soon as it, and every row
+    that started before it, is complete. No tree of the page is ever built.
+    """
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.found_table = False # If the datadisplaytable has been seen.
+        self.finished_table = False # If the datadisplaytable has been closed.
+        self.closed = False # If all HTML has been fed.
+
+        self._stack = [] # Open tags for the whole document, as (name, ListingRow or td fragment list or None).
+        self._table_depth = -1 # Index of the datadisplaytable in the stack.
+        self._open_rows = [] # Open rows, innermost last.
+        self._open_cells = [] # Open td fragment lists, innermost last.
+        self._started = [] # Rows in start order that have not been released yet.
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if self.finished_table: return
+
+        if not self.found_table:
+            if tag == 'table' and 'datadisplaytable' in (dict(attrs).get('class') or '').split():
+                self.found_table = True
+                self._table_depth = len(self._stack)
+                self._stack.append((tag, None))
+            elif tag not in VOID_TAGS: self._stack.append((tag, None))
+            return
+
+        if tag == 'tr':
+            row = ListingRow()
+            self._open_rows.append(row)
+            self._started.append(row)
+
+            # Nested rows are also part of every row that contains them.
+            for parent in self._open_rows[:-1]: parent.rows.append(row)
+            self._stack.append((tag, row))
+        elif tag == 'td':
+            cell = []
+            for row in self._open_rows: row._cells.append(cell)
+            self._open_cells.append(cell)
+            self._stack.append((tag, cell))
+        else:
+            if tag == 'th':
+                cls = (dict(attrs).get('class') or '').split()
+                for row in self._open_rows:
+                    if row.header_class is None: row.header_class = cls[0] if cls else ''
+            elif tag == 'a':
+                href = dict(attrs).get('href')
+                for row in self._open_rows:
+                    if row.href is None: row.href = href if href is not None else ''
+
+            if tag not in VOID_TAGS: self._stack.append((tag, None))
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS: self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.finished_table or tag in VOID_TAGS: return
+
+        # An end tag closes the most recent open tag of the same name, and everything opened after it. End tags that do not
+        # match any open tag are ignored.
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag: break
+        else: return
+
+        while len(self._stack) > i:
+            name, item = self._stack.pop()
+            if name == 'tr' and item is not None:
+                item._close()
+                self._open_rows.remove(item)
+            elif name == 'td' and item is not None:
+                # Fragment lists compare by value, so remove by identity.
+                self._open_cells = [cell for cell in self._open_cells if cell is not item]
+
+            if self.found_table and len(self._stack) == self._table_depth: self.finished_table = True
+
+    def handle_data(self, data: str) -> None:
+        if not self._open_rows or self.finished_table: return
+        if self._stack and self._stack[-1][0] in ('script', 'style'): return
+
+        for row in self._open_rows: row._text.append(data)
+        for cell in self._open_cells: cell.append(data)
+
+    def close(self) -> None:
+        super().close()
+
+        # Rows left open at the end of the document are closed, much like BeautifulSoup would.
+        for row in self._open_rows: row._close()
+        self._open_rows, self._open_cells = [], []
+        self.closed = True
+
+    def rows(self) -> list[ListingRow]:
+        """Release all rows that are complete, in document order. While more HTML may still be fed, a trailing title row is held back
+        until the detail row after it is complete, so every release holds whole Courses.
+
+        Returns:
+            list[ListingRow]: Rows completed since the last call.
+        """
+        i = 0
+        while i < len(self._started) and self._started[i]._done: i += 1
+        
+        if i > 0 and not (self.finished_table or self.closed) and self._started[i - 1].header_class in TITLE_CLASSES: i -= 1
+
+        # Drop released rows so a long listing does not pile up in memory.
+        rows = self._started[:i]
+        del self._started[:i]
+
+        return rows
+
+def listing_rows(source: str | bytes, backend: str = DEFAULT_BACKEND) -> list:
+    """Extract all rows of the Class Schedule Listing table, using the chosen backend.
+
+    Args:
+        source (str | bytes): HTML of the Class Schedule Listing page.
+        backend (str, optional): "stream" for the ListingTokenizer, otherwise the name of a BeautifulSoup tree builder. Defaults to "html.parser".
+
+    Returns:
+        list: List of ListingRow (or SoupListingRow) objects.
+    """
+    if backend == STREAM_BACKEND:
+        if isinstance(source, bytes): source = source.decode('UTF-8', errors='replace')
+
+        tokenizer = ListingTokenizer()
+        tokenizer.feed(source)
+        tokenizer.close()
+        return tokenizer.rows()
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(source, features=backend)
+    table = soup.find('table', {'class': 'datadisplaytable'})
+    return [SoupListingRow(row) for row in table.find_all('tr')]
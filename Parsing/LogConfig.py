@@ -0,0 +1,245 @@
+from logging.handlers import QueueHandler, QueueListener
+from json import dumps
+from queue import SimpleQueue
+from threading import Lock
+from time import monotonic
+import traceback
+import logging
+import atexit
+import os
+
+# Log file shared by every module, and the format of its records.
+LOG_FILE = 'Logs.log'
+BANNER_FORMAT = '=' * 150 + '\n[%(asctime)s | File: %(filename)s | Fn: %(funcName)s | Line: %(lineno)s]\nLevel: %(levelname)s\n%(message)s\n' + '=' * 150 + '\n\n'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Errors of the same type at the same endpoint (see ErrorAggregator) are logged in full at most RATE_LIMIT times per WINDOW (in
+# seconds). The others are only counted.
+RATE_LIMIT = 5
+WINDOW = 60
+
+# Frames of a traceback formatted when errors are aggregated. The last ones are where the error was raised.
+TRACEBACK_FRAMES = 3
+
+# Loggers of other packages, which are only logged from WARNING on | https://stackoverflow.com/a/71193599
+QUIET_LOGGERS = ['httpx']
+
+# Handlers and listener installed by configure_logging, so it can replace them.
+_STATE = {'Handlers': [], 'Listener': None, 'Aggregator': None}
+_LOCK = Lock()
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as a line of JSON.
+
+        Args:
+            record (LogRecord): The record.
+
+        Returns:
+            str: Time, Level, Logger, File, Function, Line and Message of the record, along with the Error and Traceback of an
+            exception and the Endpoint of an aggregated error.
+        """
+        entry = {
+            'Time': self.formatTime(record, DATE_FORMAT), 'Level': record.levelname, 'Logger': record.name,
+            'File': record.filename, 'Function': record.funcName, 'Line': record.lineno, 'Message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['Error'] = record.exc_info[0].__name__
+            entry['Traceback'] = self.formatException(record.exc_info)
+        if hasattr(record, 'endpoint'): entry['Endpoint'] = record.endpoint
+
+        return dumps(entry, default=str)
+
+class ErrorAggregator(logging.Filter):
+    def __init__(self, rate_limit: int = RATE_LIMIT, window: float = WINDOW) -> None:
+        """Initialize an ErrorAggregator object, a filter that deduplicates errors: every error is counted by type (i.e.,
+        "KeyError") and endpoint, but only rate_limit of each per window are logged in full. The first error logged after some were
+        suppressed says how many. An error record can name its endpoint with extra={'endpoint': ...}, otherwise it is the module
+        and function that logged it.
+
+        Args:
+            rate_limit (int, optional): Errors of each type and endpoint logged per window. Defaults to RATE_LIMIT.
+            window (float, optional): Length of a window (in seconds). Defaults to WINDOW.
+        """
+        super().__init__()
+        self.rate_limit = rate_limit
+        self.window = window
+
+        # Counters of each error, keyed by type and endpoint: {'Count', 'Logged', 'Suppressed', 'Window Start'}
+        self.errors = {}
+        self._lock = Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Count an error record, and determine whether or not to log it. Records below ERROR are always logged.
+
+        Args:
+            record (LogRecord): The record.
+
+        Returns:
+            bool: Whether or not to log the record.
+        """
+        if record.levelno < logging.ERROR: return True
+
+        if not hasattr(record, 'endpoint'): record.endpoint = f'{record.module}.{record.funcName}'
+        key = (record.exc_info[0].__name__ if record.exc_info else record.levelname, record.endpoint)
+
+        with self._lock:
+            now = monotonic()
+            error = self.errors.setdefault(key, {'Count': 0, 'Logged': 0, 'Suppressed': 0, 'Window Start': now})
+            error['Count'] += 1
+
+            if now - error['Window Start'] >= self.window: error['Window Start'], error['Logged'] = now, 0
+            if error['Logged'] >= self.rate_limit:
+                error['Suppressed'] += 1
+                return False
+
+            error['Logged'] += 1
+            suppressed, error['Suppressed'] = error['Suppressed'], 0
+
+        if suppressed:
+            record.msg = f'{record.getMessage()}\n({suppressed} similar errors were suppressed.)'
+            record.args = None
+        return True
+
+    def counts(self) -> dict:
+        """Get the number of errors of each type and endpoint.
+
+        Returns:
+            dict: Number of errors, keyed by "<type> | <endpoint>".
+        """
+        with self._lock: return {f'{key[0]} | {key[1]}': error['Count'] for key, error in self.errors.items()}
+
+    def summarize(self) -> None:
+        """Log the number of errors of each type and endpoint that were suppressed since they were last logged.
+        """
+        with self._lock:
+            suppressed = {f'{key[0]} | {key[1]}': error['Suppressed'] for key, error in self.errors.items() if error['Suppressed']}
+            for error in self.errors.values(): error['Suppressed'] = 0
+
+        if suppressed: logging.getLogger(__name__).warning(f'Suppressed Errors: {dumps(suppressed)}')
+
+class BackgroundHandler(QueueHandler):
+    def __init__(self, queue: SimpleQueue, target: logging.FileHandler) -> None:
+        """Initialize a BackgroundHandler object, which hands records to a QueueListener that formats and writes them on its own
+        thread, so neither parsing nor the event loop waits on the log file.
+
+        Records are only rendered to their message before they are queued. Tracebacks are formatted on the background thread. A
+        process forked from the one that started the listener (i.e., a worker of a ProcessPoolExecutor) has no listener, and the file
+        of the target may have been locked by it when the process was forked, so such a process opens the log file again and
+        writes to it directly.
+
+        Args:
+            queue (SimpleQueue): Queue of the QueueListener.
+            target (FileHandler): Handler of the QueueListener.
+        """
+        super().__init__(queue)
+        self.target = target
+        self.pid = os.getpid()
+
+        self._forked = None # Process ID and handler of a forked process
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render the message of a record, so its arguments can change or be freed while it waits in the queue.
+        """
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+    def _get_forked_handler(self) -> logging.FileHandler:
+        """An internal function that returns the handler of a forked process, opening the log file again in each process.
+        """
+        if self._forked is None or self._forked[0] != os.getpid():
+            handler = logging.FileHandler(self.target.baseFilename, encoding=self.target.encoding)
+            handler.setFormatter(self.target.formatter)
+            self._forked = (os.getpid(), handler)
+
+        return self._forked[1]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue a record, or write it directly if the listener belongs to another process.
+        """
+        if os.getpid() == self.pid: super().emit(record)
+        else: self._get_forked_handler().handle(record)
+
+def _truncate_tracebacks(formatter: logging.Formatter) -> logging.Formatter:
+    """An internal function that makes a formatter only format the last TRACEBACK_FRAMES frames of tracebacks.
+    """
+    def format_exception(exc_info) -> str:
+        return ''.join(traceback.format_exception(*exc_info, limit=-TRACEBACK_FRAMES)).rstrip()
+
+    formatter.formatException = format_exception
+    return formatter
+
+def configure_logging(filename: str = LOG_FILE, background: bool = False, json_format: bool = False, aggregate: bool = False, level: int = logging.INFO, force: bool = False) -> None:
+    """Configure the logging of every module. By default, records are written to the log file synchronously in the banner
+    format, as with logging.basicConfig.
+
+    Args:
+        filename (str, optional): Path of the log file. Defaults to LOG_FILE.
+        background (bool, optional): Whether or not to write records on a background thread (see BackgroundHandler). Defaults to False.
+        json_format (bool, optional): Whether or not to write each record as a line of JSON (see JSONFormatter), instead of the banner format. Defaults to False.
+        aggregate (bool, optional): Whether or not to deduplicate and rate limit errors (see ErrorAggregator), keeping only the last frames of their tracebacks. Defaults to False.
+        level (int, optional): Lowest level logged. Defaults to logging.INFO.
+        force (bool, optional): Whether or not to replace a configuration that already exists. Defaults to False (nothing is done).
+    """
+    for module in QUIET_LOGGERS: logging.getLogger(module).setLevel(logging.WARNING)
+
+    root = logging.getLogger()
+    with _LOCK:
+        if root.handlers and not force: return
+        _stop()
+
+        formatter = JSONFormatter() if json_format else logging.Formatter(BANNER_FORMAT, DATE_FORMAT)
+        handler = logging.FileHandler(filename, encoding='UTF-8')
+        handler.setFormatter(_truncate_tracebacks(formatter) if aggregate else formatter)
+
+        if background:
+            queue = SimpleQueue()
+            _STATE['Listener'] = QueueListener(queue, handler)
+            _STATE['Listener'].start()
+            handler = BackgroundHandler(queue, handler)
+
+        if aggregate:
+            _STATE['Aggregator'] = ErrorAggregator()
+            handler.addFilter(_STATE['Aggregator'])
+
+        for old_handler in root.handlers[:]: root.removeHandler(old_handler)
+        root.addHandler(handler)
+        root.setLevel(level)
+        _STATE['Handlers'] = [handler]
+
+def get_error_counts() -> dict:
+    """Get the number of errors of each type and endpoint, if errors are aggregated. See ErrorAggregator.counts.
+
+    Returns:
+        dict: Number of errors, keyed by "<type> | <endpoint>".
+    """
+    return _STATE['Aggregator'].counts() if _STATE['Aggregator'] else {}
+
+def _stop() -> None:
+    """An internal function that logs the errors that were suppressed, and writes every queued record. Must hold the lock.
+    """
+    if _STATE['Aggregator']: _STATE['Aggregator'].summarize()
+    if _STATE['Listener']: _STATE['Listener'].stop()
+
+    for handler in _STATE['Handlers']:
+        handler.close()
+        logging.getLogger().removeHandler(handler)
+
+    _STATE.update({'Handlers': [], 'Listener': None, 'Aggregator': None})
+
+def flush_logging() -> None:
+    """Log the errors that were suppressed, and wait for every queued record to be written. Logging keeps working afterwards.
+    """
+    with _LOCK:
+        if _STATE['Aggregator']: _STATE['Aggregator'].summarize()
+        if _STATE['Listener']:
+            # Stopping the listener writes every queued record. It is started again for the records that follow.
+            _STATE['Listener'].stop()
+            _STATE['Listener'].start()
+
+@atexit.register
+def _shutdown() -> None:
+    """An internal function that writes every queued record at exit.
+    """
+    with _LOCK:
+        if _STATE['Handlers']: _stop()
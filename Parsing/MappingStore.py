@@ -0,0 +1,184 @@
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from json import loads, dumps
+from threading import Lock
+import sqlite3
+import atexit
+import os
+
+# Timeout (in seconds) to wait for another process that is updating the store.
+BUSY_TIMEOUT = 30
+
+# Store of each file, keyed by path. See get_mapping_store.
+STORES = {}
+STORES_LOCK = Lock()
+
+class MappingStore:
+    def __init__(self, filename: str = './mappings.sqlite', json_file: str = './mappings.json') -> None:
+        """Initialize a MappingStore object, which keeps the subject mappings of every school in a SQLite file, one row per mapping,
+        so a Parser only loads the mappings of its school, and a new mapping is added without rewriting the others.
+
+        Updates are transactions that lock the file, so any number of Parsers (threads or processes) can add mappings at once without
+        losing any. mappings.json is kept as a readable copy: it is imported whenever it is newer than the store (i.e., it was
+        edited by hand), and written again, atomically, by export_json. Adding a mapping does not write it, so a run that finds
+        many new subjects writes it once (see Parser.get_courses), and close writes it if mappings were added since.
+
+        Args:
+            filename (str, optional): Path of the store. Defaults to './mappings.sqlite'.
+            json_file (str, optional): Path of the readable copy. Defaults to './mappings.json'. None to not keep one.
+        """
+        # Absolute, so the readable copy is written to the same place should the working directory change.
+        self.filename = os.path.abspath(filename)
+        self.json_file = os.path.abspath(json_file) if json_file else None
+
+        self._lock = Lock()
+        self._changed = False # Mappings were added since the readable copy was written.
+
+        # Transactions are started explicitly, see _transaction.
+        self._connection = sqlite3.connect(self.filename, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS mappings (school TEXT, abbreviation TEXT, subject TEXT, PRIMARY KEY (school, abbreviation));
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL);
+            '''
+        )
+
+        with self._transaction(): self._import_json()
+
+    @contextmanager
+    def _transaction(self):
+        """An internal context manager of a transaction that holds the write lock of the file, so processes update it one at a time.
+        """
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try: yield
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+
+    def _import_json(self) -> None:
+        """An internal function that imports the readable copy if it is newer than the store. Must be in a transaction.
+        """
+        if not self.json_file or not os.path.exists(self.json_file): return
+
+        modified = os.path.getmtime(self.json_file)
+        imported = self._connection.execute("SELECT value FROM meta WHERE key = 'Imported'").fetchone()
+        if imported is not None and modified <= imported[0]: return
+
+        with open(self.json_file, 'r', encoding='UTF-8') as f: mappings = loads(f.read())
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO mappings VALUES (?, ?, ?)',
+            [(school, abbreviation, subject) for school, subjects in mappings.items() for abbreviation, subject in subjects.items()]
+        )
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('Imported', ?)", (modified,))
+
+    def _export_json(self) -> None:
+        """An internal function that writes the readable copy atomically, so a reader never sees a half-written file. Must be in a
+        transaction.
+        """
+        self._changed = False
+        if not self.json_file: return
+
+        mappings = {}
+        for school, abbreviation, subject in self._connection.execute('SELECT school, abbreviation, subject FROM mappings ORDER BY school, subject, abbreviation'):
+            mappings.setdefault(school, {})[abbreviation] = subject
+
+        with open(self.json_file + '.tmp', 'w', encoding='UTF-8') as f: f.write(dumps(mappings, indent=4))
+        os.replace(self.json_file + '.tmp', self.json_file)
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('Imported', ?)", (os.path.getmtime(self.json_file),))
+
+    def get(self, school: str) -> dict:
+        """Get the subject mappings of a school.
+
+        Args:
+            school (str): School of the profile.
+
+        Returns:
+            dict: Subject of each abbreviation (i.e., "MATH" --> "Mathematics"), sorted alphabetically by subject.
+        """
+        with self._lock: rows = self._connection.execute('SELECT abbreviation, subject FROM mappings WHERE school = ? ORDER BY subject, abbreviation', (school,)).fetchall()
+        return dict(rows)
+
+    def add(self, school: str, mappings: dict) -> dict:
+        """Add subject mappings of a school. Abbreviations that are already mapped keep their subject.
+
+        Args:
+            school (str): School of the profile.
+            mappings (dict): Subject of each abbreviation.
+
+        Returns:
+            dict: The mappings that were added.
+        """
+        added = {}
+        with self._transaction():
+            for abbreviation, subject in mappings.items():
+                if self._connection.execute('INSERT OR IGNORE INTO mappings VALUES (?, ?, ?)', (school, abbreviation, subject)).rowcount: added[abbreviation] = subject
+
+        if added: self._changed = True
+        return added
+
+    def export_json(self, force: bool = False) -> None:
+        """Write the readable copy, if mappings were added since it was last written.
+
+        Args:
+            force (bool, optional): Whether or not to write it even if no mapping was added. Defaults to False.
+        """
+        if not self._changed and not force: return
+
+        with self._transaction(): self._export_json()
+
+    def schools(self) -> list[str]:
+        """Get the schools that have subject mappings.
+
+        Returns:
+            list[str]: Schools, sorted alphabetically.
+        """
+        with self._lock: return [row[0] for row in self._connection.execute('SELECT DISTINCT school FROM mappings ORDER BY school')]
+
+    def close(self) -> None:
+        """Write the readable copy if mappings were added, and close the store.
+        """
+        self.export_json()
+        with self._lock: self._connection.close()
+
+def get_mapping_store(filename: str = './mappings.sqlite', json_file: str = './mappings.json') -> MappingStore:
+    """Get the store of a file, so every Parser of the process shares one connection to it.
+
+    Args:
+        filename (str, optional): Path of the store. Defaults to './mappings.sqlite'.
+        json_file (str, optional): Path of the readable copy. Defaults to './mappings.json'.
+
+    Returns:
+        MappingStore: The store.
+    """
+    key = os.path.abspath(filename)
+    with STORES_LOCK:
+        if key not in STORES: STORES[key] = MappingStore(filename, json_file)
+
+        return STORES[key]
+
+@atexit.register
+def _shutdown() -> None:
+    """An internal function that writes the readable copy of every shared store that has new mappings at exit.
+    """
+    # A store that was closed has nothing left to write.
+    with STORES_LOCK:
+        for store in STORES.values(): store.export_json()
+
+def main() -> None:
+    """List the subject mappings of a school.
+    """
+    arg_parser = ArgumentParser(description='List the subject mappings of a school, or the schools that have subject mappings.')
+    arg_parser.add_argument('school', nargs='?', default=None, help='School of the profile. Defaults to listing the schools.')
+    arg_parser.add_argument('--store', default='./mappings.sqlite', help='Path of the store. Defaults to ./mappings.sqlite.')
+    args = arg_parser.parse_args()
+
+    store = MappingStore(args.store)
+    if args.school is None: print('\n'.join(store.schools()))
+    else: print(dumps(store.get(args.school), indent=4))
+    store.close()
+
+if __name__ == '__main__':
+    main()
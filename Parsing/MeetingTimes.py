@@ -0,0 +1,106 @@
+from re import compile
+
+# Times of a meeting (i.e., "9:00 AM - 11:15 AM"). Unknown times (i.e., "TBA") have no minutes.
+TIME_PATTERN = compile(r'(\d{1,2}):(\d{2})\s*([AP]M)')
+
+# Bit of each day of the week in a day mask, keyed by its shorthand notation in the Class Schedule Listing.
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'R': 8, 'F': 16, 'S': 32, 'U': 64}
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Length (in minutes) of a slot of an occupancy bitset. Banner times are multiples of 5 minutes.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+def get_minutes(t: str) -> tuple[int, int]:
+    """Determine the start and end of the time of a meeting, in minutes since midnight.
+
+    Args:
+        t (str): Time of a meeting (i.e., "9:00 AM - 11:15 AM").
+
+    Returns:
+        tuple[int, int]: Start and end, or (None, None) if the time is unknown (i.e., "TBA").
+    """
+    times = TIME_PATTERN.findall(t.upper()) if isinstance(t, str) else []
+    if len(times) != 2: return None, None
+
+    return tuple([int(hour) % 12 * 60 + int(minute) + (720 if meridiem == 'PM' else 0) for hour, minute, meridiem in times])
+
+def get_day_mask(days: str) -> int:
+    """Determine the day mask of the days of a meeting, where bit 0 is Monday and bit 6 is Sunday.
+
+    Args:
+        days (str): Shorthand notation of days (i.e., "MWF").
+
+    Returns:
+        int: The day mask, or 0 if the days are unknown.
+    """
+    mask = 0
+    for day in days.strip(): mask |= DAY_BITS.get(day, 0)
+
+    return mask
+
+def get_day_names(day_mask: int) -> list[str]:
+    """Determine the full day names of a day mask.
+
+    Args:
+        day_mask (int): The day mask. See get_day_mask.
+
+    Returns:
+        list[str]: Full day names, from Monday to Sunday.
+    """
+    return [name for i, name in enumerate(DAY_NAMES) if day_mask >> i & 1]
+
+def get_occupancy(start: int, end: int, day_mask: int) -> int:
+    """Determine the slots of the week a meeting occupies, as a bitset: bit (day * SLOTS_PER_DAY + slot) is set for every slot of
+    SLOT_MINUTES minutes the meeting overlaps. Two meetings conflict if, and only if, their bitsets intersect.
+
+    Args:
+        start (int): Start, in minutes since midnight.
+        end (int): End, in minutes since midnight.
+        day_mask (int): Days of the meeting. See get_day_mask.
+
+    Returns:
+        int: The bitset, or 0 if the time or days are unknown.
+    """
+    if start is None or end is None or end <= start: return 0
+
+    first, last = start // SLOT_MINUTES, -(-end // SLOT_MINUTES)
+    day = ((1 << (last - first)) - 1) << first
+
+    occupancy = 0
+    for i in range(len(DAY_NAMES)):
+        if day_mask >> i & 1: occupancy |= day << (i * SLOTS_PER_DAY)
+
+    return occupancy
+
+def encode_meeting(t: str, days: str) -> dict:
+    """Encode the time and days of a meeting numerically, so time filters and conflict checks do not parse strings.
+
+    Args:
+        t (str): Time of the meeting (i.e., "9:00 AM - 11:15 AM").
+        days (str): Shorthand notation of days (i.e., "MWF").
+
+    Returns:
+        dict: Start and End (in minutes since midnight, or None if unknown), and Day Mask (see get_day_mask).
+    """
+    start, end = get_minutes(t)
+    return {'Start': start, 'End': end, 'Day Mask': get_day_mask(days or '')}
+
+def complete_meeting(meeting: dict) -> dict:
+    """Add the numeric encoding (see encode_meeting) to a meeting of an output written before meetings were encoded, deriving it
+    from the Time and the full day names of its Days.
+
+    Args:
+        meeting (dict): A meeting (an item of the Properties of a Course object).
+
+    Returns:
+        dict: The meeting itself if it is encoded, otherwise a copy of it with Start, End and Day Mask.
+    """
+    if 'Start' in meeting: return meeting
+
+    # Days that are not set are formatted from "TBA" (i.e., ['TBA'] or ['Tuesday', 'B', 'A']), and Sunday keeps its shorthand "U".
+    days = meeting.get('Days') or []
+    if 'TBA' in days or 'B' in days: days = []
+
+    shorthand = ''.join([list(DAY_BITS)[DAY_NAMES.index(day)] if day in DAY_NAMES else day for day in days])
+    return dict(meeting) | encode_meeting(meeting.get('Time'), shorthand)
@@ -0,0 +1,253 @@
+from contextlib import contextmanager
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter, process_time
+from PageCache import PAGE_TYPES, get_page_type
+import os
+
+# Upper bounds (in seconds) of the buckets of the request latency histograms. The last bucket (+Inf) is implied.
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+# Stages of a Calendar, in the order they (mostly) happen.
+STAGES = ['Calendar Select', 'Listing Download', 'Listing Parse', 'Description Fetch', 'Description Parse', 'Detail Fetch', 'Detail Parse', 'Merge']
+
+# Prefix of the names of Prometheus metrics.
+PROMETHEUS_PREFIX = 'course_parser'
+
+def get_endpoint(path: str) -> str:
+    """Determine the endpoint of a path, which is the name of its page type.
+
+    Args:
+        path (str): Path of the request.
+
+    Returns:
+        str: Name of the page type (i.e., "Catalog Entry"), or the path without its query if the page type is unknown.
+    """
+    page_type = get_page_type(path.split('?')[0])
+    return PAGE_TYPES[page_type]['Name'] if page_type else path.split('?')[0]
+
+class Metrics:
+    def __init__(self, labels: dict = None) -> None:
+        """Initialize a Metrics object, which collects the time spent in each stage and the requests sent while processing a Calendar.
+
+        Time is measured both as wall time and as CPU time of the process. Blocks of the same stage that overlap (i.e., one per
+        request sent concurrently) are measured as their union, so the time of a stage is never more than the time that passed. As
+        different stages overlap, the CPU time of a stage includes whatever else ran at the same time.
+
+        Args:
+            labels (dict, optional): Labels of the metrics (i.e., School and Calendar). Defaults to None.
+        """
+        self.labels = labels or {}
+        self.stages = {} # Keyed by stage, {'Wall', 'CPU', 'Count'}
+        self.endpoints = {} # Keyed by endpoint, see _get_endpoint
+        self.values = {} # Other values, i.e. number of Courses
+
+        self._open = {} # Stages being measured, keyed by stage: [blocks open, wall and CPU time when the first was opened]
+        self._lock = Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the time spent in a block as part of a stage.
+
+        Args:
+            name (str): Name of the stage, preferably one of STAGES.
+        """
+        self.start_stage(name)
+        try: yield
+        finally: self.stop_stage(name)
+
+    def start_stage(self, name: str) -> None:
+        """Open a block of a stage. The stage is measured from when its first block is opened until its last one is closed.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        with self._lock:
+            blocks = self._open.setdefault(name, [0, perf_counter(), process_time()])
+            blocks[0] += 1
+
+    def stop_stage(self, name: str, count: bool = True) -> None:
+        """Close a block of a stage (see start_stage).
+
+        Args:
+            name (str): Name of the stage.
+            count (bool, optional): Whether or not to count the block, which a block measured in parts (i.e., a download that
+            pauses while each chunk is parsed) only does for its last part. Defaults to True.
+        """
+        with self._lock:
+            blocks = self._open[name]
+            blocks[0] -= 1
+            stage = self.stages.setdefault(name, {'Wall': 0, 'CPU': 0, 'Count': 0})
+            stage['Count'] += count
+            if blocks[0]: return
+
+            del self._open[name]
+            stage['Wall'] += perf_counter() - blocks[1]
+            stage['CPU'] += process_time() - blocks[2]
+
+    def add_stage(self, name: str, wall: float, cpu: float = 0) -> None:
+        """Add time measured elsewhere to a stage.
+
+        Args:
+            name (str): Name of the stage.
+            wall (float): Wall time (in seconds).
+            cpu (float, optional): CPU time (in seconds). Defaults to 0.
+        """
+        with self._lock:
+            stage = self.stages.setdefault(name, {'Wall': 0, 'CPU': 0, 'Count': 0})
+            stage['Wall'] += wall
+            stage['CPU'] += cpu
+            stage['Count'] += 1
+
+    def _get_endpoint(self, path: str) -> dict:
+        """An internal function that returns the counters of the endpoint of a path. Must hold the lock.
+        """
+        return self.endpoints.setdefault(get_endpoint(path), {
+            'Requests': 0, 'Bytes': 0, 'Retries': 0, 'Failures': 0, 'Cached': 0, 'Status Codes': {},
+            'Latency': {'Buckets': [0] * (len(LATENCY_BUCKETS) + 1), 'Sum': 0, 'Count': 0}
+        })
+
+    def observe_request(self, path: str, latency: float, status: int = None, size: int = 0) -> None:
+        """Record a request (one attempt) that was sent.
+
+        Args:
+            path (str): Path of the request.
+            latency (float): Time (in seconds) until the response, or the error.
+            status (int, optional): Status code of the response, or None if the request raised. Defaults to None.
+            size (int, optional): Bytes downloaded. Defaults to 0.
+        """
+        with self._lock:
+            endpoint = self._get_endpoint(path)
+            endpoint['Requests'] += 1
+            endpoint['Bytes'] += size
+
+            status = str(status) if status is not None else 'Error'
+            endpoint['Status Codes'][status] = endpoint['Status Codes'].get(status, 0) + 1
+
+            histogram = endpoint['Latency']
+            histogram['Buckets'][bisect_left(LATENCY_BUCKETS, latency)] += 1
+            histogram['Sum'] += latency
+            histogram['Count'] += 1
+
+    def count(self, path: str, counter: str) -> None:
+        """Increment a counter of the endpoint of a path.
+
+        Args:
+            path (str): Path of the request.
+            counter (str): 'Retries', 'Failures' or 'Cached'.
+        """
+        with self._lock: self._get_endpoint(path)[counter] += 1
+
+    def set_value(self, name: str, value) -> None:
+        """Set a value of the report (i.e., number of Courses).
+
+        Args:
+            name (str): Name of the value.
+            value: The value.
+        """
+        with self._lock: self.values[name] = value
+
+    def report(self) -> dict:
+        """Get a machine-readable report of the metrics.
+
+        Returns:
+            dict: Labels, values, stages (wall and CPU time) and endpoints (requests, bytes, retries, failures, cache hits, status
+            codes and latency histogram, with the upper bound of each bucket) of the metrics.
+        """
+        with self._lock:
+            stages = {name: self.stages[name] for name in STAGES if name in self.stages} | {name: stage for name, stage in self.stages.items() if name not in STAGES}
+            endpoints = {}
+            for name, endpoint in self.endpoints.items():
+                histogram = endpoint['Latency']
+                endpoints[name] = endpoint | {
+                    'Status Codes': dict(endpoint['Status Codes']),
+                    'Latency': {
+                        'Buckets': {str(bound): count for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], histogram['Buckets'])},
+                        'Sum': histogram['Sum'],
+                        'Count': histogram['Count']
+                    }
+                }
+
+            return {
+                'Labels': dict(self.labels),
+                'Values': dict(self.values),
+                'Stages': {name: dict(stage) for name, stage in stages.items()},
+                'Endpoints': endpoints
+            }
+
+def _format_labels(labels: dict) -> str:
+    """An internal function that formats labels for the Prometheus text format.
+    """
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    return '{' + ','.join([f'{key.lower().replace(" ", "_")}="{escape(value)}"' for key, value in labels.items()]) + '}'
+
+def prometheus_text(reports: list[dict]) -> str:
+    """Format reports (see Metrics.report) in the Prometheus text exposition format, i.e. for the textfile collector of node_exporter.
+
+    Args:
+        reports (list[dict]): Reports of Metrics objects, each with its own labels.
+
+    Returns:
+        str: The metrics in the Prometheus text format.
+    """
+    families = {} # Keyed by name, (type, help, [lines])
+    def add(name: str, kind: str, description: str, labels: dict, value) -> None:
+        family = families.setdefault(name, (kind, description, []))
+        family[2].append(f'{name}{_format_labels(labels)} {value}')
+
+    for report in reports:
+        labels = report['Labels']
+        for name, value in report['Values'].items():
+            if isinstance(value, (int, float)): add(f'{PROMETHEUS_PREFIX}_{name.lower().replace(" ", "_")}', 'gauge', f'{name} of the Calendar.', labels, value)
+
+        for name, stage in report['Stages'].items():
+            add(f'{PROMETHEUS_PREFIX}_stage_wall_seconds', 'gauge', 'Wall time spent in a stage.', labels | {'Stage': name}, stage['Wall'])
+            add(f'{PROMETHEUS_PREFIX}_stage_cpu_seconds', 'gauge', 'CPU time of the process while in a stage.', labels | {'Stage': name}, stage['CPU'])
+
+        for name, endpoint in report['Endpoints'].items():
+            endpoint_labels = labels | {'Endpoint': name}
+            add(f'{PROMETHEUS_PREFIX}_requests_total', 'counter', 'Requests sent, including retries.', endpoint_labels, endpoint['Requests'])
+            add(f'{PROMETHEUS_PREFIX}_bytes_total', 'counter', 'Bytes downloaded.', endpoint_labels, endpoint['Bytes'])
+            add(f'{PROMETHEUS_PREFIX}_retries_total', 'counter', 'Requests that were retried.', endpoint_labels, endpoint['Retries'])
+            add(f'{PROMETHEUS_PREFIX}_failures_total', 'counter', 'Requests that failed after every retry.', endpoint_labels, endpoint['Failures'])
+            add(f'{PROMETHEUS_PREFIX}_cached_total', 'counter', 'Requests answered by the page cache or the archive.', endpoint_labels, endpoint['Cached'])
+
+            # Buckets of a Prometheus histogram are cumulative.
+            histogram, cumulative = endpoint['Latency'], 0
+            name = f'{PROMETHEUS_PREFIX}_request_duration_seconds'
+            for bound, count in histogram['Buckets'].items():
+                cumulative += count
+                add(name, 'histogram', 'Latency of requests.', endpoint_labels | {'le': bound}, cumulative)
+            families[name][2].append(f'{name}_sum{_format_labels(endpoint_labels)} {histogram["Sum"]}')
+            families[name][2].append(f'{name}_count{_format_labels(endpoint_labels)} {histogram["Count"]}')
+
+    lines = []
+    for name, (kind, description, samples) in families.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}'] + samples
+
+    return '\n'.join(lines) + '\n'
+
+def merge_reports(reports: list[dict], new_reports: list[dict]) -> list[dict]:
+    """Merge reports (see Metrics.report) into a list of reports. A report replaces the one with the same labels (i.e., of a
+    Calendar parsed again), so the list has one report per label set.
+
+    Args:
+        reports (list[dict]): Reports so far.
+        new_reports (list[dict]): Reports to merge.
+
+    Returns:
+        list[dict]: The merged reports.
+    """
+    labels = [report['Labels'] for report in new_reports]
+    return [report for report in reports if report['Labels'] not in labels] + list(new_reports)
+
+def write_prometheus(filename: str, reports: list[dict]) -> None:
+    """Write reports in the Prometheus text format (see prometheus_text). The file is written to a temporary file first, so a
+    collector never reads a partial file.
+
+    Args:
+        filename (str): Path of the file.
+        reports (list[dict]): Reports of Metrics objects, each with its own labels.
+    """
+    with open(filename + '.tmp', 'w', encoding='UTF-8') as f: f.write(prometheus_text(reports))
+    os.replace(filename + '.tmp', filename)
@@ -0,0 +1,311 @@
+from CourseRecord import COURSE_KEYS, MEETING_KEYS, encode_record
+from MeetingTimes import complete_meeting
+from array import array
+from json import dumps, loads
+import struct
+import sys
+import zlib
+
+# Keys of a Calendar object, other than its Courses, written before the Courses of the Calendar.
+CALENDAR_KEYS = ['Calendar ID', 'Calendar Name', 'Processing Time']
+
+# First bytes of a columnar file, followed by one block per Calendar.
+COLUMNAR_MAGIC = b'COURSECOLS1\n'
+
+# Compression level of the blocks of a columnar file.
+COMPRESSION_LEVEL = 6
+
+# Column of the number of Properties (meeting times) of each Course. The Properties of all Courses are stored in their own columns.
+MEETINGS_COLUMN = 'Meetings'
+
+def _get_header(calendar: dict) -> dict:
+    """An internal function that returns the keys of a Calendar object other than its Courses, and its number of Courses.
+    """
+    return {key: calendar.get(key) for key in CALENDAR_KEYS} | {'Count': len(calendar['Courses'])}
+
+class NDJSONWriter:
+    def __init__(self, filename: str) -> None:
+        """Initialize an NDJSONWriter object, which writes Calendars as newline-delimited JSON: one line for each Calendar (its keys
+        other than Courses, and its number of Courses), followed by one line for each of its Courses. Calendars are written one
+        at a time, so the output of many Calendars is never serialized at once.
+
+        A Calendar is written once it is complete. Its Courses are not streamed as they are parsed, as each needs its description
+        and registration availability first, and the header line needs the Processing Time and number of Courses.
+
+        Args:
+            filename (str): Path of the file. Overwritten if it exists.
+        """
+        self.filename = filename
+        self._file = open(filename, 'w', encoding='UTF-8')
+
+    def write_calendar(self, calendar: dict) -> None:
+        """Write a Calendar and its Courses.
+
+        Args:
+            calendar (dict): A Calendar object, whose Courses are dicts or Course records (see CourseRecord.py).
+        """
+        self._file.write(dumps(_get_header(calendar), separators=(',', ':')) + '\n')
+        for course in calendar['Courses']: self._file.write(dumps(course, separators=(',', ':'), default=encode_record) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+def iter_ndjson(filename: str):
+    """Iterate over the Courses of a newline-delimited JSON file written by NDJSONWriter, one line at a time.
+
+    Args:
+        filename (str): Path of the file.
+
+    Yields:
+        tuple[dict, dict]: The Calendar (without Courses) and a Course object of the Calendar.
+    """
+    calendar = None
+    with open(filename, 'r', encoding='UTF-8') as f:
+        for line in f:
+            if not line.strip(): continue
+
+            item = loads(line)
+            if 'Calendar ID' in item: calendar = {key: item[key] for key in CALENDAR_KEYS}
+            else: yield calendar, item
+
+def read_ndjson(filename: str):
+    """Read the Calendars of a newline-delimited JSON file written by NDJSONWriter, one Calendar at a time.
+
+    Args:
+        filename (str): Path of the file.
+
+    Yields:
+        dict: Calendar object, with its Courses.
+    """
+    calendar = None
+    with open(filename, 'r', encoding='UTF-8') as f:
+        for line in f:
+            if not line.strip(): continue
+
+            item = loads(line)
+            if 'Calendar ID' in item:
+                if calendar is not None: yield calendar
+                calendar = {key: item[key] for key in CALENDAR_KEYS} | {'Courses': []}
+            else: calendar['Courses'].append(item)
+
+    if calendar is not None: yield calendar
+
+def _get_index(value, dictionary: dict, seen: dict) -> int:
+    """An internal function that returns the index of the JSON of a value in the dictionary, adding it if it is new.
+
+    Args:
+        value: The value.
+        dictionary (dict): Index of each JSON value seen so far in the block. Updated in place.
+        seen (dict): Index of each hashable value seen so far in the block, so it is only serialized once. Updated in place.
+
+    Returns:
+        int: Index of the value.
+    """
+    # The type is part of the key, as True == 1 and ['A'] is stored as ('A',).
+    if value is None or isinstance(value, (str, int, float)): key = (type(value), value)
+    elif isinstance(value, (list, tuple)) and all([isinstance(item, str) for item in value]): key = (list, tuple(value))
+    else: key = None
+
+    index = seen.get(key) if key is not None else None
+    if index is None:
+        index = dictionary.setdefault(dumps(value, separators=(',', ':'), default=encode_record), len(dictionary))
+        if key is not None: seen[key] = index
+
+    return index
+
+def _encode_column(values: list, dictionary: dict, seen: dict) -> bytes:
+    """An internal function that dictionary-encodes a column. Each value is replaced by the index of its JSON in the dictionary.
+
+    Args:
+        values (list): Values of the column.
+        dictionary (dict): Index of each JSON value seen so far in the block. Updated in place.
+        seen (dict): See _get_index. Updated in place.
+
+    Returns:
+        bytes: Indexes, as little-endian unsigned 32-bit integers.
+    """
+    indexes = array('I', [_get_index(value, dictionary, seen) for value in values])
+    if sys.byteorder == 'big': indexes.byteswap()
+
+    return indexes.tobytes()
+
+def _decode_column(data: bytes) -> array:
+    """An internal function that reads the indexes of a column. See _encode_column.
+    """
+    indexes = array('I')
+    indexes.frombytes(data)
+    if sys.byteorder == 'big': indexes.byteswap()
+
+    return indexes
+
+class ColumnarWriter:
+    def __init__(self, filename: str) -> None:
+        """Initialize a ColumnarWriter object, which writes Calendars in a compressed columnar format: one block for each Calendar,
+        holding a column for each key of its Courses (and of their Properties). Values are dictionary-encoded, so each distinct value
+        (i.e., a subject, a location or a list of day names) is stored once per block.
+
+        Like NDJSONWriter, a Calendar is written once it is complete, as its dictionary and columns need all of its Courses.
+
+        A block is its compressed length (4 bytes), followed by its compressed body. The body is the length of its header (4 bytes),
+        its header as JSON (the Calendar without Courses, the dictionary, and the name and length of each column), and the columns.
+
+        Args:
+            filename (str): Path of the file. Overwritten if it exists.
+        """
+        self.filename = filename
+        self._file = open(filename, 'wb')
+        self._file.write(COLUMNAR_MAGIC)
+
+    def write_calendar(self, calendar: dict) -> None:
+        """Write a Calendar and its Courses as a block.
+
+        Args:
+            calendar (dict): A Calendar object, whose Courses are dicts or Course records (see CourseRecord.py).
+        """
+        courses = calendar['Courses']
+        meetings = [complete_meeting(meeting) for course in courses for meeting in course['Properties']]
+
+        dictionary, seen, columns = {}, {}, []
+        for key in COURSE_KEYS:
+            if key != 'Properties': columns.append((key, _encode_column([course[key] for course in courses], dictionary, seen)))
+        columns.append((MEETINGS_COLUMN, _encode_column([len(course['Properties']) for course in courses], dictionary, seen)))
+        for key in MEETING_KEYS: columns.append((f'Properties.{key}', _encode_column([meeting[key] for meeting in meetings], dictionary, seen)))
+
+        header = _get_header(calendar) | {
+            'Dictionary': list(dictionary),
+            'Columns': [[key, len(data)] for key, data in columns]
+        }
+        header = dumps(header, separators=(',', ':')).encode('UTF-8')
+
+        body = zlib.compress(struct.pack('<I', len(header)) + header + b''.join([data for _, data in columns]), COMPRESSION_LEVEL)
+        self._file.write(struct.pack('<I', len(body)) + body)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+def _iter_blocks(filename: str):
+    """An internal function that iterates over the blocks of a columnar file.
+
+    Yields:
+        tuple[dict, dict]: Header of the block, and the data of each column keyed by name.
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC: raise ValueError(f'{filename} is not a columnar file.')
+
+        while size := f.read(4):
+            body = zlib.decompress(f.read(struct.unpack('<I', size)[0]))
+            header_size = struct.unpack('<I', body[:4])[0]
+            header = loads(body[4:4 + header_size])
+
+            columns, offset = {}, 4 + header_size
+            for key, length in header['Columns']:
+                columns[key] = body[offset:offset + length]
+                offset += length
+
+            yield header, columns
+
+def iter_columns(filename: str, keys: list[str]):
+    """Read only some columns of a columnar file written by ColumnarWriter, one Calendar at a time.
+
+    Args:
+        filename (str): Path of the file.
+        keys (list[str]): Keys of the columns (i.e., "Subject", "Meetings" or "Properties.Location").
+
+    Yields:
+        tuple[dict, dict]: The Calendar (without Courses), and the values of each column keyed by key. Values that are lists are
+        shared between the rows that hold them.
+    """
+    for header, columns in _iter_blocks(filename):
+        values = [loads(value) for value in header['Dictionary']]
+        calendar = {key: header[key] for key in CALENDAR_KEYS}
+
+        yield calendar, {key: [values[i] for i in _decode_column(columns[key])] for key in keys}
+
+def read_columnar(filename: str):
+    """Read the Calendars of a columnar file written by ColumnarWriter, one Calendar at a time.
+
+    Args:
+        filename (str): Path of the file.
+
+    Yields:
+        dict: Calendar object, with its Courses.
+    """
+    for header, columns in _iter_blocks(filename):
+        dictionary = header['Dictionary']
+        values = [loads(value) for value in dictionary]
+        # Lists and dicts are decoded for each Course, so no two Courses share one.
+        mutable = [isinstance(value, (list, dict)) for value in values]
+        decode = lambda key: [loads(dictionary[i]) if mutable[i] else values[i] for i in _decode_column(columns[key])]
+
+        course_columns = [(key, decode(key)) for key in COURSE_KEYS if key != 'Properties']
+        meeting_columns = [(key, decode(f'Properties.{key}')) for key in MEETING_KEYS]
+
+        courses, meeting = [], 0
+        for i, count in enumerate(decode(MEETINGS_COLUMN)):
+            course = {key: column[i] for key, column in course_columns}
+            course['Properties'] = [{key: column[j] for key, column in meeting_columns} for j in range(meeting, meeting + count)]
+            meeting += count
+
+            # Keys in the order of a Course object.
+            courses.append({key: course[key] for key in COURSE_KEYS})
+
+        yield {key: header[key] for key in CALENDAR_KEYS} | {'Courses': courses}
+
+def write_ndjson(filename: str, calendars: list[dict]) -> None:
+    """Write a list of Calendars as newline-delimited JSON. See NDJSONWriter.
+
+    Args:
+        filename (str): Path of the file.
+        calendars (list[dict]): A list of Calendar objects.
+    """
+    with NDJSONWriter(filename) as writer:
+        for calendar in calendars: writer.write_calendar(calendar)
+
+def write_columnar(filename: str, calendars: list[dict]) -> None:
+    """Write a list of Calendars in the compressed columnar format. See ColumnarWriter.
+
+    Args:
+        filename (str): Path of the file.
+        calendars (list[dict]): A list of Calendar objects.
+    """
+    with ColumnarWriter(filename) as writer:
+        for calendar in calendars: writer.write_calendar(calendar)
+
+def iter_calendars(filename: str, school: str = None):
+    """Read the Calendars of any output of Parser.get_courses: JSON, newline-delimited JSON, columnar, or a CourseStore file (see
+    CourseStore.py). Newline-delimited JSON and columnar files are read one Calendar at a time.
+
+    Args:
+        filename (str): Path of the file (.json, .ndjson, .cols or .sqlite).
+        school (str, optional): School of the Calendars. Required for a CourseStore file. Defaults to None.
+
+    Yields:
+        dict: Calendar object, with its Courses.
+    """
+    if filename.endswith('.ndjson'): yield from read_ndjson(filename)
+    elif filename.endswith('.cols'): yield from read_columnar(filename)
+    elif filename.endswith('.sqlite'):
+        from CourseStore import CourseStore
+        store = CourseStore(filename)
+        try: yield from store.get_calendars(school)
+        finally: store.close()
+    else:
+        with open(filename, 'r', encoding='UTF-8') as f: yield from loads(f.read())
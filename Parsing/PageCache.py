@@ -0,0 +1,271 @@
+from hashlib import sha256
+from time import time
+from threading import Lock
+import sqlite3
+import zlib
+import logging
+
+# Page types, keyed by the last part of their path. Each has a default time to live (in seconds) and the text that a page of the type
+# must contain to be cached, so error pages are never cached.
+PAGE_TYPES = {
+    'bwckschd.p_disp_dyn_sched': {'Name': 'Dynamic Schedule', 'TTL': 24 * 3600, 'Markers': ['>Dynamic Schedule<', '>Select Term or Date Range<']},
+    'bwckgens.p_proc_term_date': {'Name': 'Class Schedule Search', 'TTL': 24 * 3600, 'Markers': ['>Class Schedule Search<']},
+    'bwckschd.p_get_crse_unsec': {'Name': 'Class Schedule Listing', 'TTL': 6 * 3600, 'Markers': ['>Class Schedule Listing<']},
+    'bwckctlg.p_display_courses': {'Name': 'Catalog Entry', 'TTL': 7 * 24 * 3600, 'Markers': ['>Catalog Entries<']},
+    'bwckschd.p_disp_detail_sched': {'Name': 'Detailed Information Section', 'TTL': 30 * 60, 'Markers': ['>Detailed Class Information<']} # Seats change often
+}
+
+# Maximum size (in bytes) of all compressed pages in the cache, before the least recently used pages are evicted.
+MAX_BYTES = 512 * 1024 * 1024
+
+# Number of stored pages between commits.
+COMMIT_EVERY = 100
+
+LOGGER = logging.getLogger(__name__)
+
+def get_page_type(path: str) -> str:
+    """Determine the page type of a path.
+
+    Args:
+        path (str): Path of the page (i.e., "/bwckctlg.p_display_courses?...").
+
+    Returns:
+        str: Key of PAGE_TYPES, or None if the page type is unknown.
+    """
+    page_type = path.split('?')[0].rsplit('/', 1)[-1]
+    return page_type if page_type in PAGE_TYPES else None
+
+def get_page_key(host: str, path: str, payload: str | bytes = None) -> str:
+    """Determine the key of a request, which is a hash of its host, path and payload.
+
+    Args:
+        host (str): Base Host and Base Path.
+        path (str): Path of the page.
+        payload (str | bytes, optional): Payload of the request, if any.
+
+    Returns:
+        str: Key of the request.
+    """
+    if isinstance(payload, str): payload = payload.encode('UTF-8')
+    return sha256(host.encode('UTF-8') + b' ' + path.encode('UTF-8') + b'\n' + (payload or b'')).hexdigest()
+
+class PageCache:
+    def __init__(self, filename: str = './Cache.sqlite', ttls: dict = None, max_bytes: int = MAX_BYTES) -> None:
+        """Initialize a PageCache object, a persistent and size-bounded cache of pages stored in a SQLite file. Pages are
+        compressed, expire after the time to live of their page type, and the least recently used pages are evicted first.
+
+        Args:
+            filename (str, optional): Path of the cache file. Defaults to './Cache.sqlite'.
+            ttls (dict, optional): Time to live (in seconds) by page type (key of PAGE_TYPES), to override the defaults. Defaults to None.
+            max_bytes (int, optional): Maximum size (in bytes) of all compressed pages. Defaults to MAX_BYTES.
+        """
+        self.filename = filename
+        self.ttls = {key: value['TTL'] for key, value in PAGE_TYPES.items()} | (ttls or {})
+        self.max_bytes = max_bytes
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._lock = Lock()
+        self._pending = 0 # Stored pages that have not been committed.
+
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, type TEXT, fetched REAL, accessed REAL, size INTEGER, content_type TEXT, body BLOB)'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)')
+        self.size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def get(self, key: str, page_type: str) -> tuple[bytes, str]:
+        """Get a page from the cache, if it has not expired.
+
+        Args:
+            key (str): Key of the request. See get_page_key.
+            page_type (str): Page type of the request. See get_page_type.
+
+        Returns:
+            tuple[bytes, str]: Body and Content-Type of the page, or None if it is not cached (or expired).
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT fetched, content_type, body FROM pages WHERE key = ?', (key,)).fetchone()
+            if row is None or time() - row[0] > self.ttls.get(page_type, 0):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._connection.execute('UPDATE pages SET accessed = ? WHERE key = ?', (time(), key))
+            self._pending += 1
+            self._commit_if_needed()
+
+        return zlib.decompress(row[2]), row[1]
+
+    def put(self, key: str, page_type: str, body: bytes, content_type: str = 'text/html; charset=UTF-8') -> bool:
+        """Store a page in the cache, if it is a valid page of its page type.
+
+        Args:
+            key (str): Key of the request. See get_page_key.
+            page_type (str): Page type of the request. See get_page_type.
+            body (bytes): Body of the page.
+            content_type (str, optional): Content-Type of the page. Defaults to 'text/html; charset=UTF-8'.
+
+        Returns:
+            bool: Whether or not the page was stored.
+        """
+        if page_type not in PAGE_TYPES or not any([marker.encode('UTF-8') in body for marker in PAGE_TYPES[page_type]['Markers']]): return False
+
+        self._store(key, page_type, zlib.compress(body, 6), content_type)
+        return True
+
+    def writer(self, key: str, page_type: str, content_type: str = 'text/html; charset=UTF-8'):
+        """Get a PageWriter to store a page that arrives in chunks, without holding the whole page in memory.
+
+        Args:
+            key (str): Key of the request. See get_page_key.
+            page_type (str): Page type of the request. See get_page_type.
+            content_type (str, optional): Content-Type of the page. Defaults to 'text/html; charset=UTF-8'.
+
+        Returns:
+            PageWriter: Writer of the page.
+        """
+        return PageWriter(self, key, page_type, content_type)
+
+    def _store(self, key: str, page_type: str, compressed: bytes, content_type: str) -> None:
+        """An internal function that stores a compressed page, and evicts pages if needed.
+
+        Args:
+            key (str): Key of the request.
+            page_type (str): Page type of the request.
+            compressed (bytes): Compressed body of the page.
+            content_type (str): Content-Type of the page.
+        """
+        with self._lock:
+            old = self._connection.execute('SELECT size FROM pages WHERE key = ?', (key,)).fetchone()
+            self._connection.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, page_type, time(), time(), len(compressed), content_type, compressed)
+            )
+            self.size += len(compressed) - (old[0] if old else 0)
+            self.stores += 1
+
+            self._evict()
+            self._pending += 1
+            self._commit_if_needed()
+
+    def _evict(self) -> None:
+        """An internal function that evicts the least recently used pages until the cache fits in max_bytes. Must hold the lock.
+        """
+        while self.size > self.max_bytes:
+            rows = self._connection.execute('SELECT key, size FROM pages ORDER BY accessed LIMIT 100').fetchall()
+            if not rows: break
+
+            for key, size in rows:
+                if self.size <= self.max_bytes: break
+                self._connection.execute('DELETE FROM pages WHERE key = ?', (key,))
+                self.size -= size
+                self.evictions += 1
+
+    def _commit_if_needed(self) -> None:
+        """An internal function that commits every COMMIT_EVERY changes. Must hold the lock.
+        """
+        if self._pending >= COMMIT_EVERY:
+            self._connection.commit()
+            self._pending = 0
+
+    def purge_expired(self) -> int:
+        """Delete all expired pages.
+
+        Returns:
+            int: Number of pages deleted.
+        """
+        deleted = 0
+        with self._lock:
+            for page_type, ttl in self.ttls.items():
+                deleted += self._connection.execute('DELETE FROM pages WHERE type = ? AND fetched < ?', (page_type, time() - ttl)).rowcount
+            self.size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+            self._connection.commit()
+            self._pending = 0
+
+        return deleted
+
+    def pages(self, page_type: str):
+        """Iterate over every cached page of a page type, expired or not (i.e., as a corpus of saved pages).
+
+        Args:
+            page_type (str): Page type. See get_page_type.
+
+        Yields:
+            bytes: Body of a page.
+        """
+        with self._lock: rows = self._connection.execute('SELECT body FROM pages WHERE type = ?', (page_type,)).fetchall()
+        for row in rows: yield zlib.decompress(row[0])
+
+    def stats(self) -> dict:
+        """Get the counters of the cache.
+
+        Returns:
+            dict: Hits, misses, stores, evictions and size (in bytes) of the cache.
+        """
+        return {'Hits': self.hits, 'Misses': self.misses, 'Stores': self.stores, 'Evictions': self.evictions, 'Size': self.size}
+
+    def flush(self) -> None:
+        """Commit all changes to the cache file.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Commit all changes and close the cache file.
+        """
+        self.flush()
+        self._connection.close()
+
+class PageWriter:
+    def __init__(self, cache: PageCache, key: str, page_type: str, content_type: str) -> None:
+        """Initialize a PageWriter object, which compresses a page chunk by chunk and stores it in a PageCache once closed.
+
+        Args:
+            cache (PageCache): Cache to store the page in.
+            key (str): Key of the request.
+            page_type (str): Page type of the request.
+            content_type (str): Content-Type of the page.
+        """
+        self.cache = cache
+        self.key = key
+        self.page_type = page_type
+        self.content_type = content_type
+
+        self._compressor = zlib.compressobj(6)
+        self._parts = []
+        self._valid = False
+        self._tail = b'' # End of the previous chunks, as a marker can be split across chunks.
+
+    def write(self, data: bytes) -> None:
+        """Add a chunk of the page.
+
+        Args:
+            data (bytes): Chunk of the page.
+        """
+        if not self._valid and self.page_type in PAGE_TYPES:
+            self._valid = any([marker.encode('UTF-8') in self._tail + data for marker in PAGE_TYPES[self.page_type]['Markers']])
+            self._tail = (self._tail + data)[-64:]
+
+        self._parts.append(self._compressor.compress(data))
+
+    def close(self) -> bool:
+        """Store the page, if it is a valid page of its page type.
+
+        Returns:
+            bool: Whether or not the page was stored.
+        """
+        if not self._valid: return False
+
+        self._parts.append(self._compressor.flush())
+        self.cache._store(self.key, self.page_type, b''.join(self._parts), self.content_type)
+        self._parts = []
+        return True
@@ -0,0 +1,110 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from threading import Lock
+import asyncio
+
+# Number of pages parsed together. Batches amortize the cost of handing pages to another process.
+BATCH_SIZE = 32
+
+# Time (in seconds) a partial batch waits for more pages before it is parsed anyway.
+BATCH_DELAY = 0.05
+
+# Process pool of each number of workers, shared by every Parser of the process. See get_parse_pool.
+POOLS = {}
+POOLS_LOCK = Lock()
+
+class ParseBatcher:
+    def __init__(self, function, executor: Executor = None, batch_size: int = BATCH_SIZE, delay: float = BATCH_DELAY, metrics=None, stage: str = None) -> None:
+        """Initialize a ParseBatcher object, which collects pages fetched by coroutines and parses them in batches on an executor,
+        so the event loop only waits on the network. Must be created and used on one event loop.
+
+        Args:
+            function: Function that parses a list of pages into a list of results, in the same order. Must be picklable (i.e.,
+            defined at the top level of a module) if the executor is a process pool.
+            executor (Executor, optional): Thread or process pool to parse on. Defaults to None (parsed on the event loop).
+            batch_size (int, optional): Number of pages parsed together. Defaults to BATCH_SIZE.
+            delay (float, optional): Time (in seconds) a partial batch waits for more pages. Defaults to BATCH_DELAY.
+            metrics (Metrics, optional): Metrics to record the time spent parsing each batch in. Defaults to None.
+            stage (str, optional): Stage of the metrics (i.e., "Detail Parse"). Defaults to None.
+        """
+        self.function = function
+        self.executor = executor
+        self.batch_size = batch_size
+        self.delay = delay
+        self.metrics = metrics
+        self.stage = stage
+
+        # Counters
+        self.pages = 0
+        self.batches = 0
+
+        self._batch = [] # List of (page, future)
+        self._timer = None
+        self._tasks = set() # Batches being parsed, referenced so they are not garbage collected.
+
+    async def parse(self, page: str):
+        """Parse a page in the next batch.
+
+        Args:
+            page (str): The page.
+
+        Returns:
+            Result of the function for the page.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((page, future))
+
+        if len(self._batch) >= self.batch_size: self._flush()
+        elif self._timer is None: self._timer = asyncio.get_running_loop().call_later(self.delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """An internal function that starts parsing the pages collected so far.
+        """
+        if self._timer is not None: self._timer.cancel()
+        self._timer = None
+
+        batch, self._batch = self._batch, []
+        if not batch: return
+
+        task = asyncio.get_running_loop().create_task(self._parse_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _parse_batch(self, batch: list[tuple]) -> None:
+        """An internal async function that parses a batch and hands each result back to the coroutine waiting on it.
+
+        Args:
+            batch (list[tuple]): List of (page, future).
+        """
+        pages = [page for page, _ in batch]
+        self.pages += len(pages)
+        self.batches += 1
+
+        try:
+            with self.metrics.stage(self.stage) if self.metrics else nullcontext():
+                if self.executor is None: results = self.function(pages)
+                else: results = await asyncio.get_running_loop().run_in_executor(self.executor, self.function, pages)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done(): future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done(): future.set_result(result)
+
+def get_parse_pool(workers: int = None) -> ProcessPoolExecutor:
+    """Get the process pool of a number of workers, so every Parser of the process that parses on one (i.e., with the Parse Workers
+    of its profile) shares it. The pool is shut down at exit.
+
+    Args:
+        workers (int, optional): Number of processes. Defaults to the number of CPUs.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    with POOLS_LOCK:
+        if workers not in POOLS: POOLS[workers] = ProcessPoolExecutor(workers)
+
+        return POOLS[workers]
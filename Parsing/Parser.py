@@ -1,46 +1,78 @@
-from CourseParser import CourseParser
-from bs4 import BeautifulSoup
-from httpx import Client, AsyncClient, Response
+from CourseParser import CourseParser, SEAT_FIELDS, parse_listing, parse_course_descs, parse_extra_course_infos, empty_extra_course_info
+from ParseBatcher import ParseBatcher, get_parse_pool
+from ListingParser import ListingTokenizer, DEFAULT_BACKEND, STREAM_BACKEND
+from RequestScheduler import RequestScheduler, MAX_WINDOW
+from PageCache import PageCache, get_page_key, get_page_type
+from Archive import Archive
+from Metrics import Metrics, merge_reports, write_prometheus, get_endpoint
+from Checkpoint import Checkpoint, DESCRIPTION, DETAIL, get_crn, get_course_id
+from CourseRecord import Course
+from LogConfig import configure_logging
+from MappingStore import MappingStore, get_mapping_store
+from httpx import Client, AsyncClient, Response, Request
 from urllib.parse import urlencode
-from re import findall
-from time import time
-from json import dumps, loads
-from math import ceil
-from tqdm.asyncio import tqdm
+from time import time, perf_counter
+from json import dumps
+from concurrent.futures import Executor
+from codecs import getincrementaldecoder
 import asyncio
 import logging
 
 LOGGER = logging.getLogger(__name__)
-logging.basicConfig(
-    filename = 'Logs.log',
-    encoding = 'UTF-8',
-    format = '=' * 150 + '\n[%(asctime)s | File: %(filename)s | Fn: %(funcName)s | Line: %(lineno)s]\nLevel: %(levelname)s\n%(message)s\n' + '=' * 150 + '\n\n',
-    datefmt = '%Y-%m-%dT%H:%M:%SZ',
-    level = logging.INFO
-)
+configure_logging()
 
-# Silence other loggers | https://stackoverflow.com/a/71193599
-for module in ['httpx']: logging.getLogger(module).setLevel(logging.WARNING)
+# Number of chunks of subjects to load Courses in, if the profile sets neither Chunk Count nor Chunk Size.
+DEFAULT_CHUNK_COUNT = 5
+
+# Size (in characters) of the chunks a cached Class Schedule Listing is streamed in.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Path of the Detailed Information Section page of a Course.
+DETAIL_PATH = '/bwckschd.p_disp_detail_sched?term_in={term}&crn_in={crn}'
+
+# Timeout (in seconds) of a Class Schedule Listing request, which can take a while for large Calendars.
+LISTING_TIMEOUT = 120
 
 class Parser:
-    def __init__(self, profile: dict, get_course_desc: bool = True, get_extra_course_info: bool = True) -> None:
+    def __init__(self, profile: dict, get_course_desc: bool = True, get_extra_course_info: bool = True, stream_listing: bool = False, cache: PageCache = None, scheduler: RequestScheduler = None, executor: Executor = None, archive: Archive = None, report_file: str = None, prometheus_file: str = None, compact_courses: bool = False, output=None, checkpoint: Checkpoint = None, mapping_store: MappingStore = None) -> None:
         """Intialize a Parser object.
 
         Args:
             profile (dict): Profile of school.
             get_course_desc (bool, optional): Whether or not to send an additional request for each Course to scrape Course description. Defaults to True.
             get_extra_course_info (bool, optional): Whether or not to send an additional request for each Course to scrape Course registration availability. Defaults to True.
+            stream_listing (bool, optional): Whether or not to parse the Class Schedule Listing while it downloads, instead of buffering the whole page. Defaults to False.
+            cache (PageCache, optional): Persistent cache of pages, so repeated runs only request pages that are stale. Defaults to None.
+            scheduler (RequestScheduler, optional): Scheduler of async requests, to share one between Parsers of the same host. Defaults to a new one.
+            executor (Executor, optional): Thread or process pool to parse pages on, so parsing does not block the event loop. Defaults to the shared pool of the Parse Workers of the profile, if any, otherwise None (parsed in place).
+            archive (Archive, optional): Archive to record every response to or, if it is replayed, to take every response from. Defaults to None.
+            report_file (str, optional): File to append the metrics report of each Calendar to, as a line of JSON. Defaults to None.
+            prometheus_file (str, optional): File to write the metrics of all Calendars to, in the Prometheus text format. Defaults to None.
+            compact_courses (bool, optional): Whether or not to return Courses as compact records (see CourseRecord.py) instead of dicts. Defaults to False.
+            output (NDJSONWriter | ColumnarWriter | StoreWriter, optional): Writer that each Calendar is written to as soon as all of its Courses are parsed (see Output.py and CourseStore.py). Defaults to None.
+            checkpoint (Checkpoint, optional): Checkpoint of the progress on each Calendar, so an interrupted run resumes where it stopped. Defaults to None.
+            mapping_store (MappingStore, optional): Store of the subject mappings of every school. Defaults to the store of ./mappings.sqlite.
         """
         self.profile = profile
         self.get_course_desc = get_course_desc
         self.get_extra_course_info = get_extra_course_info
+        self.stream_listing = stream_listing
+        self.cache = cache
+        self.executor = executor if executor is not None or not profile.get('Parse Workers') else get_parse_pool(profile['Parse Workers'])
+        self.archive = archive
+        self.report_file = report_file
+        self.prometheus_file = prometheus_file
+        self.compact_courses = compact_courses
+        self.output = output
+        self.checkpoint = checkpoint
+        self.mapping_store = mapping_store
         
         # Define necessary sessions beforehand, so no need to constantly pass a dict of headers.
         self.session = Client(
-            base_url='https://' + self.profile['Base Host'] + self.profile['Base Path'],
+            base_url=self.profile.get('Scheme', 'https') + '://' + self.profile['Base Host'] + self.profile['Base Path'],
             headers={
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Origin': 'https://' + self.profile['Base Host'],
+                'Origin': self.profile.get('Scheme', 'https') + '://' + self.profile['Base Host'],
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.9',
                 'Accept-Encoding': 'gzip, deflate, br',
@@ -50,15 +82,48 @@ class Parser:
             timeout=120
         )
    
+        # Bounds (and adapts) the number of async requests in flight to the school.
+        self.scheduler = scheduler or RequestScheduler(self.profile.get('Max Concurrency', MAX_WINDOW))
+   
         self.course_desc = [] # List of strings
         self.extra_course_info = [] # List of dict
+        
+        # Items that could not be fetched (Kind, Key, Path and Error of each), keyed by Calendar ID, so they can be retried.
+        self.failures = {}
+        self._calendar_id = None # Calendar ID of the Calendar being parsed
+        self._resumed = {DESCRIPTION: {}, DETAIL: {}} # Items of the Calendar being parsed taken from the checkpoint, keyed by kind
+        
+        # Time spent in each stage and requests sent, for the Calendar being parsed. See Metrics.py.
+        self.metrics = Metrics({'School': self.profile['School']})
+        self.reports = [] # Metrics report of each Calendar parsed, see Metrics.report
 
-        # Load and utilize mappings of the school matching the profile only.
-        with open('./mappings.json', 'r', encoding='UTF-8') as f: self.mappings = loads(f.read())        
-        self.mappings = {} if self.profile['School'] not in self.mappings else self.mappings[self.profile['School']]
+        # Subject mappings of the school and the CourseParser using them, loaded when first needed. See mappings and course_parser.
+        self._mappings = None
+        self._course_parser = None
+    
+    @property
+    def mappings(self) -> dict:
+        """Subject mappings of the school matching the profile only, loaded from the MappingStore when first needed.
+
+        Returns:
+            dict: Subject of each abbreviation.
+        """
+        if self._mappings is None:
+            self.mapping_store = self.mapping_store or get_mapping_store()
+            self._mappings = self.mapping_store.get(self.profile['School'])
+        
+        return self._mappings
+    
+    @property
+    def course_parser(self) -> CourseParser:
+        """CourseParser with the subject mappings of the school, created when first needed.
 
-        # Load the mappings for the school into the CourseParser.
-        self.course_parser = CourseParser(self.mappings)
+        Returns:
+            CourseParser: The CourseParser.
+        """
+        if self._course_parser is None: self._course_parser = CourseParser(self.mappings, self.compact_courses)
+        
+        return self._course_parser
     
     def _get_async_session(self):
         """Create a new async session.
@@ -67,19 +132,114 @@ class Parser:
             AsyncClient: An initalized client for async requests
         """
         return AsyncClient(
-            base_url='https://' + self.profile['Base Host'] + self.profile['Base Path'],
+            base_url=self.profile.get('Scheme', 'https') + '://' + self.profile['Base Host'] + self.profile['Base Path'],
             headers={
                 'Content-Type': 'application/x-www-form-urlencoded',
-                'Origin': 'https://' + self.profile['Base Host'],
+                'Origin': self.profile.get('Scheme', 'https') + '://' + self.profile['Base Host'],
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.9',
                 'Accept-Encoding': 'gzip, deflate, br',
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15'
             },
             verify=False,
-            timeout=120
+            timeout=120,
+            limits=self.scheduler.limits()
         )
     
+    def _get_cached(self, method: str, path: str, payload: str | dict = None, lookup: bool = True) -> tuple[str, str, Response]:
+        """An internal function that looks up a request in the archive (if it is replayed) or the page cache. Pages found in the page
+        cache are recorded to the archive, if it is recording.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path to request.
+            payload (str | dict, optional): Payload of the request, if any.
+            lookup (bool, optional): Whether or not to look up the page cache, or only determine the key and page type. Defaults to True.
+
+        Returns:
+            tuple[str, str, Response]: Key and page type of the request, and the archived or cached Response object (None if there is none).
+        """
+        if isinstance(payload, dict): payload = urlencode(payload)
+        key = get_page_key(self.profile['Base Host'] + self.profile['Base Path'], path, payload)
+        page_type = get_page_type(path)
+        
+        if self.archive and self.archive.replay:
+            # Nothing is ever requested while replaying, so a request that was not recorded is answered as if the page did not exist.
+            archived = self.archive.get(key)
+            if archived is None: LOGGER.warning(f'[{self.profile["School"]}] | Not in Archive: {method} {path}', extra={'endpoint': get_endpoint(path)})
+            status, body, content_type = archived or (404, b'', 'text/html')
+            self.metrics.count(path, 'Cached')
+            return key, page_type, Response(status, content=body, headers={'Content-Type': content_type}, request=Request(method, str(self.session.base_url) + path))
+        
+        cached = self.cache.get(key, page_type) if self.cache and lookup else None
+        if cached is None: return key, page_type, None
+        
+        body, content_type = cached
+        self.metrics.count(path, 'Cached')
+        
+        # A page taken from the cache was never requested, so it is recorded here, or replaying the archive would not find it.
+        if self.archive: self.archive.put(key, method, path, 200, body, content_type)
+        return key, page_type, Response(200, content=body, headers={'Content-Type': content_type}, request=Request(method, str(self.session.base_url) + path))
+    
+    def _store(self, key: str, page_type: str, method: str, path: str, response: Response) -> None:
+        """An internal function that stores a response in the page cache and the archive, if any.
+
+        Args:
+            key (str): Key of the request.
+            page_type (str): Page type of the request.
+            method (str): HTTP method.
+            path (str): Path of the request.
+            response (Response): Response object of the request.
+        """
+        content_type = response.headers.get('Content-Type', 'text/html')
+        if self.cache and response.status_code == 200: self.cache.put(key, page_type, response.content, content_type)
+        if self.archive: self.archive.put(key, method, path, response.status_code, response.content, content_type)
+    
+    def _request(self, method: str, path: str, **kwargs) -> Response:
+        """An internal function that sends a request on the session, unless the page is cached.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path to request.
+            **kwargs: Passed to Client.request.
+
+        Returns:
+            Response: Response object of the request.
+        """
+        key, page_type, response = self._get_cached(method, path, kwargs.get('data', kwargs.get('content')))
+        if response is not None: return response
+        
+        start = perf_counter()
+        try: response = self.session.request(method, path, **kwargs)
+        except Exception:
+            self.metrics.observe_request(path, perf_counter() - start)
+            self.metrics.count(path, 'Failures')
+            raise
+        self.metrics.observe_request(path, perf_counter() - start, response.status_code, response.num_bytes_downloaded)
+        
+        self._store(key, page_type, method, path, response)
+        return response
+    
+    async def _arequest(self, async_session: AsyncClient, method: str, path: str, refresh: bool = False, **kwargs) -> Response:
+        """An internal async function that sends a request through the RequestScheduler, unless the page is cached.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            method (str): HTTP method.
+            path (str): Path to request.
+            refresh (bool, optional): Whether or not to skip looking up the page cache. The response is still stored. Defaults to False.
+            **kwargs: Passed to RequestScheduler.request.
+
+        Returns:
+            Response: Response object of the request.
+        """
+        key, page_type, response = self._get_cached(method, path, kwargs.get('data', kwargs.get('content')), lookup=not refresh)
+        if response is not None: return response
+        
+        response = await self.scheduler.request(async_session, method, path, metrics=self.metrics, **kwargs)
+        self._store(key, page_type, method, path, response)
+        return response
+    
     def _split_n_chunks(self, large_list: list, n: int) -> list[list]:
         """An internal function that splits a large list into n different chunks. Generated via ChatGPT.
 
@@ -121,28 +281,20 @@ class Parser:
         return [large_list[i:i + n] for i in range(0, len(large_list), n)]
     
     def _update_mappings(self, mappings: dict) -> None:
-        """An internal function that update mappings.json for the current profile with new subject mappings.
+        """An internal function that adds new subject mappings of the current profile to the MappingStore. Only new mappings are
+        written, and mappings added by other Parsers of the school in the meantime are picked up.
 
         Args:
             mappings (dict): The new subject mappings.
         """
-        update = False
+        new_mappings = {key: value for key, value in mappings.items() if key not in self.mappings}
+        if not new_mappings: return
         
-        for key, value in mappings.items():
-            if key not in self.mappings:
-                update = True
-                self.mappings[key] = value
-                LOGGER.info(f'[{self.profile["School"]}] | New Mapping Added {key} --> {value}')
+        for key, value in self.mapping_store.add(self.profile['School'], new_mappings).items(): LOGGER.info(f'[{self.profile["School"]}] | New Mapping Added {key} --> {value}')
         
-        if update:
-            # Sort alphabetically by full subject name.
-            self.mappings = dict(sorted(self.mappings.items(), key = lambda x : x[1]))
-            
-            # Load full mappings, sort alphabetically by school name, and overwrite changes.
-            with open('./mappings.json', 'r', encoding='UTF-8') as f: og_mappings = loads(f.read()) 
-            og_mappings[self.profile['School']] = self.mappings
-            og_mappings = dict(sorted(og_mappings.items(), key = lambda x : x[0]))
-            with open('./mappings.json', 'w', encoding='UTF-8') as f: f.write(dumps(og_mappings, indent=4))
+        # Reload, sorted alphabetically by full subject name.
+        self._mappings = self.mapping_store.get(self.profile['School'])
+        self.course_parser.mappings = self._mappings
     
     def _get_calendar_page(self) -> Response:
         """An internal function that sends a request to load the Dynamic Schedule page.
@@ -150,8 +302,8 @@ class Parser:
         Returns:
             Response: Response object that should load the Dynamic Schedule Page.
         """
-        try: return self.session.get('/bwckschd.p_disp_dyn_sched')
-        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+        try: return self._request('GET', '/bwckschd.p_disp_dyn_sched')
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint('/bwckschd.p_disp_dyn_sched')})
     
     def _select_calendar(self, calendar: dict) -> Response:
         """An internal function that selects a particular Calendar from the Dynamic Schedule Page and loads the Class Schedule Search page.
@@ -162,22 +314,104 @@ class Parser:
         Returns:
             Response: Respone object that should load the Class Schedule Search Page.
         """
+        from bs4 import BeautifulSoup
+        
         try:
-            response = self._get_calendar_page()
-            LOGGER.info(f'[{self.profile["School"]}] | Successfully loaded Dynamic Schedule.')
+            with self.metrics.stage('Calendar Select'):
+                response = self._get_calendar_page()
+                LOGGER.info(f'[{self.profile["School"]}] | Successfully loaded Dynamic Schedule.')
+                
+                self.session.headers['Referer'] = str(self.session.base_url) + '/bwckschd.p_disp_dyn_sched'
+                data = {'p_term': calendar['Calendar ID']}
+                
+                # Since some schools might have more select options, we dynamically determine payload that is necessary when
+                # selecting a Calendar. The payload parameters and data are assumed to be in the input tags (either hidden or
+                # text types).
+                soup = BeautifulSoup(response.content, features='html.parser')
+                inputs = soup.find_all(lambda tag: tag.name == 'input' and (tag['type'] == 'hidden' or tag['type'] == 'text'))
+                for x in inputs: data[x['name']] = '' if 'value' not in x.attrs else x['value']
+                
+                return self._request('POST', '/bwckgens.p_proc_term_date', data=data)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint('/bwckgens.p_proc_term_date')})
+    
+    def _get_search_form(self, response: Response) -> tuple[dict, list]:
+        """An internal function that reads the form of the Class Schedule Search page.
+
+        Args:
+            response (Response): A Response object from _select_calendar function.
+
+        Returns:
+            tuple[dict, list]: The form data and the subjects (by abbreviation) offered in the Calendar, or None if the response is not the Class Schedule Search page.
+        """
+        if '>Class Schedule Search<' in response.text:
+            LOGGER.info(f'[{self.profile["School"]}] | Successfully Class Schedule Search page.')
             
-            self.session.headers['Referer'] = str(self.session.base_url) + '/bwckschd.p_disp_dyn_sched'
-            data = {'p_term': calendar['Calendar ID']}
+            self.session.headers['Referer'] = str(self.session.base_url) + '/bwckgens.p_proc_term_date'
+            data = {}
             
-            # Since some schools might have more select options, we dynamically determine payload that is necessary when
-            # selecting a Calendar. The payload parameters and data are assumed to be in the input tags (either hidden or
-            # text types).
+            # Much like how there can be different options when selecting a Calendar, we also dynamically determine the payload
+            # for navigating the Course search page of a Calendar. The payload is built in a different order as to what is
+            # seen in the original HTTP request.
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.content, features='html.parser')
+            
+            # Since subjects have abbreviations (MATH --> Mathematics), we keep track of this across all Calendars for a school.
+            subjects = soup.find('select', {'name': 'sel_subj'}).find_all('option')
+            mappings = {subject['value']: subject.text for subject in subjects}
+            self._update_mappings(mappings) 
+            
+            # First, we handle all the hidden and text inputs.
             inputs = soup.find_all(lambda tag: tag.name == 'input' and (tag['type'] == 'hidden' or tag['type'] == 'text'))
             for x in inputs: data[x['name']] = '' if 'value' not in x.attrs else x['value']
             
-            return self.session.post('/bwckgens.p_proc_term_date', data=data)
-        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            # Second, we handle all the select inputs. The value "%" for a parameter in this input type indicates select all options
+            # available. This option is usually (assumed) the first option for all select input types where applicable (like Instructor,
+            # Attribute Type, etc.). We insert "%" for sel_subj to force-select all subjects.
+            #
+            # Note: For select input types like Start Time and End Time, the first option selected is the default one.
+            inputs = soup.find_all('select')
+            for x in inputs: data[x['name']] = x.find('option')['value']
+            data['sel_subj'] = '%'
+            
+            return data, [abbr for abbr in mappings if abbr]
+    
+    def _build_search_payload(self, data: dict, abbreviations: list = None) -> str:
+        """An internal function that builds the payload to select Courses from the form of the Class Schedule Search page.
+
+        Args:
+            data (dict): Form data from _get_search_form function.
+            abbreviations (list, optional): List of subjects (by abbreviation) to load Courses for. Used for chunk loading only.
+
+        Returns:
+            str: Payload for the Class Schedule Listing page.
+        """
+        # Create payload, and determine if we want to get all subjects or a subset
+        modified_data = {key: data[key] for key in data.keys() if key not in {'sel_subj'}} # to avoid double-adding of sel_subj to payload
+        payload = urlencode(modified_data) + '&'
+        payload += 'sel_subj=%25' if abbreviations is None else '&'.join([f'sel_subj={abbr}' for abbr in abbreviations])
+        
+        # Note: For some reason, there are a fixed set of "dummy" parameters with defaults values of "dummy" that must be sent in the
+        # payload. However, these parameters are subject to modification via selecting different options on the Course search page.
+        # Additionally, not all of these parameters may be configurable on the Course search page. As a result, if a parameter is
+        # modified, it must be added again to the payload. All the "modified" versions of these "dummy" variables are stored in the
+        # variable data. Since it's a dict, we have to take some extra steps to correctly send the entire payload.                            
+        dummy_params = ['sel_subj', 'sel_day', 'sel_schd', 'sel_insm', 'sel_camp', 'sel_levl', 'sel_sess', 'sel_instr', 'sel_ptrm', 'sel_attr']
+        dummy_postfix = '&'.join([f'{dummy}=dummy' for dummy in dummy_params if data[dummy] != 'dummy']) 
+        
+        return dummy_postfix + '&' + payload
+    
+    def _get_search_payload(self, response: Response, abbreviations: list = None) -> str:
+        """An internal function that builds the payload to select all Courses from the Class Schedule Search page.
+
+        Args:
+            response (Response): A Response object from _select_calendar function.
+            abbreviations (list, optional): List of subjects (by abbreviation) to load Courses for. Used for chunk loading only.
+
+        Returns:
+            str: Payload for the Class Schedule Listing page, or None if the response is not the Class Schedule Search page.
+        """
+        form = self._get_search_form(response)
+        if form is not None: return self._build_search_payload(form[0], abbreviations)
     
     def _search_all_courses(self, calendar: dict = None, response: Response = None, abbreviations: list = None) -> Response:
         """An internal function that selects all Courses from the Class Schedule Search page to load the Class Schedule Listing page.
@@ -197,85 +431,157 @@ class Parser:
             if calendar: response = self._select_calendar(calendar)
             elif not response: raise Exception
             
-            if '>Class Schedule Search<' in response.text:
-                # If chunk loading, then we don't need to see this message be spammed.
-                if not abbreviations: LOGGER.info(f'[{self.profile["School"]}] | Successfully Class Schedule Search page.')
-                
-                self.session.headers['Referer'] = str(self.session.base_url) + '/bwckgens.p_proc_term_date'
-                data = {}
-                
-                # Much like how there can be different options when selecting a Calendar, we also dynamically determine the payload
-                # for navigating the Course search page of a Calendar. The payload is built in a different order as to what is
-                # seen in the original HTTP request.
-                soup = BeautifulSoup(response.content, features='html.parser')
-                
-                # Since subjects have abbreviations (MATH --> Mathematics), we keep track of this across all Calendars for a school.
-                subjects = soup.find('select', {'name': 'sel_subj'}).find_all('option')
-                mappings = {subject['value']: subject.text for subject in subjects}
-                self._update_mappings(mappings) 
-                
-                # First, we handle all the hidden and text inputs.
-                inputs = soup.find_all(lambda tag: tag.name == 'input' and (tag['type'] == 'hidden' or tag['type'] == 'text'))
-                for x in inputs: data[x['name']] = '' if 'value' not in x.attrs else x['value']
-                
-                # Second, we handle all the select inputs. The value "%" for a parameter in this input type indicates select all options
-                # available. This option is usually (assumed) the first option for all select input types where applicable (like Instructor,
-                # Attribute Type, etc.). We insert "%" for sel_subj to force-select all subjects.
-                #
-                # Note: For select input types like Start Time and End Time, the first option selected is the default one.
-                inputs = soup.find_all('select')
-                for x in inputs: data[x['name']] = x.find('option')['value']
-                data['sel_subj'] = '%'
-                
-                # Create payload, and determine if we want to get all subjects or a subset
-                modified_data = {key: data[key] for key in data.keys() if key not in {'sel_subj'}} # to avoid double-adding of sel_subj to payload
-                payload = urlencode(modified_data) + '&'
-                payload += 'sel_subj=%25' if abbreviations is None else '&'.join([f'sel_subj={abbr}' for abbr in abbreviations])
-                
-                # Note: For some reason, there are a fixed set of "dummy" parameters with defaults values of "dummy" that must be sent in the
-                # payload. However, these parameters are subject to modification via selecting different options on the Course search page.
-                # Additionally, not all of these parameters may be configurable on the Course search page. As a result, if a parameter is
-                # modified, it must be added again to the payload. All the "modified" versions of these "dummy" variables are stored in the
-                # variable data. Since it's a dict, we have to take some extra steps to correctly send the entire payload.                            
-                dummy_params = ['sel_subj', 'sel_day', 'sel_schd', 'sel_insm', 'sel_camp', 'sel_levl', 'sel_sess', 'sel_instr', 'sel_ptrm', 'sel_attr']
-                dummy_postfix = '&'.join([f'{dummy}=dummy' for dummy in dummy_params if data[dummy] != 'dummy']) 
-                
-                payload = dummy_postfix + '&' + payload
-                            
-                return self.session.post('/bwckschd.p_get_crse_unsec', data=payload)
-        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            payload = self._get_search_payload(response, abbreviations)
+            if payload is not None:
+                with self.metrics.stage('Listing Download'): return self._request('POST', '/bwckschd.p_get_crse_unsec', content=payload)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint('/bwckschd.p_get_crse_unsec')})
+    
+    def _get_chunks(self, abbreviations: list) -> list[list]:
+        """An internal function that splits the subjects of a Calendar into chunks, using the Chunk Size or Chunk Count of the profile.
+
+        Args:
+            abbreviations (list): List of subjects (by abbreviation).
+
+        Returns:
+            list[list]: List of non-empty chunks of subjects.
+        """
+        if self.profile.get('Chunk Size'): chunks = self._split_n_per_chunk(abbreviations, self.profile['Chunk Size'])
+        else: chunks = self._split_n_chunks(abbreviations, self.profile.get('Chunk Count', DEFAULT_CHUNK_COUNT))
+        
+        return [chunk for chunk in chunks if chunk]
     
-    def _chunk_load_all_courses(self, calendar: dict) -> Response:
-        """An internal function to load all Courses as a single Response object in chunks.
+    async def _chunk_load_all_courses(self, calendar: dict, logger_prefix: str) -> list[dict]:
+        """An internal async function to load and parse all Courses in chunks of subjects. Chunks are requested concurrently and each
+        chunk is parsed on its own.
 
         Args:
             calendar (dict): A Calendar object.
+            logger_prefix (str): Prefix of logged messages.
 
         Returns:
-            Response: A Response object that has all the Courses in the table.
+            list[dict]: List of Course objects, or None if no chunk loaded the Class Schedule Listing page.
         """
-        soup, table = None, None
-        response = self._select_calendar(calendar) # To avoid constantly selecting Calendar again in _search_all_courses.
+        form = await asyncio.to_thread(lambda: self._get_search_form(self._select_calendar(calendar)))
+        if form is None: return None
         
-        abbreviations = list(self.mappings.keys())
-        chunks = self._split_n_chunks(abbreviations, 5)
-        for chunk in chunks:
-            try:
-                resp = self._search_all_courses(None, response, chunk)
-                if chunks.index(chunk) == 0:
-                    soup = BeautifulSoup(resp.content, features='html.parser')
-                    table = soup.find('table', {'class': 'datadisplaytable'})
-                else:
-                    temp_soup = BeautifulSoup(resp.content, features='html.parser')
-                    temp_table = temp_soup.find('table', {'class': 'datadisplaytable'})
-                    
-                    for new_row in temp_table.find_all('tr'): table.append(new_row)
-            except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
-            LOGGER.info(f'[{self.profile["School"]}] | Finished Course Chunk Loading {chunks.index(chunk)}/{len(chunks)}.')
+        # Only the subjects offered in the Calendar are requested.
+        data, abbreviations = form
+        payloads = [self._build_search_payload(data, chunk) for chunk in self._get_chunks(abbreviations)]
+        
+        return await self._fetch_chunks(payloads, logger_prefix)
+    
+    async def _fetch_chunks(self, payloads: list[str], logger_prefix: str) -> list[dict]:
+        """An internal async function that requests the Class Schedule Listing page of every chunk at once, and parses each
+        chunk as soon as it has arrived.
+
+        Args:
+            payloads (list[str]): Payload for each chunk.
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            list[dict]: List of Course objects, or None if no chunk loaded the Class Schedule Listing page.
+        """
+        courses = None
+        
+        async with self._get_async_session() as async_session:
+            # Share the Banner session (cookies) that selected the Calendar.
+            async_session.cookies = self.session.cookies
+            async_session.headers['Referer'] = str(async_session.base_url) + '/bwckgens.p_proc_term_date'
             
-        return Response(200, html=str(soup))
+            tasks = [asyncio.create_task(self._load_chunk(async_session, payload)) for payload in payloads]
+            
+            # Chunks are added in order, so the Courses (and their saved paths) keep the order of the chunks.
+            for i, task in enumerate(tasks):
+                try:
+                    listing = await task
+                    if listing is not None: courses = (courses or []) + self._add_listing(listing)
+                except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint('/bwckschd.p_get_crse_unsec')})
+                LOGGER.info(f'{logger_prefix} | Finished Course Chunk Loading {i + 1}/{len(tasks)}.')
+        
+        return courses
+    
+    async def _load_chunk(self, async_session: AsyncClient, payload: str) -> tuple[list[dict], list[str], list[str]]:
+        """An internal async function that requests and parses the Class Schedule Listing page of a chunk.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            payload (str): Payload of the chunk.
+
+        Returns:
+            tuple[list[dict], list[str], list[str]]: See parse_listing, or None if the Class Schedule Listing page was not loaded.
+        """
+        with self.metrics.stage('Listing Download'): response = await self._arequest(async_session, 'POST', '/bwckschd.p_get_crse_unsec', content=payload, timeout=LISTING_TIMEOUT)
+        if '>Class Schedule Listing<' in response.text: return await self._parse_listing(response)
+    
+    async def _load_all_courses(self, calendar: dict, logger_prefix: str) -> list[dict]:
+        """An internal async function to load and parse all Courses of a Calendar with a single request.
+
+        Args:
+            calendar (dict): A Calendar object.
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            list[dict]: List of Course objects, or None if the Class Schedule Listing page was not loaded.
+        """
+        response = await asyncio.to_thread(self._search_all_courses, calendar)
+        if '>Class Schedule Listing<' in response.text:
+            LOGGER.info(f'{logger_prefix} | Successfully Loaded All Courses.')
+            
+            # Parse all Course information like Title, Subject, etc.
+            return self._add_listing(await self._parse_listing(response))
+    
+    async def _parse_listing(self, response: Response) -> tuple[list[dict], list[str], list[str]]:
+        """An internal async function that parses a Class Schedule Listing page with the Listing Parser of the profile, on the
+        executor if there is one.
+
+        Args:
+            response (Response): Response object of the Class Schedule Listing page.
+
+        Returns:
+            tuple[list[dict], list[str], list[str]]: See parse_listing.
+        """
+        with self.metrics.stage('Listing Parse'):
+            backend = self.profile.get('Listing Parser', DEFAULT_BACKEND)
+            if backend == STREAM_BACKEND:
+                # The BeautifulSoup path is kept as a fallback should the tokenizer ever choke on a page.
+                try: return await self._run(parse_listing, response.text, self.mappings, STREAM_BACKEND, self.compact_courses)
+                except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e} | Falling back to {DEFAULT_BACKEND}.')
+                backend = DEFAULT_BACKEND
+            
+            return await self._run(parse_listing, response.content, self.mappings, backend, self.compact_courses)
+    
+    def _add_listing(self, listing: tuple[list[dict], list[str], list[str]]) -> list[dict]:
+        """An internal function that saves the paths of a parsed Class Schedule Listing page, as if the CourseParser had parsed it.
+
+        Args:
+            listing (tuple[list[dict], list[str], list[str]]): See parse_listing.
+
+        Returns:
+            list[dict]: List of Course objects.
+        """
+        courses, desc_paths, extra_course_info_paths = listing
+        self.course_parser.desc_paths += desc_paths
+        self.course_parser.extra_course_info_paths += extra_course_info_paths
+        
+        return courses
+    
+    async def _run(self, function, *args):
+        """An internal async function that calls a CPU-bound function on the executor, or directly if there is none. Functions
+        must be picklable (i.e., defined at the top level of a module) to run on a process pool.
+
+        Args:
+            function: Function to call.
+            *args: Arguments of the function.
+
+        Returns:
+            Return value of the function.
+        """
+        if self.executor is None: return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
              
     def get_calendars(self, all_calendars: bool = False) -> list[dict]:
+        from bs4 import BeautifulSoup
+        
         try:
             response = self._get_calendar_page()
             if any([key in response.text for key in ['>Dynamic Schedule<', '>Select Term or Date Range<']]):
@@ -300,6 +606,19 @@ class Parser:
     def get_courses(self, calendars: list[dict]) -> list[dict]:
         """Parse all Courses for a list of Calendars.
 
+        Args:
+            calendars (list[dict]): A list of Calendar objects.
+
+        Returns:
+            list[dict]: A list contanining all the Calendars and their corresponding Courses.
+        """
+        return asyncio.run(self.get_courses_async(calendars))
+    
+    async def get_courses_async(self, calendars: list[dict]) -> list[dict]:
+        """Parse all Courses for a list of Calendars, on the running event loop. See get_courses.
+
+        Blocking requests are sent from a thread, so many Parsers can share one event loop (see Batch.py).
+
         Args:
             calendars (list[dict]): A list of Calendar objects.
 
@@ -309,134 +628,553 @@ class Parser:
         for calendar in calendars:
             start_time = time()
             logger_prefix = f'[{self.profile["School"]}] | Calendar: {calendar["Calendar Name"]}'
+            self.metrics = Metrics({'School': self.profile['School'], 'Calendar': calendar['Calendar Name']})
             
             try:
-                response = self._chunk_load_all_courses(calendar) if self.profile['Chunk Load'] else self._search_all_courses(calendar)
-                if '>Class Schedule Listing<' in response.text:
-                    LOGGER.info(f'{logger_prefix} | Successfully Loaded All Courses.')
-                    soup = BeautifulSoup(response.content, features='html.parser')
-                    
-                    table = soup.find('table', {'class': 'datadisplaytable'})
-                    rows = table.find_all('tr')
-                                        
-                    # Parse all Course information like Title, Subject, etc.
-                    courses = self.course_parser.parse_courses(rows)
-                    LOGGER.info(f'{logger_prefix} | Successfully Parsed All Course Information.')
-                    
-                    # If descriptions and extra info are being parsed, then visit all their saved path's and append info.
-                    if self.get_course_desc or self.get_extra_course_info:
-                        LOGGER.info(f'{logger_prefix} | Total Paths Count: {2 * len(self.course_parser.desc_paths)}')
-                        asyncio.run(self._visit_paths(logger_prefix))
-                        LOGGER.info(f'{logger_prefix} | Successfully Parsed Course Descriptions and Registration Availability.')
-                    
-                        for course, desc, extra_info in zip(courses, self.course_desc, self.extra_course_info): # Unpacking
-                            course['Description'] = desc
-
-                            course['Capacity'] = extra_info['Capacity']
-                            course['Registered'] = extra_info['Registered']
-                            course['Remaining'] = extra_info['Remaining']
-                            course['Waitlisted'] = extra_info['Waitlisted']
-                            
-                            extra = extra_info['Extra']
-                            course['Prerequisites'] = extra['Prerequisites']
-                            course['Corequisites'] = extra['Corequisites']
-                            course['Mutual Exclusions'] = extra['Mutual Exclusions']
-                            course['Cross List Courses'] = extra['Cross List Courses']
-                            course['Restrictions'] = extra['Restrictions']
-                            
+                courses = await self._get_calendar_courses(calendar, logger_prefix)
+                if courses is not None:
                     calendar['Processing Time'] = round(time() - start_time)
                     calendar['Courses'] = courses
-                    self.course_parser.reset_paths()
                     
                     LOGGER.info(f'{logger_prefix} | Finished in {calendar["Processing Time"]} seconds.')
+                    self.metrics.set_value('Courses', len(courses))
+                    
+                    if self.output: self.output.write_calendar(calendar)
+            except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            
+            self._finish_checkpoint(calendar, logger_prefix)
+            self.metrics.set_value('Processing Time', time() - start_time)
+            self._report(logger_prefix)
+            
+            if self.cache:
+                self.cache.flush()
+                LOGGER.info(f'{logger_prefix} | Page Cache: {self.cache.stats()}')
+            if self.archive:
+                self.archive.flush()
+                LOGGER.info(f'{logger_prefix} | Archive: {self.archive.stats()}')
+            
+            # Results are positional, so nothing may carry over to the next Calendar.
+            self.course_parser.reset_paths()
+            self.course_desc, self.extra_course_info = [], []
+            self._resumed = {DESCRIPTION: {}, DETAIL: {}}
+        
+        # The readable copy of the mappings is written once, with every mapping added by the run.
+        if self.mapping_store:
+            try: self.mapping_store.export_json()
             except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
         #with open('table.json', 'w', encoding='UTF-8') as f: f.write(dumps(calendars, indent=4))
         return calendars
+    
+    async def _get_calendar_courses(self, calendar: dict, logger_prefix: str) -> list[dict]:
+        """An internal async function that loads and parses all Courses of a Calendar, along with their Course descriptions and
+        registration availability.
+
+        Args:
+            calendar (dict): A Calendar object.
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            list[dict]: List of Course objects, or None if the Class Schedule Listing page was not loaded.
+        """
+        self._start_calendar(calendar)
+        listing = self.checkpoint.get_listing(self.profile['School'], self._calendar_id) if self.checkpoint else None
+        # The listing is loaded again, so whatever was left of an earlier run (i.e., an expired listing, or failed items) is stale.
+        if self.checkpoint and listing is None: self.checkpoint.clear(self.profile['School'], self._calendar_id)
+        
+        if listing is not None:
+            self._resumed = {kind: self.checkpoint.get_items(self.profile['School'], self._calendar_id, kind) for kind in [DESCRIPTION, DETAIL]}
+            LOGGER.info(f'{logger_prefix} | Resuming from Checkpoint: {len(listing[0])} Courses, {len(self._resumed[DESCRIPTION])} Course Descriptions, {len(self._resumed[DETAIL])} Registration Availabilities.')
+            
+            courses, desc_paths, extra_course_info_paths = listing
+            if self.compact_courses: courses = [Course.from_dict(course) for course in courses]
+            courses = self._add_listing((courses, desc_paths, extra_course_info_paths))
+            if self.get_course_desc or self.get_extra_course_info: await self._visit_paths(logger_prefix)
+        elif self.stream_listing and not self.profile['Chunk Load']:
+            # Course descriptions and registration availability are fetched while the listing is still downloading.
+            payload = await asyncio.to_thread(lambda: self._get_search_payload(self._select_calendar(calendar)))
+            courses = await self._stream_courses(payload, logger_prefix)
+        else:
+            courses = await (self._chunk_load_all_courses(calendar, logger_prefix) if self.profile['Chunk Load'] else self._load_all_courses(calendar, logger_prefix))
+            if courses is not None:
+                LOGGER.info(f'{logger_prefix} | Successfully Parsed All Course Information.')
+                self._checkpoint_listing(courses)
+                
+                # If descriptions and extra info are being parsed, then visit all their saved path's.
+                if self.get_course_desc or self.get_extra_course_info:
+                    LOGGER.info(f'{logger_prefix} | Total Paths Count: {len(set(self.course_parser.desc_paths)) + len(self.course_parser.extra_course_info_paths)}')
+                    await self._visit_paths(logger_prefix)
+                    LOGGER.info(f'{logger_prefix} | Successfully Parsed Course Descriptions and Registration Availability.')
+        
+        if courses is not None:
+            # Append all the descriptions and extra info, if any were visited. Items that could not be fetched are None.
+            with self.metrics.stage('Merge'):
+                for course, desc, extra_info in zip(courses, self.course_desc, self.extra_course_info): # Unpacking
+                    course['Description'] = desc
+                    self._merge_extra_course_info(course, extra_info)
+        
+        return courses
+    
+    def _start_calendar(self, calendar: dict) -> None:
+        """An internal function that prepares the batchers and failures of a Calendar before its items are fetched.
+
+        Args:
+            calendar (dict): A Calendar object.
+        """
+        # Catalog Entry and Detailed Information Section pages are parsed in batches, on the executor if there is one.
+        self.desc_batcher = ParseBatcher(parse_course_descs, self.executor, metrics=self.metrics, stage='Description Parse')
+        self.extra_batcher = ParseBatcher(parse_extra_course_infos, self.executor, metrics=self.metrics, stage='Detail Parse')
+        
+        self._calendar_id = calendar['Calendar ID']
+        self.failures[self._calendar_id] = []
+    
+    def _merge_extra_course_info(self, course: dict, extra_info: dict) -> None:
+        """An internal function that sets the registration availability and extra information of a Course.
+
+        Args:
+            course (dict): Course object. Updated in place.
+            extra_info (dict): Registration availability information of the Course.
+        """
+        course['Capacity'] = extra_info['Capacity']
+        course['Registered'] = extra_info['Registered']
+        course['Remaining'] = extra_info['Remaining']
+        course['Waitlisted'] = extra_info['Waitlisted']
+        
+        extra = extra_info['Extra']
+        course['Prerequisites'] = extra['Prerequisites']
+        course['Corequisites'] = extra['Corequisites']
+        course['Mutual Exclusions'] = extra['Mutual Exclusions']
+        course['Cross List Courses'] = extra['Cross List Courses']
+        course['Restrictions'] = extra['Restrictions']
+    
+    def _checkpoint_listing(self, courses: list[dict]) -> None:
+        """An internal function that checkpoints the Courses of the Calendar being parsed and their saved paths, if there is a checkpoint.
+
+        Args:
+            courses (list[dict]): List of Course objects.
+        """
+        if not self.checkpoint: return
+        
+        try: self.checkpoint.put_listing(self.profile['School'], self._calendar_id, courses, self.course_parser.desc_paths, self.course_parser.extra_course_info_paths)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+    
+    def _checkpoint_item(self, kind: str, key: str, value) -> None:
+        """An internal function that checkpoints an item of the Calendar being parsed that was fetched, if there is a checkpoint.
+
+        Args:
+            kind (str): DESCRIPTION or DETAIL.
+            key (str): Key of the item (path or CRN).
+            value: Value of the item.
+        """
+        if not self.checkpoint: return
+        
+        try: self.checkpoint.put_item(self.profile['School'], self._calendar_id, kind, key, value)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+    
+    def _fail_item(self, kind: str, key: str, path: str, error: str) -> None:
+        """An internal function that records an item of the Calendar being parsed that could not be fetched, so it can be retried.
+
+        Args:
+            kind (str): DESCRIPTION or DETAIL.
+            key (str): Key of the item (path or CRN).
+            path (str): Path of the page of the item.
+            error (str): Why the item could not be fetched.
+        """
+        self.failures.setdefault(self._calendar_id, []).append({'Kind': kind, 'Key': key, 'Path': path, 'Error': error})
+        if not self.checkpoint: return
+        
+        try: self.checkpoint.fail_item(self.profile['School'], self._calendar_id, kind, key, path, error)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+    
+    def _finish_checkpoint(self, calendar: dict, logger_prefix: str) -> None:
+        """An internal function that logs the items of a Calendar that could not be fetched. Once a Calendar has its Courses, its
+        checkpoint keeps only its failures, so retry_failures requests only them. Otherwise, the next run resumes the Calendar.
+
+        Args:
+            calendar (dict): A Calendar object.
+            logger_prefix (str): Prefix of logged messages.
+        """
+        failures = self.failures.get(calendar['Calendar ID'], [])
+        self.metrics.set_value('Failed Items', len(failures))
+        if failures: LOGGER.warning(f'{logger_prefix} | {len(failures)} Items Could Not Be Fetched: {dumps(failures[:10])}')
+        if not self.checkpoint: return
+        
+        try:
+            if calendar.get('Courses'): self.checkpoint.finish(self.profile['School'], calendar['Calendar ID'])
+            else: self.checkpoint.flush()
+            LOGGER.info(f'{logger_prefix} | Checkpoint: {self.checkpoint.stats()}')
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+    
+    def _report(self, logger_prefix: str) -> dict:
+        """An internal function that logs the metrics report of the current Calendar, and writes it to the report file and the
+        Prometheus file, if any.
+
+        Args:
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            dict: Metrics report of the Calendar. See Metrics.report.
+        """
+        report = self.metrics.report()
+        # A Calendar parsed again (i.e., by refresh_seats) replaces its report, so the Prometheus file has one series per label set.
+        self.reports = merge_reports(self.reports, [report])
+        LOGGER.info(f'{logger_prefix} | Metrics: {dumps(report)}')
+        
+        try:
+            if self.report_file:
+                with open(self.report_file, 'a', encoding='UTF-8') as f: f.write(dumps(report) + '\n')
+            if self.prometheus_file: write_prometheus(self.prometheus_file, self.reports)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+        
+        return report
+    
+    def refresh_seats(self, calendars: list[dict]) -> list[dict]:
+        """Refresh only the registration availability (Capacity, Registered, Remaining, Waitlisted) of all Courses of a list of
+        Calendars previously returned by get_courses. The Courses are updated in place. Nothing else is requested or parsed.
+
+        Args:
+            calendars (list[dict]): A list of Calendar objects, with their Courses.
+
+        Returns:
+            list[dict]: Delta of the Courses whose registration availability changed, as {'Calendar ID', 'CRN', 'Changes'}, where
+            Changes maps each changed field to its [old, new] values.
+        """
+        delta = []
+        
+        for calendar in calendars:
+            start_time = time()
+            logger_prefix = f'[{self.profile["School"]}] | Calendar: {calendar["Calendar Name"]}'
+            self.metrics = Metrics({'School': self.profile['School'], 'Calendar': calendar['Calendar Name']})
+            
+            try:
+                crns = [course['CRN'] for course in calendar['Courses']]
+                with self.metrics.stage('Detail Fetch'): seats = asyncio.run(self._visit_seat_paths(calendar['Calendar ID'], crns, logger_prefix))
+                
+                for course in calendar['Courses']:
+                    # Courses whose page could not be loaded keep their previous registration availability.
+                    new_seats = seats.get(course['CRN'])
+                    if new_seats is None: continue
+                    
+                    changes = {field: [course[field], new_seats[field]] for field in SEAT_FIELDS if course[field] != new_seats[field]}
+                    if changes:
+                        course.update(new_seats)
+                        delta.append({'Calendar ID': calendar['Calendar ID'], 'CRN': course['CRN'], 'Changes': changes})
+                
+                LOGGER.info(f'{logger_prefix} | Refreshed {len(seats)}/{len(crns)} Courses in {round(time() - start_time)} seconds.')
+            except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            
+            self.metrics.set_value('Processing Time', time() - start_time)
+            self._report(logger_prefix)
+        
+        if self.cache: self.cache.flush()
+        if self.archive: self.archive.flush()
+        return delta
+    
+    def retry_failures(self, calendars: list[dict]) -> list[dict]:
+        """Fetch again only the Course descriptions and registration availability of a list of Calendars previously returned by
+        get_courses that could not be fetched, as recorded in the checkpoint. The Courses are updated in place, and the items
+        fetched are removed from the checkpoint. Nothing else is requested or parsed.
+
+        Args:
+            calendars (list[dict]): A list of Calendar objects, with their Courses.
+
+        Returns:
+            list[dict]: Items that still could not be fetched. See Checkpoint.failures.
+        """
+        if not self.checkpoint: return []
+        
+        for calendar in calendars:
+            start_time = time()
+            logger_prefix = f'[{self.profile["School"]}] | Calendar: {calendar["Calendar Name"]}'
+            self.metrics = Metrics({'School': self.profile['School'], 'Calendar': calendar['Calendar Name']})
+            
+            try:
+                self._start_calendar(calendar)
+                failures = self.checkpoint.failures(self.profile['School'], calendar['Calendar ID'])
+                if failures: asyncio.run(self._retry_items(calendar['Courses'], failures, logger_prefix))
+                
+                LOGGER.info(f'{logger_prefix} | Retried {len(failures)} Items in {round(time() - start_time)} seconds.')
+            except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            
+            self._finish_checkpoint(calendar, logger_prefix)
+            self.metrics.set_value('Processing Time', time() - start_time)
+            self._report(logger_prefix)
+        
+        if self.cache: self.cache.flush()
+        if self.archive: self.archive.flush()
+        return self.checkpoint.failures(self.profile['School'])
+    
+    async def _retry_items(self, courses: list[dict], failures: list[dict], logger_prefix: str) -> None:
+        """An internal async function that fetches again the failed items of a Calendar, and sets them on its Courses.
+
+        Args:
+            courses (list[dict]): Courses of the Calendar. Updated in place.
+            failures (list[dict]): Items of the Calendar that could not be fetched. See Checkpoint.failures.
+            logger_prefix (str): Prefix of logged messages.
+        """
+        from tqdm.asyncio import tqdm
+        
+        desc_failures = [failure for failure in failures if failure['Kind'] == DESCRIPTION]
+        extra_failures = [failure for failure in failures if failure['Kind'] == DETAIL]
+        
+        async with self._get_async_session() as async_session:
+            with self.metrics.stage('Description Fetch'): descs = await tqdm.gather(*[self._get_desc(async_session, failure['Path']) for failure in desc_failures], desc=f'{logger_prefix} | Course Descriptions')
+            with self.metrics.stage('Detail Fetch'): extra_infos = await tqdm.gather(*[self._get_extra_course_info(async_session, failure['Path']) for failure in extra_failures], desc=f'{logger_prefix} | Registration Availability')
+        
+        # Items that failed again are recorded again, and the Courses keep None.
+        failed = {(failure['Kind'], failure['Key']) for failure in self.failures[self._calendar_id]}
+        descs = {get_course_id(failure['Path']): desc for failure, desc in zip(desc_failures, descs) if (DESCRIPTION, failure['Key']) not in failed}
+        extra_infos = {failure['Key']: extra_info for failure, extra_info in zip(extra_failures, extra_infos) if (DETAIL, failure['Key']) not in failed}
+        
+        with self.metrics.stage('Merge'):
+            for course in courses:
+                course_id = (course['Abbreviation'], course['Level'])
+                if course_id in descs: course['Description'] = descs[course_id]
+                if course['CRN'] in extra_infos: self._merge_extra_course_info(course, extra_infos[course['CRN']])
+    
+    async def _visit_seat_paths(self, term: str, crns: list[str], logger_prefix: str) -> dict:
+        """An internal async function that visits the Detailed Information Section page of each Course, for its registration availability only.
+
+        Args:
+            term (str): Calendar ID.
+            crns (list[str]): CRNs of the Courses.
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            dict: Registration availability of each Course that loaded, keyed by CRN.
+        """
+        from tqdm.asyncio import tqdm
+        
+        async with self._get_async_session() as async_session:
+            tasks = [self.get_seats(async_session, term, crn) for crn in crns]
+            seats = await tqdm.gather(*tasks, desc=f'{logger_prefix} | Registration Availability')
+        
+        return {crn: seat for crn, seat in zip(crns, seats) if seat is not None}
+    
+    async def get_seats(self, async_session: AsyncClient, calendar_id: str, crn: str) -> dict:
+        """Get only the registration availability of a Course, from its Detailed Information Section page. The page cache is never
+        used for the lookup, as registration availability is what is being refreshed. See refresh_seats.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            calendar_id (str): Calendar ID of the Course.
+            crn (str): CRN of the Course.
+
+        Returns:
+            dict: Registration availability (Capacity, Registered, Remaining, Waitlisted) of the Course, or None if the page could
+            not be loaded.
+        """
+        path = DETAIL_PATH.format(term=calendar_id, crn=crn)
+        try:
+            async_session.headers['Referer'] = str(async_session.base_url) + '/bwckschd.p_get_crse_unsec'
+            a = await self._arequest(async_session, 'GET', path, refresh=True)
+            if '>Detailed Class Information<' in a.text: return self.course_parser.parse_seats(a.text)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint(path)})
+    
+    async def _stream_courses(self, payload: str, logger_prefix: str) -> list[dict]:
+        """An internal async function that downloads the Class Schedule Listing page in chunks and parses Courses as their rows
+        arrive. The Course description and registration availability of each Course are requested as soon as it is parsed.
+
+        Args:
+            payload (str): Payload from _get_search_payload function.
+            logger_prefix (str): Prefix of logged messages.
+
+        Returns:
+            list[dict]: List of Course objects, or None if the Class Schedule Listing page was not loaded.
+        """
+        from tqdm.asyncio import tqdm
+        
+        if payload is None: return None
+        
+        courses, desc_tasks, extra_tasks = [], {}, []
+        fetch_paths = self.get_course_desc or self.get_extra_course_info
+        desc_count = 0 # Number of description paths that have been handled.
+        
+        async with self._get_async_session() as async_session:
+            # Share the Banner session (cookies) that selected the Calendar.
+            async_session.cookies = self.session.cookies
+            async_session.headers['Referer'] = str(async_session.base_url) + '/bwckgens.p_proc_term_date'
+            
+            tokenizer = ListingTokenizer()
+            is_listing, tail = False, ''
+            
+            async for chunk in self._stream_listing(async_session, payload):
+                # The title can be split across chunks, so also check the end of the previous chunks.
+                if not is_listing:
+                    is_listing = '>Class Schedule Listing<' in tail + chunk
+                    tail = (tail + chunk)[-64:]
+                
+                with self.metrics.stage('Listing Parse'):
+                    tokenizer.feed(chunk)
+                    for course in self.course_parser.iter_courses(tokenizer.rows()): courses.append(course)
+                
+                # Start requests for every path that was just parsed.
+                if fetch_paths: desc_count = self._start_path_tasks(async_session, desc_tasks, desc_count, extra_tasks)
+            
+            with self.metrics.stage('Listing Parse'):
+                tokenizer.close()
+                for course in self.course_parser.iter_courses(tokenizer.rows()): courses.append(course)
+            
+            if not is_listing:
+                for task in list(desc_tasks.values()) + extra_tasks: task.cancel()
+                return None
+            LOGGER.info(f'{logger_prefix} | Successfully Loaded and Parsed All Courses.')
+            self._checkpoint_listing(courses)
+            
+            if fetch_paths:
+                self._start_path_tasks(async_session, desc_tasks, desc_count, extra_tasks)
+                
+                LOGGER.info(f'{logger_prefix} | Total Paths Count: {len(desc_tasks) + len(extra_tasks)}')
+                try:
+                    # Requests started while the listing downloaded, so only the remaining wait is measured.
+                    with self.metrics.stage('Description Fetch'): descs = dict(zip(desc_tasks, await tqdm.gather(*desc_tasks.values(), desc=f'{logger_prefix} | Course Descriptions')))
+                    self.course_desc = [descs[path] for path in self.course_parser.desc_paths]
+                    with self.metrics.stage('Detail Fetch'): self.extra_course_info = await tqdm.gather(*extra_tasks, desc=f'{logger_prefix} | Registration Availability')
+                except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+                LOGGER.info(f'{logger_prefix} | Successfully Parsed Course Descriptions and Registration Availability.')
+        
+        return courses
+    
+    async def _stream_listing(self, async_session: AsyncClient, payload: str):
+        """An internal async generator that yields the Class Schedule Listing page in chunks of text, from the archive or the page
+        cache if it is there. Otherwise, the page is requested and stored in the page cache and the archive as it arrives.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            payload (str): Payload from _get_search_payload function.
+
+        Yields:
+            str: Chunk of the Class Schedule Listing page.
+        """
+        key, page_type, response = self._get_cached('POST', '/bwckschd.p_get_crse_unsec', payload)
+        if response is not None:
+            text = response.text
+            for i in range(0, len(text), STREAM_CHUNK_SIZE): yield text[i:i + STREAM_CHUNK_SIZE]
+            return
+        
+        # Time spent waiting for chunks, excluding the time the chunks are being parsed by the caller.
+        start, downloading = perf_counter(), True
+        self.metrics.start_stage('Listing Download')
+        
+        try:
+            async with async_session.stream('POST', '/bwckschd.p_get_crse_unsec', content=payload, timeout=LISTING_TIMEOUT) as response:
+                content_type = response.headers.get('Content-Type', 'text/html')
+                writers = []
+                if self.cache and response.status_code == 200: writers.append(self.cache.writer(key, page_type, content_type))
+                if self.archive: writers.append(self.archive.writer(key, 'POST', '/bwckschd.p_get_crse_unsec', response.status_code, content_type))
+                
+                # The cache and the archive keep the bytes as sent, under the Content-Type they were sent with, so only the
+                # tokenizer gets decoded text. The decoder holds back a character split across two chunks.
+                decoder = getincrementaldecoder(response.encoding or 'UTF-8')(errors='replace')
+                async for data in response.aiter_bytes():
+                    for writer in writers: writer.write(data)
+                    
+                    self.metrics.stop_stage('Listing Download', count=False)
+                    downloading = False
+                    yield decoder.decode(data)
+                    self.metrics.start_stage('Listing Download')
+                    downloading = True
+                if rest := decoder.decode(b'', final=True): yield rest
+                for writer in writers: writer.close()
+        finally:
+            if downloading: self.metrics.stop_stage('Listing Download')
+        
+        self.metrics.observe_request('/bwckschd.p_get_crse_unsec', perf_counter() - start, response.status_code, response.num_bytes_downloaded)
+    
+    def _start_path_tasks(self, async_session: AsyncClient, desc_tasks: dict, desc_count: int, extra_tasks: list) -> int:
+        """An internal function that starts a task for every Course description and registration availability path saved since
+        the last call. Sections of the same Course share a single Course description task.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            desc_tasks (dict): Course description tasks, keyed by path. Updated in place.
+            desc_count (int): Number of Course description paths handled by the last call.
+            extra_tasks (list): Registration availability tasks, one per path. Updated in place.
+
+        Returns:
+            int: Number of Course description paths handled.
+        """
+        for path in self.course_parser.desc_paths[desc_count:]:
+            if path not in desc_tasks: desc_tasks[path] = asyncio.create_task(self._get_desc(async_session, path))
+        for path in self.course_parser.extra_course_info_paths[len(extra_tasks):]: extra_tasks.append(asyncio.create_task(self._get_extra_course_info(async_session, path)))
+        
+        return len(self.course_parser.desc_paths)
             
     async def _visit_paths(self, logger_prefix: str) -> None:
         """An internal async function that visits all the Course description and registration availability paths.
-        """   
-        # Main Problem: Too many coroutines/futures to evaluate (at once) and timeouts occur as a result.
-        # Solution: Evaluate in chunks. Using Semaphores was not that helpful.
+        """
+        from tqdm.asyncio import tqdm
+        
+        # All requests are handed to the RequestScheduler at once. It keeps only as many in flight as the school can sustain, with
+        # a timeout per request, so there is no need to evaluate in chunks or to set a timeout as a function of the number of paths.
         
         # Get new async session everytime (as session closes after this function)
         async with self._get_async_session() as async_session:
-            # If evaluating all paths at once, setting a timeout (as function of number of paths) will help avoid timeout errors
-            if self.profile['Chunk Load']: async_session.timeout = ceil(60 * (len(self.course_parser.desc_paths) / 20))
-            
             try:
-                # Course Descriptions
-                if not self.profile['Chunk Load']:                    
-                    tasks = [self._get_desc(async_session, path) for path in self.course_parser.desc_paths]
-                    self.course_desc = await tqdm.gather(*tasks, desc=f'{logger_prefix}| Course Descriptions')
-                else:
-                    chunks = self._split_n_per_chunk(self.course_parser.desc_paths, 2000)
-                    for chunk in chunks:
-                        tasks = [self._get_desc(async_session, path) for path in chunk]
-                        self.course_desc += await tqdm.gather(*tasks, desc=f'{logger_prefix} | Course Descriptions (Chunk {chunks.index(chunk) + 1})')
+                # Course Descriptions. The catalog path of a Course is unique per subject, number and Calendar, so all sections of a
+                # Course share a single request and its description is fanned back out to every section.
+                paths = list(dict.fromkeys(self.course_parser.desc_paths))
+                tasks = [self._get_desc(async_session, path) for path in paths]
+                with self.metrics.stage('Description Fetch'): descs = dict(zip(paths, await tqdm.gather(*tasks, desc=f'{logger_prefix} | Course Descriptions')))
+                self.course_desc = [descs[path] for path in self.course_parser.desc_paths]
                 LOGGER.info(f'{logger_prefix} | Finished Scraping Course Description.')
 
                 # Extra Course Infos
-                if not self.profile['Chunk Load']:
-                    tasks = [self._get_extra_course_info(async_session, path) for path in self.course_parser.extra_course_info_paths]
-                    self.extra_course_info = await tqdm.gather(*tasks, desc=f'{logger_prefix} | Registration Availability')
-                else:
-                    chunks = self._split_n_per_chunk(self.course_parser.extra_course_info_paths, 2000)
-                    for chunk in chunks:
-                        tasks = [self._get_extra_course_info(async_session, path) for path in chunk]
-                        self.extra_course_info += await tqdm.gather(*tasks, desc=f'{logger_prefix} | Registration Availability (Chunk {chunks.index(chunk) + 1})')
+                tasks = [self._get_extra_course_info(async_session, path) for path in self.course_parser.extra_course_info_paths]
+                with self.metrics.stage('Detail Fetch'): self.extra_course_info = await tqdm.gather(*tasks, desc=f'{logger_prefix} | Registration Availability')
                 LOGGER.info(f'{logger_prefix} | Finished Scraping Registration Availability.')
             except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+            
+            LOGGER.info(f'{logger_prefix} | Requests: {self.scheduler.requests} | Retries: {self.scheduler.retries} | Failures: {self.scheduler.failures} | Window: {self.scheduler.window:.1f}')
     
     async def _get_desc(self, async_session: AsyncClient, path: str) -> str:
-        """An internal async function to get description of a Course.
+        """An internal async function to get description of a Course. The page is only fetched here, and parsed by desc_batcher.
 
         Args:
             async_session (AsyncClient): Async session.
             path (str): Path to Catalog Entry page of a Course.
 
         Returns:
-            str: Course description.
+            str: Course description, or None if the page could not be fetched.
         """
+        if path in self._resumed[DESCRIPTION]: return self._resumed[DESCRIPTION][path]
+        
         try:
             async_session.headers['Referer'] = str(async_session.base_url) + '/bwckschd.p_get_crse_unsec'
-            a = await async_session.get(path)
-            if '>Catalog Entries<' in a.text:
-                soup = BeautifulSoup(a.content, features='html.parser')
-                selection = soup.find('td', {'class': 'ntdefault'})
-                    
-                return findall(r'(?<=class="ntdefault"\>)(.*?)(?=\<)', str(selection).replace('\n', ''))[0].strip()
-        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
-        return ''
+            a = await self._arequest(async_session, 'GET', path)
+            if a.status_code != 200: self._fail_item(DESCRIPTION, path, path, f'Status: {a.status_code}')
+            else:
+                # A page without a Catalog Entry is a Course without a description, not a failure.
+                desc = await self.desc_batcher.parse(a.text) if '>Catalog Entries<' in a.text else ''
+                self._checkpoint_item(DESCRIPTION, path, desc)
+                return desc
+        except Exception as e:
+            LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint(path)})
+            self._fail_item(DESCRIPTION, path, path, f'{type(e).__name__}: {e}')
     
     async def _get_extra_course_info(self, async_session: AsyncClient, path: str) -> dict: 
-        """An internal async function to get registration availability of a Course.
+        """An internal async function to get registration availability of a Course. The page is only fetched here, and parsed by
+        extra_batcher.
 
         Args:
             async_session (AsyncClient): Async session.
             path (str): Path to Detailed Information Section page of a Course.
 
         Returns:
-            dict: Registration availbility information of a Course.
+            dict: Registration availbility information of a Course, or empty_extra_course_info() if the page could not be fetched.
         """
+        crn = get_crn(path)
+        if crn in self._resumed[DETAIL]: return self._resumed[DETAIL][crn]
+        
         try:
             async_session.headers['Referer'] = str(async_session.base_url) + '/bwckschd.p_get_crse_unsec'
-            a = await async_session.get(path)
+            a = await self._arequest(async_session, 'GET', path)
             if '>Detailed Class Information<' in a.text:
-                soup = BeautifulSoup(a.content, features='html.parser')
-                    
-                table = soup.find('table', {'class': 'datadisplaytable', 'summary': 'This layout table is used to present the seating numbers.'})
-                rows = table.find_all('tr')
-                    
-                seats = rows[1].find_all('td')
-                capacity, registered, remaining = int(seats[0].text), int(seats[1].text), int(seats[2].text)
-                waitlisted = int(rows[2].find_all('td')[1].text)
-                    
-                # Though we could account for cross-list seats, I will not
-                extra = self.course_parser.parse_extra_course_info(a.text)
-                                
-                return {'Capacity': capacity, 'Registered': registered, 'Remaining': remaining, 'Waitlisted': waitlisted, 'Extra': extra}             
-        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+                extra_info = await self.extra_batcher.parse(a.text)
+                self._checkpoint_item(DETAIL, crn, extra_info)
+                return extra_info
+            self._fail_item(DETAIL, crn, path, f'Status: {a.status_code}')
+        except Exception as e:
+            LOGGER.exception(f'Type: {type(e)} | Error: {e}', extra={'endpoint': get_endpoint(path)})
+            self._fail_item(DETAIL, crn, path, f'{type(e).__name__}: {e}')
         
-        extra = {'Prerequisites': None, 'Corequisites': None, 'Mutual Exclusions': None, 'Cross List Courses': None, 'Restrictions': None}
-        return {'Capacity': 0, 'Registered': 0, 'Remaining': 0, 'Waitlisted': 0, 'Extra': extra}
+        return empty_extra_course_info()
@@ -0,0 +1,306 @@
+from FacetIndex import FacetIndex
+from CourseRecord import Record
+from Output import iter_calendars
+from argparse import ArgumentParser
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qsl, urlsplit
+from threading import Thread, Lock
+from json import dumps
+from re import compile
+
+# Column (data of the viewer, see Displaying/js/index.js) of each Search Pane. Options of a pane are requested and returned by column.
+PANE_COLUMNS = {
+    'Calendar': 'Calendar Name', 'Subject': 'Subject', 'Level': 'Level', 'Capacity': 'Capacity', 'Attribute': 'Attributes',
+    'Type': 'Properties.0.Type', 'Time': 'Properties.0.Time', 'Day': 'Properties.0.Days', 'Location': 'Properties.0.Location',
+    'Nature': 'Properties.0.Nature', 'Instructor': 'Properties.0.Instructors'
+}
+COLUMN_PANES = {column: pane for pane, column in PANE_COLUMNS.items()}
+
+# Paths of the API.
+COURSES_PATH = '/courses'
+FACETS_PATH = '/facets'
+
+# Number of responses kept in the cache, least recently used first out.
+CACHE_SIZE = 256
+
+# Parameters of a DataTables request, i.e. "columns[2][data]", "order[0][dir]" or "searchPanes[Subject][0]".
+PARAMETER_PATTERN = compile(r'^(\w+)\[([^\]]*)\](?:\[([^\]]*)\])?$')
+
+def _get_value(row: dict, column: str):
+    """An internal function that gets the value of a column of a row, following dots like DataTables (i.e., "Properties.0.Time").
+    """
+    value = row
+    for key in column.split('.'):
+        try: value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError): return None
+
+    return value
+
+def _get_sort_key(value) -> tuple:
+    """An internal function that makes values of any type comparable: empty values first, then numbers, then text.
+    """
+    if value is None or value == []: return (0, 0, '')
+    if isinstance(value, (int, float)): return (1, value, '')
+    if isinstance(value, list): value = ', '.join([str(item) for item in value])
+
+    return (2, 0, str(value).lower())
+
+def parse_parameters(pairs: list[tuple[str, str]]) -> dict:
+    """Parse the parameters of a DataTables server-side processing request.
+
+    Args:
+        pairs (list[tuple[str, str]]): Parameters of the query string (or form body), in order.
+
+    Returns:
+        dict: Flat parameters (i.e., "draw"), and "columns", "order", "search" and "searchPanes", each a dict keyed by index (or
+        pane column) of dicts (or lists of selected values, for searchPanes).
+    """
+    params = {'columns': {}, 'order': {}, 'search': {}, 'searchPanes': {}}
+    for key, value in pairs:
+        match = PARAMETER_PATTERN.match(key)
+        if match is None:
+            params[key] = value
+            continue
+
+        name, first, second = match.groups()
+        if name == 'search': params['search'][first] = value
+        elif name == 'searchPanes': params['searchPanes'].setdefault(first, []).append(value)
+        elif name in ['columns', 'order'] and second is not None: params[name].setdefault(int(first), {})[second] = value
+
+    return params
+
+class CourseQuery:
+    def __init__(self, calendars: list[dict], cache_size: int = CACHE_SIZE) -> None:
+        """Initialize a CourseQuery object, which answers paginated, sorted and faceted queries over the rows of the viewer (every
+        Course, with the name of its Calendar) using a FacetIndex. Read-only, so responses are cached.
+
+        Args:
+            calendars (list[dict]): A list of Calendar objects, as returned by Parser.get_courses.
+            cache_size (int, optional): Number of responses kept in the cache. Defaults to CACHE_SIZE.
+        """
+        self.rows = []
+        for calendar in calendars:
+            for course in calendar['Courses']:
+                course = course.to_dict() if isinstance(course, Record) else dict(course)
+                course['Calendar Name'] = calendar['Calendar Name']
+                self.rows.append(course)
+
+        self.index = FacetIndex.build(calendars)
+        self.totals = self.index.counts() # Precomputed count of each value of each pane, among all rows.
+        self.cache_size = cache_size
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+        self._ranks = {} # Rank of each row when sorted by a column, keyed by column
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def _get_ranks(self, column: str) -> list[int]:
+        """An internal function that returns the rank of the value of each row in a column, computed once per column.
+        """
+        with self._lock:
+            if column not in self._ranks:
+                keys = [_get_sort_key(_get_value(row, column)) for row in self.rows]
+                # Equal values share a rank, so rows that tie are ordered by the next column.
+                rank_of = {key: rank for rank, key in enumerate(sorted(set(keys)))}
+                self._ranks[column] = [rank_of[key] for key in keys]
+
+            return self._ranks[column]
+
+    def _get_selections(self, search_panes: dict) -> dict:
+        """An internal function that converts the selected options of Search Panes, by column, to selections by pane.
+        """
+        return {COLUMN_PANES[column]: values for column, values in search_panes.items() if column in COLUMN_PANES}
+
+    def _get_options(self, bitmap: int) -> dict:
+        """An internal function that returns the options of every pane, in the shape of the searchPanes of a DataTables response.
+        """
+        counts = self.index.counts(bitmap)
+        return {
+            PANE_COLUMNS[pane]: [
+                {'label': value, 'total': total, 'value': value, 'count': counts[pane].get(value, 0)}
+                for value, total in totals.items() if value is not None
+            ]
+            for pane, totals in self.totals.items()
+        }
+
+    def query(self, params: dict) -> dict:
+        """Answer a DataTables server-side processing request.
+
+        Args:
+            params (dict): Parameters of the request. See parse_parameters.
+
+        Returns:
+            dict: Response, with draw, recordsTotal, recordsFiltered, data (the rows of the page) and searchPanes (options of every
+            pane, with counts among the filtered rows).
+        """
+        draw = int(params.get('draw', 0) or 0)
+        key = dumps({name: value for name, value in params.items() if name not in ['draw', '_']}, sort_keys=True)
+
+        with self._lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else: self.misses += 1
+
+        if response is None:
+            response = self._query(params)
+            with self._lock:
+                self._cache[key] = response
+                if len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+
+        return {'draw': draw} | response
+
+    def _query(self, params: dict) -> dict:
+        """An internal function that answers a request, without the cache. See query.
+        """
+        bitmap = self.index.filter(self._get_selections(params['searchPanes']), params.get('combiner', 'or'))
+        if params['search'].get('value'): bitmap &= self.index.search(params['search']['value'])
+        ids = self.index.ids(bitmap)
+
+        # Sort by each ordered column, the last one first, so the first one takes precedence.
+        for order in [params['order'][i] for i in sorted(params['order'], reverse=True)]:
+            column = params['columns'].get(int(order.get('column', 0)), {}).get('data')
+            if not column or column == 'null': continue
+            ranks = self._get_ranks(column)
+            ids.sort(key=ranks.__getitem__, reverse=order.get('dir') == 'desc')
+
+        start, length = int(params.get('start', 0) or 0), int(params.get('length', 10) or 10)
+        page = ids[start:] if length < 0 else ids[start:start + length]
+
+        return {
+            'recordsTotal': len(self.rows),
+            'recordsFiltered': len(ids),
+            'data': [self.rows[i] for i in page],
+            'searchPanes': {'options': self._get_options(bitmap)}
+        }
+
+    def facets(self, params: dict) -> dict:
+        """Get the count of each value of each pane, among the rows matching the selected options and search of a request.
+
+        Args:
+            params (dict): Parameters of the request. See parse_parameters.
+
+        Returns:
+            dict: Number of matching rows, and the count of each value, keyed by pane.
+        """
+        bitmap = self.index.filter(self._get_selections(params['searchPanes']), params.get('combiner', 'or'))
+        if params['search'].get('value'): bitmap &= self.index.search(params['search']['value'])
+
+        return {'Count': bitmap.bit_count(), 'Panes': self.index.counts(bitmap)}
+
+class QueryServer:
+    def __init__(self, query: CourseQuery, port: int = 0, host: str = '127.0.0.1') -> None:
+        """Initialize a QueryServer object, a local read-only HTTP server of a CourseQuery, so the viewer only receives the rows on screen.
+
+        GET (or POST) /courses answers a DataTables server-side processing request, and /facets the counts of the panes.
+
+        Args:
+            query (CourseQuery): The query of the rows.
+            port (int, optional): Port to listen on. Defaults to 0 (any free port).
+            host (str, optional): Address to listen on. Defaults to '127.0.0.1' (this computer only).
+        """
+        self.query = query
+
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), self._get_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+    def _respond(self, path: str, body: bytes) -> tuple[int, bytes]:
+        """An internal function that gets the response to a request.
+
+        Returns:
+            tuple[int, bytes]: Status code and body (JSON) of the response.
+        """
+        url = urlsplit(path)
+        try:
+            # Parameters are parsed here, so a malformed request (i.e., "columns[x][data]=a" or a body that is not UTF-8) is a 400.
+            params = parse_parameters(parse_qsl(url.query, keep_blank_values=True) + parse_qsl(body.decode('UTF-8'), keep_blank_values=True))
+            if url.path == COURSES_PATH: return 200, dumps(self.query.query(params)).encode('UTF-8')
+            if url.path == FACETS_PATH: return 200, dumps(self.query.facets(params)).encode('UTF-8')
+        except (KeyError, ValueError) as e: return 400, dumps({'error': f'Invalid request: {e}'}).encode('UTF-8')
+
+        return 404, dumps({'error': 'Not Found'}).encode('UTF-8')
+
+    def _get_handler(self):
+        """An internal function that creates the request handler class of the server.
+        """
+        query_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True # Headers and body are written separately, which would otherwise wait on a delayed ACK.
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                # The viewer is opened from a file, so any origin may read the (local, read-only) data.
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self._send(*query_server._respond(self.path, body))
+
+            do_GET = do_POST = _handle
+
+            def do_OPTIONS(self) -> None:
+                self._send(204, b'')
+
+            def log_message(self, format, *args) -> None: pass
+
+        return Handler
+
+    def start(self) -> None:
+        """Serve requests on a background thread.
+        """
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serve requests on the current thread, until interrupted.
+        """
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """Stop serving requests.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+def main() -> None:
+    """Run a QueryServer from the command line.
+    """
+    arg_parser = ArgumentParser(description='A local read-only HTTP server of paginated, sorted and faceted Courses, for DataTables server-side processing.')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses (.json, .ndjson or .cols), or a CourseStore file (.sqlite). Defaults to ./Output.json.')
+    arg_parser.add_argument('--school', default=None, help='School of the Calendars. Required for a CourseStore file.')
+    arg_parser.add_argument('--port', type=int, default=8001, help='Port to listen on. Defaults to 8001.')
+    arg_parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help=f'Number of responses kept in the cache. Defaults to {CACHE_SIZE}.')
+    args = arg_parser.parse_args()
+
+    if args.input.endswith('.sqlite') and not args.school: arg_parser.error('--school is required with a CourseStore file.')
+
+    query = CourseQuery(list(iter_calendars(args.input, args.school)), args.cache_size)
+    server = QueryServer(query, args.port)
+    print(f'Serving {len(query.rows)} Courses on http://127.0.0.1:{server.port}{COURSES_PATH}')
+    try: server.serve_forever()
+    except KeyboardInterrupt: server.stop()
+
+if __name__ == '__main__':
+    main()
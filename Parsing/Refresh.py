@@ -0,0 +1,39 @@
+from argparse import ArgumentParser
+from json import loads, dumps
+from os import replace
+from Parser import Parser
+from CourseRecord import encode_record
+
+def write_json(filename: str, data) -> None:
+    """Write JSON to a file atomically, so a reader never sees a half-written file.
+
+    Args:
+        filename (str): Path of the file.
+        data: JSON-serializable data. Course records (see CourseRecord.py) are written as Course objects.
+    """
+    with open(filename + '.tmp', 'w', encoding='UTF-8') as f: f.write(dumps(data, indent=4, default=encode_record))
+    replace(filename + '.tmp', filename)
+
+def main() -> None:
+    """Refresh the registration availability of an output of Parser.get_courses, and write the updated output and a delta of the changed Courses.
+    """
+    arg_parser = ArgumentParser(description='Refresh only the registration availability (Capacity, Registered, Remaining, Waitlisted) of the Courses in an output of Parser.get_courses.')
+    arg_parser.add_argument('school', help='School of the profile to use, from profiles.json.')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses. Defaults to ./Output.json.')
+    arg_parser.add_argument('--output', default=None, help='Where to write the updated output. Defaults to the input.')
+    arg_parser.add_argument('--delta', default='./Delta.json', help='Where to write the delta of the changed Courses. Defaults to ./Delta.json.')
+    args = arg_parser.parse_args()
+
+    with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
+    profile = next(profile for profile in profiles if profile['School'] == args.school)
+
+    with open(args.input, 'r', encoding='UTF-8') as f: calendars = loads(f.read())
+
+    delta = Parser(profile).refresh_seats(calendars)
+
+    write_json(args.output or args.input, calendars)
+    write_json(args.delta, delta)
+    print(f'{len(delta)} Courses changed.')
+
+if __name__ == '__main__':
+    main()
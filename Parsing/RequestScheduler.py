@@ -0,0 +1,174 @@
+from httpx import AsyncClient, Response, Limits, Timeout, TimeoutException, TransportError
+from time import monotonic
+from random import uniform
+import asyncio
+import logging
+
+# Window (number of requests in flight) bounds. The window starts small and grows while the host keeps up.
+INITIAL_WINDOW = 8
+MIN_WINDOW = 1
+MAX_WINDOW = 128
+
+# The window is halved when a request fails, or when a request takes this many times longer than the fastest seen.
+DECREASE_FACTOR = 0.5
+LATENCY_TOLERANCE = 4
+
+# Per-request timeouts (in seconds), instead of a single timeout for the whole session.
+CONNECT_TIMEOUT = 10
+REQUEST_TIMEOUT = 30
+
+# Retries for failed requests, with exponential backoff (in seconds) and jitter.
+MAX_RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+
+# Status codes that are worth retrying.
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+LOGGER = logging.getLogger(__name__)
+
+class RequestScheduler:
+    def __init__(self, max_window: int = MAX_WINDOW, initial_window: int = INITIAL_WINDOW, max_retries: int = MAX_RETRIES) -> None:
+        """Initialize a RequestScheduler object, which bounds the number of requests in flight to a host.
+
+        The bound (window) is adapted AIMD-style: it grows by one request per round trip while requests succeed at a steady
+        latency, and is halved (at most once per round trip) when requests fail or their latency climbs.
+
+        Args:
+            max_window (int, optional): Maximum number of requests in flight. Defaults to MAX_WINDOW.
+            initial_window (int, optional): Number of requests in flight to start with. Defaults to INITIAL_WINDOW.
+            max_retries (int, optional): Number of times a failed request is retried. Defaults to MAX_RETRIES.
+        """
+        self.max_window = max(MIN_WINDOW, max_window)
+        self.window = float(min(initial_window, self.max_window))
+        self.max_retries = max_retries
+
+        self.in_flight = 0
+        self.min_latency = None # Fastest request seen, as a baseline for the host.
+        self.latency = None # Moving average of the latency of requests.
+        self.last_decrease = 0
+
+        # Counters
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+        # asyncio primitives belong to one event loop, and every asyncio.run has its own.
+        self._loop = None
+        self._condition = None
+
+    def limits(self) -> Limits:
+        """Connection pool limits that match the window.
+
+        Returns:
+            Limits: Limits for an AsyncClient.
+        """
+        return Limits(max_connections=self.max_window, max_keepalive_connections=self.max_window)
+
+    def _get_condition(self) -> asyncio.Condition:
+        """An internal function that returns the Condition of the running event loop.
+
+        Returns:
+            asyncio.Condition: Condition used to wait for room in the window.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop: self._loop, self._condition, self.in_flight = loop, asyncio.Condition(), 0
+
+        return self._condition
+
+    def _on_success(self, latency: float) -> None:
+        """An internal function that updates the window after a successful request.
+
+        Args:
+            latency (float): Latency of the request (in seconds).
+        """
+        self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+        if latency > LATENCY_TOLERANCE * self.min_latency: self._decrease()
+        else: self.window = min(self.max_window, self.window + 1 / self.window)
+
+    def _decrease(self) -> None:
+        """An internal function that halves the window, at most once per round trip so a burst of failures counts once.
+        """
+        now = monotonic()
+        if now - self.last_decrease < (self.latency or 0): return
+
+        self.last_decrease = now
+        self.window = max(MIN_WINDOW, self.window * DECREASE_FACTOR)
+        LOGGER.debug(f'Window decreased to {self.window:.1f}')
+
+    def _get_backoff(self, attempt: int, response: Response = None) -> float:
+        """An internal function that determines how long to wait before retrying a request.
+
+        Args:
+            attempt (int): Number of the attempt that failed, starting at 0.
+            response (Response, optional): Response of the failed attempt, if any.
+
+        Returns:
+            float: Time to wait (in seconds).
+        """
+        if response is not None and response.headers.get('Retry-After', '').isdigit(): return min(MAX_BACKOFF, int(response.headers['Retry-After']))
+
+        return min(MAX_BACKOFF, BACKOFF * 2 ** attempt) * uniform(0.5, 1.5)
+
+    async def request(self, async_session: AsyncClient, method: str, path: str, timeout: float = REQUEST_TIMEOUT, metrics=None, **kwargs) -> Response:
+        """Send a request once there is room in the window, retrying with backoff if it fails.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            method (str): HTTP method.
+            path (str): Path to request.
+            timeout (float, optional): Timeout of each attempt (in seconds). Defaults to REQUEST_TIMEOUT.
+            metrics (Metrics, optional): Metrics to record each attempt, retry and failure in. Defaults to None.
+            **kwargs: Passed to AsyncClient.request.
+
+        Raises:
+            Exception: The error of the last attempt, if every attempt raised.
+
+        Returns:
+            Response: Response of the last attempt.
+        """
+        condition = self._get_condition()
+
+        for attempt in range(self.max_retries + 1):
+            async with condition:
+                await condition.wait_for(lambda: self.in_flight < int(self.window))
+                self.in_flight += 1
+
+            response, error, start = None, None, monotonic()
+            try: response = await async_session.request(method, path, timeout=Timeout(timeout, connect=CONNECT_TIMEOUT), **kwargs)
+            except (TimeoutException, TransportError) as e: error = e
+            finally:
+                if metrics is not None:
+                    metrics.observe_request(path, monotonic() - start, response.status_code if response is not None else None, response.num_bytes_downloaded if response is not None else 0)
+
+                async with condition:
+                    self.in_flight -= 1
+                    self.requests += 1
+
+                    if response is not None and response.status_code not in RETRY_STATUS_CODES: self._on_success(monotonic() - start)
+                    else: self._decrease()
+                    condition.notify_all()
+
+            if error is None and response.status_code not in RETRY_STATUS_CODES: return response
+
+            if attempt < self.max_retries:
+                self.retries += 1
+                if metrics is not None: metrics.count(path, 'Retries')
+                await asyncio.sleep(self._get_backoff(attempt, response))
+
+        self.failures += 1
+        if metrics is not None: metrics.count(path, 'Failures')
+        if error is not None: raise error
+        return response
+
+    async def get(self, async_session: AsyncClient, path: str, **kwargs) -> Response:
+        """Send a GET request. See request.
+        """
+        return await self.request(async_session, 'GET', path, **kwargs)
+
+    async def post(self, async_session: AsyncClient, path: str, **kwargs) -> Response:
+        """Send a POST request. See request.
+        """
+        return await self.request(async_session, 'POST', path, **kwargs)
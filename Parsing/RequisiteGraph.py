@@ -0,0 +1,329 @@
+from ScheduleBuilder import get_course_key
+from Output import iter_calendars
+from argparse import ArgumentParser
+from json import dumps, loads
+from re import compile
+
+# Requisite fields of a Course object that refer to other Courses, and the direction of their edges.
+EDGE_KEYS = ['Prerequisites', 'Corequisites', 'Mutual Exclusions', 'Cross List Courses']
+
+# Course identifiers (i.e., "MATH 150" or "CHEM 210L"), parentheses and connectives of a requisite.
+TOKEN_PATTERN = compile(r'\b([A-Z][A-Z&]{1,6})\s+(\d{2,4}[A-Z]?)\b|(\()|(\))|\b(and|or|AND|OR)\b')
+MARKUP_PATTERN = compile(r'<[^>]*>')
+
+def _tokenize(text: str, subjects: set) -> list[str]:
+    """An internal function that splits a requisite into Course keys (of known subjects only), parentheses and connectives.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(MARKUP_PATTERN.sub(' ', text)):
+        subject, level, opening, closing, connective = match.groups()
+        if subject is not None:
+            if subject in subjects: tokens.append(f'{subject} {level}')
+        else: tokens.append(opening or closing or connective.lower())
+
+    return tokens
+
+def _parse_expression(tokens: list[str], i: int = 0) -> tuple:
+    """An internal function that parses tokens into a requirement, where "and" binds tighter than "or".
+
+    Returns:
+        tuple: The requirement (a Course key, {'and': [...]}, {'or': [...]}, or None if it names no Course), and the index of the
+        next token.
+    """
+    terms, factors = [], []
+    while i < len(tokens):
+        token = tokens[i]
+        if token == ')': break
+        if token == '(':
+            factor, i = _parse_expression(tokens, i + 1)
+            if factor is not None: factors.append(factor)
+        elif token == 'or':
+            terms.append(factors)
+            factors = []
+        elif token != 'and': factors.append(token)
+        i += 1
+    terms.append(factors)
+
+    terms = [factors[0] if len(factors) == 1 else {'and': factors} for factors in terms if factors]
+    if not terms: return None, i
+
+    return (terms[0] if len(terms) == 1 else {'or': terms}), i
+
+def parse_requirement(items: list, subjects: set):
+    """Parse the Prerequisites of a Course into a requirement. Text that names no Course (i.e., test scores) is left out.
+
+    Args:
+        items (list): Prerequisites of a Course object.
+        subjects (set): Known subject abbreviations, so only real Courses are matched.
+
+    Returns:
+        A Course key, {'and': [requirements]}, {'or': [requirements]}, or None if no Course is required.
+    """
+    return _parse_expression(_tokenize(' '.join([item for item in items or [] if isinstance(item, str)]), subjects))[0]
+
+def get_course_keys(items: list, subjects: set) -> list[str]:
+    """Find the Courses a requisite field refers to.
+
+    Args:
+        items (list): Items of a requisite field of a Course object.
+        subjects (set): Known subject abbreviations.
+
+    Returns:
+        list[str]: Course keys, in order of appearance and without duplicates.
+    """
+    keys = [token for item in items or [] if isinstance(item, str) for token in _tokenize(item, subjects)]
+    return list(dict.fromkeys([key for key in keys if ' ' in key]))
+
+def _to_csr(edges: list[set]) -> tuple[list[int], list[int]]:
+    """An internal function that converts adjacency sets to compressed sparse rows: the targets of node i are
+    targets[offsets[i]:offsets[i + 1]].
+    """
+    offsets, targets = [0], []
+    for nodes in edges:
+        targets += sorted(nodes)
+        offsets.append(len(targets))
+
+    return offsets, targets
+
+class RequisiteGraph:
+    def __init__(self) -> None:
+        """Initialize an empty RequisiteGraph object. See build and load.
+
+        Each Course (by Abbreviation and Level, i.e. "MATH 150", across its sections and Calendars) is a node, numbered by its
+        position in the sorted list of Courses. For each requisite field, the graph holds the forward edges (a Course to the Courses it
+        requires) and the reverse edges (a Course to the Courses that require it) as compressed sparse rows, so the neighbours of a
+        Course are a slice. Cross-listed Courses are grouped into equivalence classes, and the Prerequisites of each Course are kept
+        as a requirement of "and" and "or" groups.
+        """
+        self.courses = [] # Course keys, sorted
+        self.ids = {} # Position of each Course key
+        self.forward = {key: ([0], []) for key in EDGE_KEYS} # Offsets and targets, keyed by requisite field
+        self.reverse = {key: ([0], []) for key in EDGE_KEYS}
+        self.classes = [] # Equivalence class (the smallest id of its Courses) of each Course, by Cross List Courses
+        self.requirements = {} # Requirement of each Course with Prerequisites, keyed by Course key
+        self._members = {} # Courses of each equivalence class
+
+    @classmethod
+    def build(cls, calendars: list[dict]):
+        """Build the graph of a list of Calendars.
+
+        Args:
+            calendars (list[dict]): A list of Calendar objects, as returned by Parser.get_courses.
+
+        Returns:
+            RequisiteGraph: The graph.
+        """
+        courses = [course for calendar in calendars for course in calendar['Courses']]
+        subjects = {course['Abbreviation'].upper() for course in courses}
+
+        references, requirements = {}, {}
+        for course in courses:
+            key = get_course_key(course)
+            edges = references.setdefault(key, {field: set() for field in EDGE_KEYS})
+            for field in EDGE_KEYS: edges[field].update(get_course_keys(course[field], subjects))
+
+            # The first section with Prerequisites is used for the requirement of the Course.
+            if key not in requirements:
+                requirement = parse_requirement(course['Prerequisites'], subjects)
+                if requirement is not None: requirements[key] = requirement
+
+        graph = cls()
+        graph.courses = sorted(set(references) | {target for edges in references.values() for targets in edges.values() for target in targets})
+        graph.ids = {key: i for i, key in enumerate(graph.courses)}
+        graph.requirements = requirements
+
+        for field in EDGE_KEYS:
+            forward, reverse = [set() for _ in graph.courses], [set() for _ in graph.courses]
+            for key, edges in references.items():
+                for target in edges[field]:
+                    if target == key: continue
+                    forward[graph.ids[key]].add(graph.ids[target])
+                    reverse[graph.ids[target]].add(graph.ids[key])
+
+            graph.forward[field], graph.reverse[field] = _to_csr(forward), _to_csr(reverse)
+
+        graph._build_classes()
+        return graph
+
+    def _build_classes(self) -> None:
+        """An internal function that groups cross-listed Courses into equivalence classes, with union-find.
+        """
+        parents = list(range(len(self.courses)))
+        def find(i: int) -> int:
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        offsets, targets = self.forward['Cross List Courses']
+        for i in range(len(self.courses)):
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                a, b = find(i), find(j)
+                if a != b: parents[max(a, b)] = min(a, b)
+
+        self.classes = [find(i) for i in range(len(self.courses))]
+        self._index_classes()
+
+    def _index_classes(self) -> None:
+        """An internal function that lists the Courses of each equivalence class.
+        """
+        self._members = {}
+        for course, group in zip(self.courses, self.classes): self._members.setdefault(group, []).append(course)
+
+    def _get_neighbours(self, rows: tuple[list[int], list[int]], key: str) -> list[str]:
+        """An internal function that returns the Course keys of a row of compressed sparse rows.
+        """
+        i = self.ids.get(key)
+        if i is None: return []
+
+        offsets, targets = rows
+        return [self.courses[j] for j in targets[offsets[i]:offsets[i + 1]]]
+
+    def requires(self, key: str, field: str = 'Prerequisites') -> list[str]:
+        """Get the Courses a Course refers to in a requisite field.
+
+        Args:
+            key (str): Course key (i.e., "MATH 150").
+            field (str, optional): One of EDGE_KEYS. Defaults to 'Prerequisites'.
+
+        Returns:
+            list[str]: Course keys.
+        """
+        return self._get_neighbours(self.forward[field], key)
+
+    def required_by(self, key: str, field: str = 'Prerequisites') -> list[str]:
+        """Get the Courses that refer to a Course in a requisite field (i.e., what a Course unlocks, for Prerequisites).
+
+        Args:
+            key (str): Course key.
+            field (str, optional): One of EDGE_KEYS. Defaults to 'Prerequisites'.
+
+        Returns:
+            list[str]: Course keys.
+        """
+        return self._get_neighbours(self.reverse[field], key)
+
+    def equivalents(self, key: str) -> list[str]:
+        """Get the Courses cross-listed with a Course, directly or not, including itself.
+
+        Args:
+            key (str): Course key.
+
+        Returns:
+            list[str]: Course keys.
+        """
+        i = self.ids.get(key)
+        if i is None: return [key]
+
+        return list(self._members[self.classes[i]])
+
+    def _is_met(self, requirement, completed: set) -> bool:
+        """An internal function that evaluates a requirement against completed equivalence classes.
+        """
+        if isinstance(requirement, str): return self.classes[self.ids[requirement]] in completed
+        if 'and' in requirement: return all([self._is_met(item, completed) for item in requirement['and']])
+
+        return any([self._is_met(item, completed) for item in requirement['or']])
+
+    def can_take(self, key: str, completed: list[str]) -> bool:
+        """Determine if the Prerequisites of a Course are met by completed Courses. A Course cross-listed with a required Course
+        counts as that Course.
+
+        Args:
+            key (str): Course key.
+            completed (list[str]): Course keys of completed Courses.
+
+        Returns:
+            bool: Whether or not the Prerequisites are met.
+        """
+        requirement = self.requirements.get(key)
+        if requirement is None: return True
+
+        return self._is_met(requirement, {self.classes[self.ids[course]] for course in completed if course in self.ids})
+
+    def next_courses(self, completed: list[str]) -> list[str]:
+        """Get the Courses unlocked by completed Courses: those that require one of them (or a Course cross-listed with one of them),
+        whose Prerequisites are now met, and that are not completed.
+
+        Args:
+            completed (list[str]): Course keys of completed Courses.
+
+        Returns:
+            list[str]: Course keys, sorted.
+        """
+        done = {equivalent for course in completed for equivalent in self.equivalents(course)}
+        candidates = {unlocked for course in done for unlocked in self.required_by(course)}
+
+        return sorted([key for key in candidates if key not in done and self.can_take(key, completed)])
+
+    def to_dict(self) -> dict:
+        """Convert the graph to a JSON-serializable dict.
+
+        Returns:
+            dict: Courses, forward and reverse edges of each requisite field (offsets and targets), equivalence classes, and
+            requirements.
+        """
+        return {
+            'Courses': self.courses,
+            'Forward': {field: {'Offsets': offsets, 'Targets': targets} for field, (offsets, targets) in self.forward.items()},
+            'Reverse': {field: {'Offsets': offsets, 'Targets': targets} for field, (offsets, targets) in self.reverse.items()},
+            'Classes': self.classes,
+            'Requirements': self.requirements
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Create a graph from its dict. See to_dict.
+
+        Args:
+            data (dict): The dict.
+
+        Returns:
+            RequisiteGraph: The graph.
+        """
+        graph = cls()
+        graph.courses = data['Courses']
+        graph.ids = {key: i for i, key in enumerate(graph.courses)}
+        graph.forward = {field: (rows['Offsets'], rows['Targets']) for field, rows in data['Forward'].items()}
+        graph.reverse = {field: (rows['Offsets'], rows['Targets']) for field, rows in data['Reverse'].items()}
+        graph.classes = data['Classes']
+        graph.requirements = data['Requirements']
+        graph._index_classes()
+
+        return graph
+
+    def write(self, filename: str) -> None:
+        """Write the graph as JSON.
+
+        Args:
+            filename (str): Path of the file.
+        """
+        with open(filename, 'w', encoding='UTF-8') as f: f.write(dumps(self.to_dict(), separators=(',', ':')))
+
+    @classmethod
+    def load(cls, filename: str):
+        """Load a graph written by write.
+
+        Args:
+            filename (str): Path of the file.
+
+        Returns:
+            RequisiteGraph: The graph.
+        """
+        with open(filename, 'r', encoding='UTF-8') as f: return cls.from_dict(loads(f.read()))
+
+def main() -> None:
+    """Build the requisite graph of an output of Parser.get_courses.
+    """
+    arg_parser = ArgumentParser(description='Build the prerequisite, corequisite, mutual exclusion and cross-list graph of an output of Parser.get_courses.')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses (.json, .ndjson, .cols or .sqlite). Defaults to ./Output.json.')
+    arg_parser.add_argument('--school', default=None, help='School of the Calendars. Required for a CourseStore file.')
+    arg_parser.add_argument('--output', default='./Requisites.json', help='Where to write the graph. Defaults to ./Requisites.json.')
+    args = arg_parser.parse_args()
+
+    graph = RequisiteGraph.build(list(iter_calendars(args.input, args.school)))
+    graph.write(args.output)
+    print(f'{len(graph.courses)} Courses, {sum([len(targets) for _, targets in graph.forward.values()])} edges, {len(set(graph.classes))} equivalence classes.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+from MeetingTimes import complete_meeting, get_occupancy
+from Output import iter_calendars
+from argparse import ArgumentParser
+from itertools import product
+
+def get_course_key(course: dict) -> str:
+    """Determine the key of the Course a section belongs to (i.e., "MATH 150").
+
+    Args:
+        course (dict): A Course object (a section).
+
+    Returns:
+        str: Abbreviation and Level of the Course.
+    """
+    return f'{course["Abbreviation"]} {course["Level"]}'
+
+def get_course_occupancy(course: dict) -> int:
+    """Determine the slots of the week all meetings of a section occupy. See get_occupancy.
+
+    Args:
+        course (dict): A Course object (a section).
+
+    Returns:
+        int: The occupancy bitset. Meetings with unknown times or days (i.e., "TBA") occupy nothing.
+    """
+    occupancy = 0
+    for meeting in map(complete_meeting, course['Properties']): occupancy |= get_occupancy(meeting['Start'], meeting['End'], meeting['Day Mask'])
+
+    return occupancy
+
+class ScheduleBuilder:
+    def __init__(self, courses: list[dict]) -> None:
+        """Initialize a ScheduleBuilder object, which enumerates the schedules (one section of each desired Course) whose meetings do
+        not overlap. Meetings are compared as occupancy bitsets (see MeetingTimes.py), so a conflict check is a single AND.
+
+        Sections of a Course that meet at the same times are interchangeable, so they are grouped and only one of them is searched.
+        Courses with the fewest groups are placed first, and a choice is dropped as soon as a Course left to place has no group that
+        fits, so the search never explores a branch with no schedule.
+
+        Args:
+            courses (list[dict]): Course objects (sections) of a Calendar. Meetings with unknown times never conflict.
+        """
+        self.sections = {} # Sections of each Course, keyed by Course key (see get_course_key)
+        self.occupancy = {} # Occupancy bitset of each section, keyed by CRN
+
+        for course in courses:
+            self.sections.setdefault(get_course_key(course), []).append(course)
+            self.occupancy[course['CRN']] = get_course_occupancy(course)
+
+    def _get_groups(self, key: str, open_only: bool, busy: int) -> list[tuple[int, list[dict]]]:
+        """An internal function that groups the sections of a Course by occupancy.
+
+        Args:
+            key (str): Course key.
+            open_only (bool): Whether or not to only keep sections with seats remaining.
+            busy (int): Occupancy bitset of times to keep free.
+
+        Returns:
+            list[tuple[int, list[dict]]]: Occupancy and sections of each group.
+        """
+        groups = {}
+        for course in self.sections.get(key, []):
+            occupancy = self.occupancy[course['CRN']]
+            if occupancy & busy or (open_only and not (course['Remaining'] or 0) > 0): continue
+            groups.setdefault(occupancy, []).append(course)
+
+        return list(groups.items())
+
+    def _search(self, groups: list[list[tuple[int, list[dict]]]], depth: int, used: int, chosen: list):
+        """An internal generator that places one group of each Course, depth first.
+
+        Args:
+            groups (list[list[tuple[int, list[dict]]]]): Groups of each Course, in the order they are placed.
+            depth (int): Number of Courses placed.
+            used (int): Occupancy bitset of the groups placed.
+            chosen (list): Groups placed. Updated in place.
+
+        Yields:
+            list[tuple[int, list[dict]]]: The groups of a schedule.
+        """
+        if depth == len(groups):
+            yield list(chosen)
+            return
+
+        for group in groups[depth]:
+            if group[0] & used: continue
+
+            # Forward check: every Course left to place must still have a group that fits.
+            new_used = used | group[0]
+            if not all([any([not occupancy & new_used for occupancy, _ in later]) for later in groups[depth + 1:]]): continue
+
+            chosen.append(group)
+            yield from self._search(groups, depth + 1, new_used, chosen)
+            chosen.pop()
+
+    def _iter_group_schedules(self, wanted: list[str], open_only: bool, busy: int):
+        """An internal generator of the schedules of groups. See build.
+
+        Yields:
+            list[list[dict]]: Sections of the group chosen for each desired Course, in the order of wanted.
+        """
+        groups = [self._get_groups(key, open_only, busy) for key in wanted]
+        order = sorted(range(len(wanted)), key=lambda i: len(groups[i]))
+
+        for chosen in self._search([groups[i] for i in order], 0, 0, []):
+            sections = [None] * len(wanted)
+            for i, (_, group) in zip(order, chosen): sections[i] = group
+            yield sections
+
+    def build(self, wanted: list[str], open_only: bool = False, busy: int = 0, limit: int = None):
+        """Enumerate the conflict-free schedules of a list of desired Courses.
+
+        Args:
+            wanted (list[str]): Keys of the desired Courses (i.e., ["MATH 150", "CSCI 150"]).
+            open_only (bool, optional): Whether or not to only use sections with seats remaining. Defaults to False.
+            busy (int, optional): Occupancy bitset of times to keep free (see get_occupancy). Defaults to 0.
+            limit (int, optional): Maximum number of schedules. Defaults to None (all).
+
+        Yields:
+            list[dict]: One section of each desired Course, in the order of wanted.
+        """
+        count = 0
+        for sections in self._iter_group_schedules(wanted, open_only, busy):
+            for schedule in product(*sections):
+                yield list(schedule)
+
+                count += 1
+                if limit is not None and count >= limit: return
+
+    def _count(self, groups: list[list[tuple[int, list[dict]]]], depth: int, used: int, future: list[int], memo: dict) -> int:
+        """An internal function that counts the schedules of the Courses left to place. Only the slots that a Course left to place can
+        occupy matter, so counts are memoized by depth and those slots of the groups placed.
+
+        Args:
+            groups (list[list[tuple[int, list[dict]]]]): Groups of each Course, in the order they are placed.
+            depth (int): Number of Courses placed.
+            used (int): Occupancy bitset of the groups placed.
+            future (list[int]): Slots any group of the Courses from each depth on can occupy.
+            memo (dict): Counts, keyed by depth and relevant slots. Updated in place.
+
+        Returns:
+            int: Number of schedules.
+        """
+        if depth == len(groups): return 1
+
+        key = (depth, used & future[depth])
+        if key not in memo: memo[key] = sum([len(sections) * self._count(groups, depth + 1, used | occupancy, future, memo) for occupancy, sections in groups[depth] if not occupancy & used])
+
+        return memo[key]
+
+    def count(self, wanted: list[str], open_only: bool = False, busy: int = 0) -> int:
+        """Count the conflict-free schedules of a list of desired Courses, without enumerating them. See build.
+
+        Args:
+            wanted (list[str]): Keys of the desired Courses.
+            open_only (bool, optional): Whether or not to only use sections with seats remaining. Defaults to False.
+            busy (int, optional): Occupancy bitset of times to keep free. Defaults to 0.
+
+        Returns:
+            int: Number of schedules.
+        """
+        groups = sorted([self._get_groups(key, open_only, busy) for key in wanted], key=len)
+
+        future = [0] * (len(groups) + 1)
+        for depth in range(len(groups) - 1, -1, -1):
+            future[depth] = future[depth + 1]
+            for occupancy, _ in groups[depth]: future[depth] |= occupancy
+
+        return self._count(groups, 0, 0, future, {})
+
+def main() -> None:
+    """Enumerate the conflict-free schedules of desired Courses, from an output of Parser.get_courses.
+    """
+    arg_parser = ArgumentParser(description='Enumerate the schedules (one section of each desired Course) whose meetings do not overlap.')
+    arg_parser.add_argument('courses', nargs='+', help='Desired Courses, as "<Abbreviation> <Level>" (i.e., "MATH 150").')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses. Defaults to ./Output.json.')
+    arg_parser.add_argument('--calendar', default=None, help='Calendar ID. Defaults to the first Calendar.')
+    arg_parser.add_argument('--open-only', action='store_true', help='Only use sections with seats remaining.')
+    arg_parser.add_argument('--limit', type=int, default=20, help='Maximum number of schedules to print. Defaults to 20.')
+    args = arg_parser.parse_args()
+
+    calendar = next(calendar for calendar in iter_calendars(args.input) if args.calendar in [None, calendar['Calendar ID']])
+    builder = ScheduleBuilder(calendar['Courses'])
+
+    print(f'{builder.count(args.courses, args.open_only)} schedules.')
+    for schedule in builder.build(args.courses, args.open_only, limit=args.limit): print(', '.join([f'{get_course_key(course)} ({course["CRN"]})' for course in schedule]))
+
+if __name__ == '__main__':
+    main()
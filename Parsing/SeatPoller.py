@@ -0,0 +1,323 @@
+from CourseParser import SEAT_FIELDS
+from Parser import Parser
+from Refresh import write_json
+from argparse import ArgumentParser
+from heapq import heappush, heappop
+from json import loads, dumps
+from threading import Lock
+from time import monotonic, time
+import asyncio
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# Bounds (in seconds) of the refresh interval of a Course. Courses whose registration availability never changes drift towards
+# MAX_INTERVAL, and Courses on the watchlist are refreshed at least every WATCH_INTERVAL.
+MIN_INTERVAL = 30
+MAX_INTERVAL = 30 * 60
+WATCH_INTERVAL = 60
+
+# Change (in seats, Remaining and Waitlisted combined) a Course is expected to have between two refreshes. Courses that change
+# faster are refreshed more often.
+TARGET_CHANGE = 1
+
+# Weight of the latest refresh in the moving average of the rate of change of a Course.
+RATE_WEIGHT = 0.3
+
+# Requests per second to a host, shared by every SeatPoller of the host, unless one is given.
+DEFAULT_BUDGET = 1
+
+# Budget of each host, keyed by host. See get_budget.
+BUDGETS = {}
+BUDGETS_LOCK = Lock()
+
+class RequestBudget:
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initialize a RequestBudget object, a token bucket that bounds the number of requests per second to a host, however many
+        SeatPoller objects (or threads) share it.
+
+        Args:
+            rate (float): Requests per second.
+            burst (int, optional): Requests that can be sent at once after being idle. Defaults to 1.
+        """
+        self.rate = rate
+        self.burst = burst
+
+        self.tokens = float(burst)
+        self.updated = monotonic()
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Reserve a request.
+
+        Returns:
+            float: Time to wait (in seconds) before sending it.
+        """
+        with self._lock:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            return max(0, -self.tokens / self.rate)
+
+    async def acquire(self) -> None:
+        """Wait until a request fits in the budget.
+        """
+        wait = self.reserve()
+        if wait > 0: await asyncio.sleep(wait)
+
+def get_budget(host: str, rate: float = DEFAULT_BUDGET) -> RequestBudget:
+    """Get the budget of a host, so every SeatPoller of the host (i.e., one per school on the same Banner instance) shares it.
+
+    Args:
+        host (str): Host (i.e., "Base Host" of a profile).
+        rate (float, optional): Requests per second, if the host has no budget yet. Defaults to DEFAULT_BUDGET.
+
+    Returns:
+        RequestBudget: Budget of the host.
+    """
+    with BUDGETS_LOCK:
+        if host not in BUDGETS: BUDGETS[host] = RequestBudget(rate)
+
+        return BUDGETS[host]
+
+class SeatPoller:
+    def __init__(self, parser: Parser, calendars: list[dict], watchlist: list[str] = None, budget: RequestBudget = None, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL, watch_interval: float = WATCH_INTERVAL) -> None:
+        """Initialize a SeatPoller object, which keeps the registration availability (Capacity, Registered, Remaining, Waitlisted)
+        of a list of Calendars fresh, one Detailed Information Section page at a time, instead of sweeping every Course at once.
+
+        Each Course has its own refresh interval. It shrinks when the Course changes quickly (a moving average of seats changed per
+        second), is never longer than the time since its last change, so a Course that just changed is refreshed again soon, and
+        grows back towards max_interval while it stays the same. Courses are refreshed in order of when they are due, and never
+        faster than the budget of the host allows, so hot Courses take requests from quiet ones instead of adding to them.
+
+        Args:
+            parser (Parser): Parser object of the school, whose RequestScheduler and page cache are used.
+            calendars (list[dict]): Calendar objects previously returned by get_courses. Their Courses are updated in place.
+            watchlist (list[str], optional): CRNs of Courses to refresh at least every watch_interval. Defaults to None.
+            budget (RequestBudget, optional): Budget of the host. Defaults to the budget shared by every SeatPoller of the host.
+            min_interval (float, optional): Shortest refresh interval (in seconds). Defaults to MIN_INTERVAL.
+            max_interval (float, optional): Longest refresh interval (in seconds). Defaults to MAX_INTERVAL.
+            watch_interval (float, optional): Longest refresh interval (in seconds) of Courses on the watchlist. Defaults to WATCH_INTERVAL.
+        """
+        self.parser = parser
+        self.watchlist = set(watchlist or [])
+        self.budget = budget or get_budget(parser.profile['Base Host'])
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.watch_interval = watch_interval
+
+        # Counters
+        self.polls = 0
+        self.changes = 0
+        self.failures = 0
+
+        # State of each Course, keyed by Calendar ID and CRN.
+        self.states = {}
+        self._queue = [] # (Due, Calendar ID, CRN) of each Course, as a heap. Entries whose Due is outdated are skipped.
+
+        now = monotonic()
+        courses = [(calendar['Calendar ID'], course) for calendar in calendars for course in calendar['Courses']]
+        for i, (calendar_id, course) in enumerate(courses):
+            key = (calendar_id, course['CRN'])
+            self.states[key] = {'Course': course, 'Interval': self.max_interval, 'Rate': 0, 'Polled': None, 'Changed': None, 'Due': None}
+
+            # Nothing is known about how fast Courses change yet, so the first refreshes are spread evenly over max_interval.
+            self._schedule(key, now if course['CRN'] in self.watchlist else now + self.max_interval * i / len(courses))
+
+    def _schedule(self, key: tuple[str, str], due: float) -> None:
+        """An internal function that sets when a Course is due.
+        """
+        self.states[key]['Due'] = due
+        heappush(self._queue, (due, *key))
+
+    def _get_interval(self, state: dict, now: float) -> float:
+        """An internal function that determines the refresh interval of a Course. See __init__.
+
+        Args:
+            state (dict): State of the Course.
+            now (float): Current time (monotonic).
+
+        Returns:
+            float: Refresh interval (in seconds).
+        """
+        interval = TARGET_CHANGE / state['Rate'] if state['Rate'] > 0 else self.max_interval
+        if state['Changed'] is not None: interval = min(interval, now - state['Changed'])
+        if state['Course']['CRN'] in self.watchlist: interval = min(interval, self.watch_interval)
+
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def watch(self, crns: list[str]) -> None:
+        """Add Courses to the watchlist. They are due at once, unless they are being refreshed.
+
+        Args:
+            crns (list[str]): CRNs of the Courses.
+        """
+        self.watchlist.update(crns)
+
+        now = monotonic()
+        for key in self.states:
+            if key[1] in crns and self.states[key]['Due'] is not None: self._schedule(key, now)
+
+    def unwatch(self, crns: list[str]) -> None:
+        """Remove Courses from the watchlist. Their refresh interval grows back as usual.
+
+        Args:
+            crns (list[str]): CRNs of the Courses.
+        """
+        self.watchlist.difference_update(crns)
+
+    def _update(self, key: tuple[str, str], seats: dict, now: float) -> dict:
+        """An internal function that applies the registration availability of a Course, and reschedules it.
+
+        Args:
+            key (tuple[str, str]): Calendar ID and CRN of the Course.
+            seats (dict): Registration availability of the Course, or None if its page could not be loaded.
+            now (float): Time of the refresh (monotonic).
+
+        Returns:
+            dict: Change of the Course, as {'Calendar ID', 'CRN', 'Time', 'Changes'} (see Parser.refresh_seats), or None.
+        """
+        state, change = self.states[key], None
+        self.polls += 1
+
+        if seats is None:
+            # Back off from a Course whose page fails, so it does not take the budget of the others.
+            self.failures += 1
+            state['Interval'] = min(self.max_interval, state['Interval'] * 2)
+            self._schedule(key, now + state['Interval'])
+            return None
+
+        course = state['Course']
+        changes = {field: [course[field], seats[field]] for field in SEAT_FIELDS if course[field] != seats[field]}
+        delta = sum([abs(course[field] - seats[field]) for field in ['Remaining', 'Waitlisted']])
+
+        if state['Polled'] is not None:
+            rate = delta / max(now - state['Polled'], 1e-3)
+            state['Rate'] = RATE_WEIGHT * rate + (1 - RATE_WEIGHT) * state['Rate']
+        state['Polled'] = now
+
+        if changes:
+            course.update(seats)
+            state['Changed'] = now
+            self.changes += 1
+            change = {'Calendar ID': key[0], 'CRN': key[1], 'Time': time(), 'Changes': changes}
+
+        state['Interval'] = self._get_interval(state, now)
+        self._schedule(key, now + state['Interval'])
+        return change
+
+    async def _poll(self, async_session, key: tuple[str, str], on_change, delta: list) -> None:
+        """An internal async function that refreshes the registration availability of a Course.
+
+        Args:
+            async_session (AsyncClient): Async session.
+            key (tuple[str, str]): Calendar ID and CRN of the Course.
+            on_change (callable): Called with each change. See poll.
+            delta (list): Changes. Updated in place.
+        """
+        seats = await self.parser.get_seats(async_session, key[0], key[1])
+
+        try:
+            change = self._update(key, seats, monotonic())
+            if change is None: return
+
+            delta.append(change)
+            if on_change is not None: on_change(change)
+        except Exception as e: LOGGER.exception(f'Type: {type(e)} | Error: {e}')
+
+    async def poll(self, duration: float = None, on_change=None) -> list[dict]:
+        """Refresh Courses as they become due, until duration runs out.
+
+        Args:
+            duration (float, optional): How long to poll (in seconds). Defaults to None (forever).
+            on_change (callable, optional): Called with each change as soon as it is seen (see _update). Defaults to None.
+
+        Returns:
+            list[dict]: Every change seen, in order.
+        """
+        delta, tasks = [], set()
+        stop = None if duration is None else monotonic() + duration
+
+        async with self.parser._get_async_session() as async_session:
+            while stop is None or monotonic() < stop:
+                # Entries whose Due is outdated (the Course was rescheduled) are dropped.
+                while self._queue and self.states[self._queue[0][1:]]['Due'] != self._queue[0][0]: heappop(self._queue)
+
+                wait = self._queue[0][0] - monotonic() if self._queue else None
+                if wait is None or wait > 0:
+                    # Courses in flight are rescheduled once refreshed, so wait for the next due Course, the first refresh to finish,
+                    # or the stop, whichever comes first.
+                    timeout = min([t for t in [wait, None if stop is None else stop - monotonic()] if t is not None], default=None)
+                    if tasks: await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    elif timeout is not None: await asyncio.sleep(timeout)
+                    else: break # Nothing is due or in flight, so nothing ever will be.
+                    continue
+
+                _, calendar_id, crn = heappop(self._queue)
+                key = (calendar_id, crn)
+                self.states[key]['Due'] = None # In flight, rescheduled once refreshed.
+                await self.budget.acquire()
+
+                task = asyncio.create_task(self._poll(async_session, key, on_change, delta))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks: await asyncio.gather(*tasks)
+
+        if self.parser.cache: self.parser.cache.flush()
+        if self.parser.archive: self.parser.archive.flush()
+        return delta
+
+    def run(self, duration: float = None, on_change=None) -> list[dict]:
+        """Refresh Courses as they become due, until duration runs out. See poll.
+        """
+        return asyncio.run(self.poll(duration, on_change))
+
+    def stats(self) -> dict:
+        """Get the counters of the poller.
+
+        Returns:
+            dict: Number of refreshes, changes seen and failed refreshes, and the number of Courses on each refresh interval (in
+            seconds, rounded).
+        """
+        intervals = {}
+        for state in self.states.values():
+            interval = round(state['Interval'])
+            intervals[interval] = intervals.get(interval, 0) + 1
+
+        return {'Polls': self.polls, 'Changes': self.changes, 'Failures': self.failures, 'Intervals': dict(sorted(intervals.items()))}
+
+def main() -> None:
+    """Keep the registration availability of an output of Parser.get_courses fresh, and write each change as it is seen.
+    """
+    arg_parser = ArgumentParser(description='Keep the registration availability of the Courses in an output of Parser.get_courses fresh, refreshing the Courses that change the most the most often.')
+    arg_parser.add_argument('school', help='School of the profile to use, from profiles.json.')
+    arg_parser.add_argument('--input', default='./Output.json', help='Output of Parser.get_courses. Defaults to ./Output.json.')
+    arg_parser.add_argument('--output', default=None, help='Where to write the updated output. Defaults to the input.')
+    arg_parser.add_argument('--changes', default='./Changes.ndjson', help='Where to append each change, as a line of JSON. Defaults to ./Changes.ndjson.')
+    arg_parser.add_argument('--watch', nargs='+', default=[], help=f'CRNs of Courses to refresh at least every {WATCH_INTERVAL} seconds.')
+    arg_parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help=f'Requests per second to the host. Defaults to {DEFAULT_BUDGET}.')
+    arg_parser.add_argument('--duration', type=float, default=None, help='How long to poll (in seconds). Defaults to forever.')
+    args = arg_parser.parse_args()
+
+    with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
+    profile = next(profile for profile in profiles if profile['School'] == args.school)
+
+    with open(args.input, 'r', encoding='UTF-8') as f: calendars = loads(f.read())
+
+    poller = SeatPoller(Parser(profile), calendars, args.watch, get_budget(profile['Base Host'], args.budget))
+    with open(args.changes, 'a', encoding='UTF-8') as f:
+        def on_change(change: dict) -> None:
+            f.write(dumps(change) + '\n')
+            f.flush()
+
+        try: poller.run(args.duration, on_change)
+        except KeyboardInterrupt: pass
+
+    write_json(args.output or args.input, calendars)
+    print(dumps(poller.stats(), indent=4))
+
+if __name__ == '__main__':
+    main()
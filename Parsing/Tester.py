@@ -1,21 +1,24 @@
 from json import loads, dumps
+from ParseBatcher import get_parse_pool
 from Parser import Parser
 
-# Load and select first profile.
-with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
-profile = profiles[2]
+# The parse pool may import this script again in each of its processes, so it only runs as the main script.
+if __name__ == '__main__':
+    # Load and select first profile.
+    with open('./profiles.json', 'r', encoding='UTF-8') as f: profiles = loads(f.read())
+    profile = profiles[2]
 
-# Initialize Parser object.
-parser = Parser(profile)
+    # Initialize Parser object. Pages are parsed on a process pool of one process per CPU, so parsing does not block the requests.
+    parser = Parser(profile, executor=get_parse_pool())
 
-# Get list of Calendar objects.
-calendars = parser.get_calendars(all_calendars=True)
+    # Get list of Calendar objects.
+    calendars = parser.get_calendars(all_calendars=True)
 
-# Select Calendar(s) that match a specific name.
-calendars = [calendar for calendar in calendars if calendar['Calendar Name'] == 'Fall 2024']
+    # Select Calendar(s) that match a specific name.
+    calendars = [calendar for calendar in calendars if calendar['Calendar Name'] == 'Fall 2024']
 
-# Get Courses.
-courses = parser.get_courses(calendars) # Expects a list of Calendar objects.
+    # Get Courses.
+    courses = parser.get_courses(calendars) # Expects a list of Calendar objects.
 
-# Output as JSON.
-with open('./Output.json', 'w', encoding='UTF-8') as f: f.write(dumps(courses, indent=4))
\ No newline at end of file
+    # Output as JSON.
+    with open('./Output.json', 'w', encoding='UTF-8') as f: f.write(dumps(courses, indent=4))
@@ -0,0 +1,72 @@
+from tempfile import mkdtemp
+import shutil
+import json
+import sys
+import os
+import pytest
+
+# Modules of Parsing import each other by name, as when they are run from its directory.
+PARSING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PARSING_DIR)
+
+# Logs of the tests are kept out of the tree. Modules only configure logging if it is not configured yet.
+from LogConfig import configure_logging
+configure_logging(os.path.join(mkdtemp(), 'Logs.log'))
+
+# Saved pages that tests parse.
+FIXTURES_DIR = os.path.join(PARSING_DIR, 'tests', 'fixtures')
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A temporary working directory with a copy of mappings.json, as a Parser reads and writes its mappings in the working directory.
+    """
+    shutil.copy(os.path.join(PARSING_DIR, 'mappings.json'), tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
+
+@pytest.fixture
+def site():
+    """A small synthetic school, with a single Calendar.
+    """
+    from FakeBanner import SyntheticSite
+    return SyntheticSite(courses=60, terms=1)
+
+@pytest.fixture
+def server(site):
+    """A FakeBanner server of the synthetic school.
+    """
+    from FakeBanner import FakeBanner
+    with FakeBanner(site) as server: yield server
+
+@pytest.fixture
+def parse():
+    """A function that parses every Course of every Calendar of a profile with a new Parser, whose keyword arguments (i.e., cache)
+    it is given.
+    """
+    from Parser import Parser
+
+    def parse(profile: dict, **kwargs) -> list[dict]:
+        parser = Parser(profile, **kwargs)
+        return parser.get_courses(parser.get_calendars())
+
+    return parse
+
+@pytest.fixture
+def calendars(workdir, server, parse) -> list[dict]:
+    """Calendar objects of the synthetic school, as returned by Parser.get_courses.
+    """
+    return parse(server.profile())
+
+@pytest.fixture
+def strip_encoding():
+    """A function that returns a copy of Calendar objects as written before meetings were encoded (without Start, End and Day Mask).
+    """
+    def strip_encoding(calendars: list[dict]) -> list[dict]:
+        calendars = json.loads(json.dumps(calendars))
+        for meeting in [meeting for calendar in calendars for course in calendar['Courses'] for meeting in course['Properties']]:
+            for key in ['Start', 'End', 'Day Mask']: del meeting[key]
+
+        return calendars
+
+    return strip_encoding
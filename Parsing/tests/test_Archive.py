@@ -0,0 +1,36 @@
+from Archive import Archive
+from PageCache import PageCache
+import json
+import pytest
+
+def _get_courses(calendars: list[dict]) -> str:
+    """Courses of Calendar objects as JSON. The Processing Time of two runs differs.
+    """
+    return json.dumps([calendar['Courses'] for calendar in calendars])
+
+@pytest.mark.parametrize('stream_listing', [False, True])
+def test_replay_matches_recording(workdir, server, parse, stream_listing):
+    archive = Archive('./Archive.sqlite')
+    recorded = parse(server.profile(), archive=archive, stream_listing=stream_listing)
+    archive.close()
+
+    requests = server.stats()['Requests']
+    replayed = parse(server.profile(), archive=Archive('./Archive.sqlite', replay=True), stream_listing=stream_listing)
+
+    assert recorded[0]['Courses'] and _get_courses(replayed) == _get_courses(recorded)
+    assert server.stats()['Requests'] == requests # Nothing is requested while replaying.
+
+@pytest.mark.parametrize('stream_listing', [False, True])
+def test_recording_with_a_warm_cache(workdir, server, parse, stream_listing):
+    cache = PageCache('./Cache.sqlite')
+    expected = parse(server.profile(), cache=cache, stream_listing=stream_listing)
+
+    # Pages taken from the cache were never requested, but still have to be recorded.
+    archive = Archive('./Archive.sqlite')
+    assert _get_courses(parse(server.profile(), cache=cache, archive=archive, stream_listing=stream_listing)) == _get_courses(expected)
+    assert cache.hits
+    archive.close()
+
+    replay = Archive('./Archive.sqlite', replay=True)
+    assert _get_courses(parse(server.profile(), archive=replay, stream_listing=stream_listing)) == _get_courses(expected)
+    assert replay.misses == 0
@@ -0,0 +1,16 @@
+from Batch import Batch
+from FakeBanner import FakeBanner, SyntheticSite
+from contextlib import ExitStack
+
+def test_metrics_of_every_job_are_merged(workdir):
+    with ExitStack() as stack:
+        servers = [stack.enter_context(FakeBanner(SyntheticSite(courses=20, terms=2, seed=seed))) for seed in range(2)]
+        profiles = [server.profile(school=f'Fake University {i}') for i, server in enumerate(servers)]
+        batch = Batch(profiles, all_calendars=True, workers=1, prometheus_file='./course_parser.prom')
+        results = batch.run()
+
+    labels = {(school, calendar['Calendar Name']) for school, calendars in results.items() for calendar in calendars}
+    assert len(labels) == 4 and {(report['Labels']['School'], report['Labels']['Calendar']) for report in batch.reports} == labels
+
+    with open('./course_parser.prom', 'r', encoding='UTF-8') as f: text = f.read()
+    for school, calendar in labels: assert f'course_parser_courses{{school="{school}",calendar="{calendar}"}} 20' in text
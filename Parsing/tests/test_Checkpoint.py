@@ -0,0 +1,105 @@
+from Checkpoint import Checkpoint
+from FakeBanner import FakeBanner, SyntheticSite
+from Parser import Parser
+import json
+
+DETAIL = 'bwckschd.p_disp_detail_sched'
+LISTING = 'bwckschd.p_get_crse_unsec'
+
+class BrokenSite(SyntheticSite):
+    """A synthetic school whose Detailed Information Section pages of some Courses cannot be found.
+    """
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.broken = set()
+
+    def route(self, method: str, path: str, body: bytes) -> str:
+        if DETAIL in path and any(f'crn_in={crn}' in path for crn in self.broken): return None
+        return super().route(method, path, body)
+
+class KilledCheckpoint(Checkpoint):
+    """A checkpoint whose Calendars are never finished, as if the process had been killed before.
+    """
+    def finish(self, school: str, calendar_id: str) -> None:
+        self.flush()
+
+def get_expected() -> list[dict]:
+    with FakeBanner(SyntheticSite(courses=60, terms=1)) as server:
+        parser = Parser(server.profile())
+        return parser.get_courses(parser.get_calendars())
+
+def test_resume_only_requests_missing_items(workdir, parse):
+    expected = get_expected()
+    site = BrokenSite(courses=60, terms=1)
+    term = site.terms[0][0]
+    site.broken = set(list(site.sections[term])[:5])
+
+    with FakeBanner(site) as server:
+        profile = server.profile()
+        checkpoint = KilledCheckpoint('./Checkpoint.sqlite')
+        parse(profile, checkpoint=checkpoint)
+
+        assert {failure['Key'] for failure in checkpoint.failures(profile['School'], term)} == site.broken
+        checkpoint.close()
+
+        # The run is resumed by another Parser.
+        before, broken, site.broken = server.stats()['Requests'], site.broken, set()
+        checkpoint = Checkpoint('./Checkpoint.sqlite')
+        resumed = parse(profile, checkpoint=checkpoint)
+        after = server.stats()['Requests']
+
+    assert json.dumps(resumed[0]['Courses']) == json.dumps(expected[0]['Courses'])
+    assert after[LISTING] == before[LISTING]
+    assert after[DETAIL] - before[DETAIL] == len(broken)
+
+    # A Calendar with its Courses drops its listing, so the next run loads it again.
+    assert checkpoint.get_listing(profile['School'], term) is None
+    assert checkpoint.failures(profile['School']) == []
+
+def test_retry_failures_only_requests_failed_items(workdir):
+    expected = get_expected()
+    site = BrokenSite(courses=60, terms=1)
+    term = site.terms[0][0]
+    site.broken = set(list(site.sections[term])[:5])
+
+    with FakeBanner(site) as server:
+        checkpoint = Checkpoint('./Checkpoint.sqlite')
+        parser = Parser(server.profile(), checkpoint=checkpoint)
+        calendars = parser.get_courses(parser.get_calendars())
+
+        # Failed items are unknown, not zero, and only their failures are kept.
+        failed = [course for course in calendars[0]['Courses'] if course['CRN'] in site.broken]
+        assert len(failed) == len(site.broken)
+        assert all([course['Capacity'] is None and course['Remaining'] is None for course in failed])
+        assert checkpoint.get_listing(parser.profile['School'], term) is None
+        assert len(checkpoint.failures(parser.profile['School'], term)) == len(site.broken)
+
+        # The first retry fails again, and counts another attempt.
+        assert [failure['Attempts'] for failure in parser.retry_failures(calendars)] == [2] * len(site.broken)
+
+        before, broken, site.broken = server.stats()['Requests'], site.broken, set()
+        assert parser.retry_failures(calendars) == []
+        after = server.stats()['Requests']
+
+    assert json.dumps(calendars[0]['Courses']) == json.dumps(expected[0]['Courses'])
+    assert after[LISTING] == before[LISTING]
+    assert after[DETAIL] - before[DETAIL] == len(broken)
+
+def test_expired_listing_is_not_resumed(workdir, parse):
+    site = BrokenSite(courses=60, terms=1)
+    term = site.terms[0][0]
+    site.broken = set(list(site.sections[term])[:5])
+
+    with FakeBanner(site) as server:
+        profile = server.profile()
+        checkpoint = KilledCheckpoint('./Checkpoint.sqlite', listing_ttl=0)
+        parse(profile, checkpoint=checkpoint)
+
+        before, site.broken = server.stats()['Requests'], set()
+        parse(profile, checkpoint=checkpoint)
+        after = server.stats()['Requests']
+
+    # The listing is loaded again and every item is requested again, and the failures of the expired listing are dropped.
+    assert after[LISTING] - before[LISTING] == 1
+    assert after[DETAIL] - before[DETAIL] == 60
+    assert checkpoint.failures(profile['School']) == []
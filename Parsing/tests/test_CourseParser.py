@@ -0,0 +1,25 @@
+from CourseParser import CourseParser, parse_extra_course_infos
+from conftest import FIXTURES_DIR
+import json
+import os
+import pytest
+
+# Output of each Detailed Information Section page before and after _format_field was shared by both extractors. Before, a page
+# that failed to parse left its Course with no seats and no Extra information.
+with open(os.path.join(FIXTURES_DIR, 'extra_course_info.json'), 'r', encoding='UTF-8') as f: EXPECTED = json.loads(f.read())
+
+def _read(page: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, page), 'r', encoding='UTF-8') as f: return f.read()
+
+@pytest.mark.parametrize('page', EXPECTED)
+def test_extra_course_info(page):
+    assert parse_extra_course_infos([_read(page)]) == [EXPECTED[page]['After']]
+    assert CourseParser({}).parse_extra_course_info(_read(page)) == EXPECTED[page]['After']['Extra']
+
+@pytest.mark.parametrize('page', [page for page, expected in EXPECTED.items() if expected['Before']['Capacity']])
+def test_pages_that_parsed_before_are_unchanged(page):
+    assert EXPECTED[page]['After'] == EXPECTED[page]['Before']
+
+def test_pages_that_failed_before_keep_their_fields():
+    assert EXPECTED['detail_mutual_exclusion.html']['After']['Extra']['Mutual Exclusions'] == ['MATH 150', 'MATH 155']
+    assert EXPECTED['detail_restrictions_without_heading.html']['After']['Extra']['Restrictions'] == []
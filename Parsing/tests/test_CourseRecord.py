@@ -0,0 +1,26 @@
+from CourseRecord import Course, encode_record, to_dicts
+import CourseRecord
+import pickle
+import json
+
+def test_records_convert_back_to_the_same_courses(calendars):
+    courses = calendars[0]['Courses']
+    records = [Course.from_dict(course) for course in courses]
+
+    assert [record.to_dict() for record in records] == courses
+    assert json.dumps(records, default=encode_record) == json.dumps(courses)
+    assert pickle.loads(pickle.dumps(records)) == records
+
+def test_compact_courses_match_dicts(calendars, server, parse):
+    compact = parse(server.profile(), compact_courses=True)
+
+    assert all([isinstance(course, Course) for course in compact[0]['Courses']])
+    assert json.dumps([calendar['Courses'] for calendar in to_dicts(compact)]) == json.dumps([calendar['Courses'] for calendar in calendars])
+
+def test_shared_tuples_are_bounded(calendars, monkeypatch):
+    monkeypatch.setattr(CourseRecord, '_TUPLES', {})
+    monkeypatch.setattr(CourseRecord, 'MAX_TUPLES', 4)
+    records = [Course.from_dict(course) for course in calendars[0]['Courses']]
+
+    assert len(CourseRecord._TUPLES) <= 4
+    assert [record.to_dict() for record in records] == calendars[0]['Courses']
@@ -0,0 +1,39 @@
+from CourseStore import CourseStore
+import json
+
+SCHOOL = 'Fake University'
+
+def test_round_trip(calendars):
+    store = CourseStore('./Courses.sqlite')
+    for calendar in calendars: store.write_calendar(SCHOOL, calendar)
+
+    assert json.dumps(store.get_calendars(SCHOOL)) == json.dumps(calendars)
+
+def test_write_again_only_updates_changes(calendars):
+    store = CourseStore('./Courses.sqlite')
+    calendar = calendars[0]
+    assert store.write_calendar(SCHOOL, calendar)['Inserted'] == len(calendar['Courses'])
+
+    changed = json.loads(json.dumps(calendar))
+    changed['Courses'][0]['Registered'] += 1
+    changed['Courses'][1]['Properties'][0]['Location'] = 'Hall 101'
+    del changed['Courses'][2]
+
+    counts = store.write_calendar(SCHOOL, changed)
+    assert counts == {'Inserted': 0, 'Updated': 2, 'Unchanged': len(calendar['Courses']) - 3, 'Deleted': 1}
+    assert json.dumps(store.get_calendars(SCHOOL)) == json.dumps([changed])
+
+def test_find_courses(calendars):
+    store = CourseStore('./Courses.sqlite')
+    store.write_calendar(SCHOOL, calendars[0])
+
+    abbreviation = calendars[0]['Courses'][0]['Abbreviation']
+    expected = [course for course in calendars[0]['Courses'] if course['Abbreviation'] == abbreviation and course['Remaining'] > 0]
+    assert expected and json.dumps(store.find_courses(SCHOOL, abbreviation=abbreviation, open_seats=True)) == json.dumps(expected)
+
+def test_find_courses_of_older_outputs(calendars, strip_encoding):
+    store = CourseStore('./Courses.sqlite')
+    store.write_calendar(SCHOOL, strip_encoding(calendars)[0])
+
+    expected = [course for course in calendars[0]['Courses'] if any(['Monday' in meeting['Days'] for meeting in course['Properties']])]
+    assert expected and json.dumps(store.find_courses(SCHOOL, day='Monday')) == json.dumps(expected)
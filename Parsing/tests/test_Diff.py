@@ -0,0 +1,37 @@
+from Diff import ADDED, CHANGED, REMOVED, apply_changes, diff_snapshots, summarize, read_changes, write_changes
+import json
+
+def _copy(calendars: list[dict]) -> list[dict]:
+    return json.loads(json.dumps(calendars))
+
+def test_identical_snapshots(calendars):
+    assert list(diff_snapshots(calendars, _copy(calendars))) == []
+
+def test_changes_round_trip(calendars):
+    old, new = _copy(calendars), _copy(calendars)
+    courses = new[0]['Courses']
+    courses[0]['Remaining'] -= 1
+    courses[1]['Properties'][0]['Location'] = 'Hall 101'
+    removed = courses.pop(2)
+    courses.append(dict(removed, CRN='99999'))
+
+    changes = list(diff_snapshots(old, new))
+    assert summarize(changes) == {ADDED: 1, REMOVED: 1, CHANGED: 2, 'Fields': {'Remaining': 1, 'Properties.Location': 1}}
+    assert {'Properties.0.Location': [calendars[0]['Courses'][1]['Properties'][0]['Location'], 'Hall 101']} in [change.get('Changes') for change in changes]
+
+    # Order of Courses is not part of a snapshot.
+    key = lambda course: course['CRN']
+    patched = apply_changes(old, changes)
+    assert sorted(patched[0]['Courses'], key=key) == sorted(new[0]['Courses'], key=key)
+
+def test_change_log_round_trip(calendars):
+    new = _copy(calendars)
+    new[0]['Courses'][0]['Waitlisted'] += 1
+
+    changes = list(diff_snapshots(calendars, new))
+    assert write_changes('./Changes.ndjson', changes) == summarize(changes)
+    assert list(read_changes('./Changes.ndjson')) == changes
+
+def test_older_snapshot(calendars, strip_encoding):
+    assert list(diff_snapshots(strip_encoding(calendars), _copy(calendars))) == []
+    assert list(diff_snapshots(_copy(calendars), strip_encoding(calendars))) == []
@@ -0,0 +1,39 @@
+from ListingParser import ListingTokenizer, listing_rows
+from CourseParser import CourseParser
+from conftest import FIXTURES_DIR
+import json
+import os
+import pytest
+
+def _get_fields(row) -> tuple:
+    return row.header_class, row.href, row.text, row.cells, [_get_fields(nested) for nested in row.rows]
+
+def _feed(page: str, chunk_size: int) -> list:
+    tokenizer, rows = ListingTokenizer(), []
+    for i in range(0, len(page), chunk_size):
+        tokenizer.feed(page[i:i + chunk_size])
+        rows += tokenizer.rows()
+    tokenizer.close()
+
+    return rows + tokenizer.rows()
+
+@pytest.fixture
+def page() -> str:
+    """A Class Schedule Listing page, with TBA meetings and instructors with links.
+    """
+    with open(os.path.join(FIXTURES_DIR, 'listing.html'), 'r', encoding='UTF-8') as f: return f.read()
+
+def test_rows_match_bs4(page):
+    assert [_get_fields(row) for row in listing_rows(page, 'stream')] == [_get_fields(row) for row in listing_rows(page, 'html.parser')]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_rows_match_bs4_when_fed_in_chunks(page, chunk_size):
+    assert [_get_fields(row) for row in _feed(page, chunk_size)] == [_get_fields(row) for row in listing_rows(page, 'html.parser')]
+
+def test_courses_match_bs4(page):
+    mappings = {'MATH': 'Mathematics'}
+    stream, soup = CourseParser(dict(mappings)), CourseParser(dict(mappings))
+
+    courses = stream.parse_courses(listing_rows(page, 'stream'))
+    assert courses and json.dumps(courses) == json.dumps(soup.parse_courses(listing_rows(page, 'html.parser')))
+    assert stream.desc_paths == soup.desc_paths and stream.extra_course_info_paths == soup.extra_course_info_paths
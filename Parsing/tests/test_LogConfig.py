@@ -0,0 +1,50 @@
+from LogConfig import ErrorAggregator
+import logging
+import io
+import sys
+
+def _get_record(endpoint: str) -> logging.LogRecord:
+    try: raise KeyError('CRN')
+    except KeyError: exc_info = sys.exc_info()
+
+    record = logging.LogRecord('Parser', logging.ERROR, 'Parser.py', 1, 'Error: %s', ('CRN',), exc_info)
+    record.endpoint = endpoint
+    return record
+
+def test_errors_are_rate_limited_by_type_and_endpoint():
+    aggregator = ErrorAggregator(rate_limit=2, window=60)
+
+    assert [aggregator.filter(_get_record('Catalog Entry')) for _ in range(5)] == [True, True, False, False, False]
+    assert aggregator.filter(_get_record('Detailed Information Section'))
+    assert aggregator.counts() == {'KeyError | Catalog Entry': 5, 'KeyError | Detailed Information Section': 1}
+
+def test_first_error_of_a_new_window_counts_the_suppressed_ones():
+    aggregator = ErrorAggregator(rate_limit=1, window=0)
+    aggregator.filter(_get_record('Catalog Entry'))
+    aggregator.window = 60
+    for _ in range(3): aggregator.filter(_get_record('Catalog Entry'))
+
+    aggregator.window = 0
+    record = _get_record('Catalog Entry')
+    assert aggregator.filter(record) and '3 similar errors were suppressed' in record.getMessage()
+
+def test_other_records_are_always_logged():
+    aggregator = ErrorAggregator(rate_limit=0)
+    assert aggregator.filter(logging.LogRecord('Parser', logging.WARNING, 'Parser.py', 1, 'Retrying', None, None))
+
+def test_parser_errors_are_counted_by_endpoint(workdir, server, parse, monkeypatch):
+    from Parser import Parser
+
+    async def broken_arequest(self, async_session, method, path, **kwargs):
+        raise KeyError(path)
+
+    monkeypatch.setattr(Parser, '_arequest', broken_arequest)
+    aggregator = ErrorAggregator(rate_limit=1)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.addFilter(aggregator)
+    logging.getLogger('Parser').addHandler(handler)
+    try: parse(server.profile())
+    finally: logging.getLogger('Parser').removeHandler(handler)
+
+    # Errors of every Course are counted under the endpoint of their page, not one endpoint per path.
+    assert aggregator.counts() == {'KeyError | Catalog Entry': 40, 'KeyError | Detailed Information Section': 60}
@@ -0,0 +1,31 @@
+from MappingStore import MappingStore
+import json
+import os
+
+def test_readable_copy_is_written_on_export_not_on_add(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = MappingStore('./mappings.sqlite', './mappings.json')
+    for i in range(3): store.add('Fake University', {f'SUB{i}': f'Subject {i}'})
+
+    assert not os.path.exists('./mappings.json')
+
+    store.export_json()
+    with open('./mappings.json', 'r', encoding='UTF-8') as f: assert json.load(f) == {'Fake University': {f'SUB{i}': f'Subject {i}' for i in range(3)}}
+
+    # Nothing was added since, so the copy is not written again.
+    modified = os.path.getmtime('./mappings.json')
+    store.add('Fake University', {'SUB0': 'Another Subject'})
+    store.export_json()
+    assert os.path.getmtime('./mappings.json') == modified
+
+    store.add('Other University', {'MATH': 'Mathematics'})
+    store.close()
+    with open('./mappings.json', 'r', encoding='UTF-8') as f: assert json.load(f)['Other University'] == {'MATH': 'Mathematics'}
+
+def test_mappings_edited_by_hand_are_imported(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open('./mappings.json', 'w', encoding='UTF-8') as f: json.dump({'Fake University': {'MATH': 'Mathematics'}}, f)
+
+    store = MappingStore('./mappings.sqlite', './mappings.json')
+    assert store.get('Fake University') == {'MATH': 'Mathematics'}
+    store.close()
@@ -0,0 +1,32 @@
+from Metrics import Metrics, prometheus_text
+from time import sleep
+import json
+import asyncio
+
+def test_overlapping_blocks_are_timed_as_their_union():
+    metrics = Metrics()
+
+    async def block() -> None:
+        with metrics.stage('Detail Fetch'): await asyncio.sleep(0.05)
+
+    async def run() -> None: await asyncio.gather(*[block() for _ in range(10)])
+    asyncio.run(run())
+
+    stage = metrics.report()['Stages']['Detail Fetch']
+    assert stage['Count'] == 10 and 0.05 <= stage['Wall'] < 0.25
+
+def test_blocks_measured_in_parts_are_counted_once():
+    metrics = Metrics()
+    for count in [False, False, True]:
+        metrics.start_stage('Listing Download')
+        sleep(0.01)
+        metrics.stop_stage('Listing Download', count)
+
+    assert metrics.report()['Stages']['Listing Download']['Count'] == 1
+
+def test_requests_by_endpoint(workdir, server, parse):
+    parse(server.profile(), report_file='./Report.ndjson')
+    with open('./Report.ndjson', 'r', encoding='UTF-8') as f: reports = [json.loads(line) for line in f]
+
+    assert reports[0]['Endpoints']['Detailed Information Section']['Requests'] == server.stats()['Requests']['bwckschd.p_disp_detail_sched']
+    assert '# TYPE course_parser_requests_total counter' in prometheus_text(reports)
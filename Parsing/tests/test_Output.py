@@ -0,0 +1,29 @@
+from Output import NDJSONWriter, read_columnar, read_ndjson, iter_columns, write_columnar, write_ndjson
+from CourseRecord import Course
+import json
+import pytest
+
+@pytest.mark.parametrize('filename, write, read', [('Output.ndjson', write_ndjson, read_ndjson), ('Output.cols', write_columnar, read_columnar)])
+def test_round_trip(calendars, filename, write, read):
+    write(filename, calendars)
+    assert json.dumps(list(read(filename))) == json.dumps(calendars)
+
+@pytest.mark.parametrize('filename, write, read', [('Output.ndjson', write_ndjson, read_ndjson), ('Output.cols', write_columnar, read_columnar)])
+def test_round_trip_of_compact_records(calendars, filename, write, read):
+    write(filename, [calendar | {'Courses': [Course.from_dict(course) for course in calendar['Courses']]} for calendar in calendars])
+    assert json.dumps(list(read(filename))) == json.dumps(calendars)
+
+def test_only_requested_columns_are_read(calendars):
+    write_columnar('Output.cols', calendars)
+    (calendar, columns), = iter_columns('Output.cols', ['Subject'])
+
+    assert calendar['Calendar Name'] == calendars[0]['Calendar Name']
+    assert columns == {'Subject': [course['Subject'] for course in calendars[0]['Courses']]}
+
+def test_parser_writes_each_calendar(workdir, server, parse):
+    with NDJSONWriter('Output.ndjson') as writer: calendars = parse(server.profile(), output=writer)
+    assert json.dumps([calendar['Courses'] for calendar in read_ndjson('Output.ndjson')]) == json.dumps([calendar['Courses'] for calendar in calendars])
+
+def test_columnar_encodes_meetings_of_older_outputs(calendars, strip_encoding):
+    write_columnar('Output.cols', strip_encoding(calendars))
+    assert json.dumps(list(read_columnar('Output.cols'))) == json.dumps(calendars)
@@ -0,0 +1,57 @@
+from PageCache import PageCache, get_page_key, get_page_type
+from conftest import FIXTURES_DIR
+import os
+import pytest
+
+LISTING_PATH = '/bwckschd.p_get_crse_unsec'
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(str(tmp_path / 'Cache.sqlite'))
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def page() -> bytes:
+    with open(os.path.join(FIXTURES_DIR, 'listing.html'), 'rb') as f: return f.read()
+
+def test_round_trip(cache, page):
+    key, page_type = get_page_key('https://banner.example.edu', LISTING_PATH, 'term_in=202410'), get_page_type(LISTING_PATH)
+
+    assert cache.get(key, page_type) is None
+    assert cache.put(key, page_type, page)
+    assert cache.get(key, page_type) == (page, 'text/html; charset=UTF-8')
+    assert cache.stats()['Hits'] == 1 and cache.stats()['Misses'] == 1
+
+def test_error_pages_are_not_stored(cache):
+    assert not cache.put('key', get_page_type(LISTING_PATH), b'<html>Service Unavailable</html>')
+    assert cache.get('key', get_page_type(LISTING_PATH)) is None
+
+def test_expired_pages_are_missed(tmp_path, page):
+    cache = PageCache(str(tmp_path / 'Cache.sqlite'), ttls={get_page_type(LISTING_PATH): -1})
+    cache.put('key', get_page_type(LISTING_PATH), page)
+
+    assert cache.get('key', get_page_type(LISTING_PATH)) is None
+    assert cache.purge_expired() == 1
+    cache.close()
+
+def test_least_recently_used_pages_are_evicted(tmp_path, page):
+    cache = PageCache(str(tmp_path / 'Cache.sqlite'))
+    cache.put('first', get_page_type(LISTING_PATH), page)
+    cache.max_bytes = cache.size * 2
+    cache.put('second', get_page_type(LISTING_PATH), page)
+    cache.get('first', get_page_type(LISTING_PATH))
+    cache.put('third', get_page_type(LISTING_PATH), page)
+
+    assert cache.get('second', get_page_type(LISTING_PATH)) is None
+    assert cache.get('first', get_page_type(LISTING_PATH)) and cache.get('third', get_page_type(LISTING_PATH))
+    assert cache.stats()['Evictions'] == 1
+    cache.close()
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_writer_matches_put(cache, page, chunk_size):
+    writer = cache.writer('key', get_page_type(LISTING_PATH))
+    for i in range(0, len(page), chunk_size): writer.write(page[i:i + chunk_size])
+
+    assert writer.close()
+    assert cache.get('key', get_page_type(LISTING_PATH)) == (page, 'text/html; charset=UTF-8')
@@ -0,0 +1,43 @@
+from FakeBanner import FakeBanner, SyntheticSite
+from PageCache import PageCache
+import json
+
+def _get_courses(calendars: list[dict]) -> str:
+    """Courses of Calendar objects as JSON. The Processing Time of two runs differs.
+    """
+    return json.dumps([calendar['Courses'] for calendar in calendars])
+
+def test_every_section_is_parsed(site, calendars):
+    assert [calendar['Calendar Name'] for calendar in calendars] == [name for _, name in site.terms]
+    assert sorted([course['CRN'] for course in calendars[0]['Courses']]) == sorted(site.sections[site.terms[0][0]])
+
+def test_stream_listing_matches_buffered(calendars, server, parse):
+    assert _get_courses(parse(server.profile(), stream_listing=True)) == _get_courses(calendars)
+
+def test_cache_answers_repeated_runs(workdir, server, parse):
+    cache = PageCache('./Cache.sqlite')
+    expected = parse(server.profile(), cache=cache)
+    requests = sum(server.stats()['Requests'].values())
+
+    assert _get_courses(parse(server.profile(), cache=cache)) == _get_courses(expected)
+    assert sum(server.stats()['Requests'].values()) == requests # Every page is still fresh.
+
+class AccentedSite(SyntheticSite):
+    """A synthetic school whose Course titles are not ASCII.
+    """
+    def route(self, method: str, path: str, body: bytes) -> str:
+        page = super().route(method, path, body)
+        return page.replace('Research Methods', 'Méthodes de Recherche') if page else page
+
+def test_streamed_listing_is_cached_as_sent(workdir, parse):
+    site = AccentedSite(courses=60, terms=1)
+    with FakeBanner(site, charset='ISO-8859-1') as server:
+        profile = server.profile()
+        expected = parse(profile)
+
+        cache = PageCache('./Cache.sqlite')
+        assert _get_courses(parse(profile, cache=cache, stream_listing=True)) == _get_courses(expected)
+        assert _get_courses(parse(profile, cache=cache, stream_listing=True)) == _get_courses(expected)
+
+    assert 'Méthodes de Recherche' in [course['Name'] for course in expected[0]['Courses']]
+    assert cache.hits and cache.stats()['Stores']
@@ -0,0 +1,23 @@
+from QueryServer import CourseQuery, QueryServer
+from httpx import Client
+import pytest
+
+@pytest.fixture
+def client(calendars):
+    with QueryServer(CourseQuery(calendars)) as server, Client(base_url=f'http://127.0.0.1:{server.port}') as client: yield client
+
+def test_page_of_rows(client, calendars):
+    response = client.get('/courses', params={'draw': '3', 'start': '10', 'length': '5', 'columns[0][data]': 'CRN', 'order[0][column]': '0', 'order[0][dir]': 'asc'})
+
+    assert response.status_code == 200
+    assert response.json()['draw'] == 3 and response.json()['recordsTotal'] == len(calendars[0]['Courses'])
+    assert [row['CRN'] for row in response.json()['data']] == sorted([course['CRN'] for course in calendars[0]['Courses']])[10:15]
+
+@pytest.mark.parametrize('request_kwargs', [
+    {'params': {'columns[x][data]': 'a'}},
+    {'params': {'order[0][column]': 'x'}},
+    {'content': b'draw=\xff', 'headers': {'Content-Type': 'application/x-www-form-urlencoded'}}
+])
+def test_malformed_requests_are_rejected(client, request_kwargs):
+    response = client.post('/courses', **request_kwargs)
+    assert response.status_code == 400 and 'Invalid request' in response.json()['error']
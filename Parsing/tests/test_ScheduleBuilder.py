@@ -0,0 +1,46 @@
+from ScheduleBuilder import ScheduleBuilder, get_course_key
+from MeetingTimes import DAY_BITS
+from itertools import product
+import random
+import pytest
+
+def _get_meeting(rng: random.Random) -> dict:
+    if rng.random() < 0.1: return {'Start': None, 'End': None, 'Day Mask': 0} # TBA
+
+    start = rng.randrange(8 * 60, 18 * 60, 5)
+    return {'Start': start, 'End': start + rng.choice([50, 75, 110, 170]), 'Day Mask': rng.choice([DAY_BITS['M'] | DAY_BITS['W'], DAY_BITS['T'] | DAY_BITS['R'], DAY_BITS['F'], rng.randrange(1, 128)])}
+
+def _get_sections(seed: int) -> list[dict]:
+    rng, sections = random.Random(seed), []
+    for i, abbreviation in enumerate(['MATH', 'CSC', 'PHYS', 'HIST', 'BIO']):
+        for j in range(rng.randint(1, 5)):
+            meetings = [_get_meeting(rng) for _ in range(rng.randint(1, 2))]
+            sections.append({'CRN': f'{i}{j}', 'Abbreviation': abbreviation, 'Level': '101', 'Remaining': rng.randint(0, 2), 'Properties': meetings})
+
+    return sections
+
+def _conflict(a: dict, b: dict) -> bool:
+    """Whether two sections meet at the same time, compared minute by minute instead of as occupancy bitsets.
+    """
+    return any([
+        first['Day Mask'] & second['Day Mask'] and first['Start'] < second['End'] and second['Start'] < first['End']
+        for first, second in product(a['Properties'], b['Properties']) if first['Start'] is not None and second['Start'] is not None
+    ])
+
+def _brute_force(sections: list[dict], wanted: list[str], open_only: bool) -> list[list[str]]:
+    choices = [[section for section in sections if get_course_key(section) == key and (not open_only or section['Remaining'] > 0)] for key in wanted]
+    return sorted([
+        [section['CRN'] for section in schedule] for schedule in product(*choices)
+        if not any([_conflict(a, b) for i, a in enumerate(schedule) for b in schedule[i + 1:]])
+    ])
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('open_only', [False, True])
+def test_matches_brute_force(seed, open_only):
+    sections = _get_sections(seed)
+    wanted = sorted({get_course_key(section) for section in sections})
+    builder = ScheduleBuilder(sections)
+
+    expected = _brute_force(sections, wanted, open_only)
+    assert sorted([[section['CRN'] for section in schedule] for schedule in builder.build(wanted, open_only)]) == expected
+    assert builder.count(wanted, open_only) == len(expected)
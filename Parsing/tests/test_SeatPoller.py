@@ -0,0 +1,40 @@
+from SeatPoller import RequestBudget, SeatPoller
+from FakeBanner import FakeBanner, SyntheticSite
+from Parser import Parser
+from time import monotonic
+import pytest
+
+@pytest.fixture
+def poller_site():
+    return SyntheticSite(courses=3, terms=1)
+
+@pytest.fixture
+def poller(workdir, poller_site):
+    """A SeatPoller of the Calendar of a small synthetic school, whose Courses are refreshed every 0.1 to 0.2 seconds.
+    """
+    with FakeBanner(poller_site) as server:
+        parser = Parser(server.profile())
+        calendars = parser.get_courses(parser.get_calendars())
+        yield SeatPoller(parser, calendars, budget=RequestBudget(1000, burst=10), min_interval=0.1, max_interval=0.2, watch_interval=0.1)
+
+# With a single Course, the only due Course is often in flight, which must not end the loop.
+@pytest.mark.parametrize('poller_site', [SyntheticSite(courses=1, terms=1)])
+def test_polls_until_duration_runs_out(poller):
+    start = monotonic()
+    assert poller.run(1) == []
+
+    assert monotonic() - start >= 1
+    assert poller.polls >= 4 and poller.failures == 0
+
+def test_reports_changes_and_updates_courses(poller, poller_site):
+    term, (crn, section) = poller_site.terms[0][0], next(iter(poller_site.sections[poller_site.terms[0][0]].items()))
+    section['Registered'] = section['Capacity'] + 1
+
+    seen = []
+    changes = poller.run(0.5, on_change=seen.append)
+
+    assert changes == seen and [(change['Calendar ID'], change['CRN']) for change in changes] == [(term, crn)]
+    assert poller.states[(term, crn)]['Course']['Registered'] == section['Capacity'] + 1
+
+    # A Course that just changed is refreshed again sooner than one that did not.
+    assert poller.states[(term, crn)]['Interval'] <= min([state['Interval'] for state in poller.states.values()])